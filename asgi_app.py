@@ -0,0 +1,670 @@
+"""
+Variante ASGI (asyncio) de la API de web_app.py.
+
+Mismas rutas /api/* y mismas respuestas JSON, servidas con Quart sobre un
+pool asyncpg: una petición que espera a PostgreSQL no ocupa un hilo, así que
+cada proceso atiende muchos más clientes concurrentes (p. ej. refrescos de
+Power BI). Las consultas independientes de una ruta se lanzan a la vez con
+``asyncio.gather``.
+
+Las rutas que dependen de pandas u OrderService (calidad, limpieza,
+exportación, importación, tareas) reutilizan el código síncrono de web_app
+en hilos con ``asyncio.to_thread``. La página del dashboard, los assets y
+/api/events siguen en la app Flask.
+
+Uso:
+    hypercorn asgi_app:app --bind 0.0.0.0:5000 --workers 4
+    python start_web_app.py --asgi
+"""
+import asyncio
+import os
+import tempfile
+from datetime import datetime, timezone
+from functools import wraps
+from asyncpg.exceptions import QueryCanceledError
+from psycopg2.errors import QueryCanceled
+from quart import Quart, g, jsonify, request, send_file
+
+from src.config.settings import admission_settings, cache_settings, db_settings
+from src.database.async_connection import async_db
+from src.database.connection import db_connection
+from src.database.queries import order_by_id_statement
+from src.models.order import OrderValidationError, parse_fields, select_list, validate_order_update
+from src.services.data_version import (
+    bump_data_version, get_version_store, note_served_version, track_served_versions
+)
+from src.services.job_service import JOB_SUCCEEDED
+from src.utils.bulkhead import AsyncBulkhead, BulkheadFull
+from src.utils.logger import logger
+from src.utils.singleflight import AsyncSingleFlight
+from web_app import (
+    AUTOCOMPLETE_MIN_CHARS, CUSTOMER_PREFIX_QUERY, CUSTOMER_SUBSTRING_QUERY, EXPORT_DIR,
+    POWERBI_DERIVED_FIELDS, QUERY_TIMEOUTS, _like_escape, build_order_filters, convert_pandas_types,
+    dashboard_payload, import_status, job_service, order_service, orders_page_query, parse_orders_page,
+    powerbi_orders_query
+)
+
+# Cancelaciones por statement_timeout (servidor), por el timeout de asyncpg
+# (cliente) o por falta de conexiones libres en el pool
+QUERY_TIMEOUT_ERRORS = (QueryCanceledError, QueryCanceled, asyncio.TimeoutError)
+
+# Cuerpos de /api/orders/import más grandes que esto se vuelcan a disco
+UPLOAD_SPOOL_BYTES = 8 * 1024 * 1024
+
+app = Quart(__name__)
+
+request_flight = AsyncSingleFlight()
+
+analytics_bulkhead = AsyncBulkhead(
+    'analytics',
+    max_concurrent=admission_settings.max_concurrent or max(1, db_settings.async_pool_max_size // 2),
+    max_queue=admission_settings.max_queue,
+    max_wait=admission_settings.max_wait
+)
+
+@app.before_serving
+async def open_pool():
+    await async_db.connect()
+
+@app.after_serving
+async def close_pool():
+    await async_db.close()
+
+def with_default_query_timeout(asgi_app):
+    """Tope de tiempo por consulta para toda la petición (ADMISSION_DEFAULT_TIMEOUT_MS).
+    
+    Quart atiende cada petición en tareas creadas aquí adentro, que heredan
+    el contexto; ``admission`` lo reemplaza en las rutas pesadas.
+    """
+    async def wrapper(scope, receive, send):
+        with db_connection.statement_timeout(admission_settings.default_timeout_ms):
+            await asgi_app(scope, receive, send)
+    return wrapper
+
+app.asgi_app = with_default_query_timeout(app.asgi_app)
+
+def overloaded_response(message):
+    """Respuesta 503 con Retry-After para que el cliente reintente más tarde."""
+    response = jsonify({'error': message})
+    response.status_code = 503
+    response.headers['Retry-After'] = str(admission_settings.retry_after)
+    return response
+
+def query_timeout_response():
+    """Respuesta para una consulta cancelada por tiempo."""
+    return overloaded_response('La consulta superó el tiempo máximo permitido, intenta más tarde')
+
+async def send_download(filename):
+    """Enviar un archivo de exports/ como descarga."""
+    response = await send_file(os.path.join(EXPORT_DIR, filename), mimetype='text/csv')
+    response.headers['Content-Disposition'] = f'attachment; filename={filename}'
+    return response
+
+def coalesce_requests(view):
+    """Compartir una sola ejecución entre peticiones idénticas simultáneas (ver web_app)."""
+    @wraps(view)
+    async def wrapper(*args, **kwargs):
+        key = (request.path, tuple(sorted(request.args.items(multi=True))), g.get('data_version'))
+        
+        async def render():
+            with track_served_versions() as served:
+                response = await app.make_response(await view(*args, **kwargs))
+            return await response.get_data(), response.status_code, list(response.headers.items()), served
+        
+        body, status, headers, served = await request_flight.do(key, render)
+        for table, version in served.items():
+            note_served_version(table, version)
+        return app.response_class(body, status=status, headers=headers)
+    return wrapper
+
+def analytics_read(view):
+    """Enviar las lecturas de la vista a una réplica de lectura si hay una apta."""
+    @wraps(view)
+    async def wrapper(*args, **kwargs):
+        with db_connection.prefer_replica():
+            return await view(*args, **kwargs)
+    return wrapper
+
+def admission(kind='analytics'):
+    """Limitar las rutas pesadas con el bulkhead y un tope de tiempo por consulta."""
+    def decorator(view):
+        @wraps(view)
+        async def wrapper(*args, **kwargs):
+            with db_connection.statement_timeout(QUERY_TIMEOUTS[kind]):
+                if not admission_settings.enabled:
+                    return await view(*args, **kwargs)
+                try:
+                    async with analytics_bulkhead.acquire():
+                        return await view(*args, **kwargs)
+                except BulkheadFull:
+                    return overloaded_response('Servidor ocupado con consultas pesadas, intenta más tarde')
+        return wrapper
+    return decorator
+
+def conditional_get(table='orders'):
+    """Responder 304 si el cliente ya tiene la versión actual de los datos (ver web_app)."""
+    def decorator(view):
+        @wraps(view)
+        async def wrapper(*args, **kwargs):
+            if not cache_settings.enabled:
+                return await view(*args, **kwargs)
+            
+            try:
+                version, modified_at = get_version_store().get(table)
+            except Exception as e:
+                logger.error(f"Error reading data version of {table}: {e}")
+                return await view(*args, **kwargs)
+            
+            g.data_version = (table, version)
+            etag = f"{table}-v{version}"
+            last_modified = modified_at.replace(microsecond=0)
+            stable = (datetime.now(timezone.utc) - modified_at).total_seconds() >= 1
+            
+            if request.if_none_match:
+                not_modified = request.if_none_match.contains_weak(etag)
+            else:
+                not_modified = request.if_modified_since is not None and last_modified <= request.if_modified_since
+            
+            if not_modified:
+                response = app.response_class('', status=304)
+            else:
+                with track_served_versions() as served:
+                    response = await app.make_response(await view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                if served.get(table, version) < version:
+                    # Construida con un snapshot anterior: ver web_app.conditional_get
+                    etag, stable = f"{table}-v{served[table]}", False
+            
+            response.set_etag(etag, weak=True)
+            if stable:
+                response.last_modified = last_modified
+            response.headers['Cache-Control'] = 'no-cache'
+            return response
+        return wrapper
+    return decorator
+
+@app.route('/api/dashboard/stats')
+@conditional_get('orders')
+@coalesce_requests
+@admission('analytics')
+@analytics_read
+async def dashboard_stats():
+    """API endpoint para estadísticas del dashboard (cuatro consultas en paralelo)."""
+    try:
+        if order_service.analytics_backend() == 'duckdb':
+            # DuckDB bloquea: en un hilo, fuera del event loop
+            total_orders, status_stats, category_stats, year_stats = await asyncio.to_thread(
+                order_service.get_dashboard_rollups
+            )
+            return jsonify(dashboard_payload(total_orders, status_stats, category_stats, year_stats))
+        total, status_stats, category_stats, year_stats = await asyncio.gather(
+            async_db.fetch_prepared('count_orders'),
+            async_db.fetch_prepared('status_counts'),
+            async_db.fetch_prepared('category_stats'),
+            async_db.fetch_prepared('year_stats')
+        )
+        return jsonify(dashboard_payload(total[0]['total'], status_stats, category_stats, year_stats))
+    except QUERY_TIMEOUT_ERRORS:
+        return query_timeout_response()
+    except Exception as e:
+        logger.error(f"Error getting dashboard stats: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/data-quality/report')
+@conditional_get('orders')
+@coalesce_requests
+@admission('analytics')
+@analytics_read
+async def data_quality_report():
+    """API endpoint para reporte de calidad de datos (``mode=exact|approx``)."""
+    mode = request.args.get('mode', 'exact')
+    if mode not in ('exact', 'approx'):
+        return jsonify({'error': "mode debe ser 'exact' o 'approx'"}), 400
+    try:
+        report = await asyncio.to_thread(order_service.get_data_quality_report, approximate=(mode == 'approx'))
+        return jsonify(convert_pandas_types(report))
+    except QUERY_TIMEOUT_ERRORS:
+        return query_timeout_response()
+    except Exception as e:
+        logger.error(f"Error getting data quality report: {e}")
+        return jsonify({'error': str(e)}), 500
+
+async def job_accepted(kind):
+    """Encolar una tarea y responder 202 de inmediato con su id y la URL para consultarla."""
+    job_id = await asyncio.to_thread(job_service.submit, kind)
+    return jsonify({
+        'job_id': job_id,
+        'status_url': f'/api/jobs/{job_id}'
+    }), 202
+
+async def _cleaning_check(kind, error_message):
+    try:
+        return await job_accepted(kind)
+    except Exception as e:
+        logger.error(f"{error_message}: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/data-cleaning/duplicates')
+async def check_duplicates():
+    """API endpoint para verificar duplicados; encola la tarea y responde 202 con su id."""
+    return await _cleaning_check('duplicates', "Error checking duplicates")
+
+@app.route('/api/data-cleaning/incomplete')
+async def check_incomplete():
+    """API endpoint para verificar registros incompletos; encola la tarea y responde 202 con su id."""
+    return await _cleaning_check('incomplete', "Error checking incomplete records")
+
+@app.route('/api/data-cleaning/validate')
+async def validate_data():
+    """API endpoint para validar tipos de datos; encola la tarea y responde 202 con su id."""
+    return await _cleaning_check('validate', "Error validating data")
+
+@app.route('/api/orders')
+async def get_orders():
+    """API endpoint para obtener órdenes con paginación (conteo y página en paralelo)."""
+    try:
+        try:
+            page, per_page, before = parse_orders_page(request.args)
+            columns = select_list(parse_fields(request.args.get('fields')))
+            where_clause, params = build_order_filters(request.args)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        queries = [async_db.fetch(*orders_page_query(columns, where_clause, params, page, per_page, before))]
+        if request.args.get('count', 'true').lower() != 'false':
+            queries.append(async_db.fetch(f"SELECT COUNT(*) as total FROM orders {where_clause}", params))
+        
+        results = await asyncio.gather(*queries)
+        orders = results[0]
+        total = results[1][0]['total'] if len(results) > 1 else None
+        
+        return jsonify({
+            'orders': orders,
+            'total': total,
+            'page': page,
+            'per_page': per_page,
+            'total_pages': (total + per_page - 1) // per_page if total is not None else None
+        })
+    except QUERY_TIMEOUT_ERRORS:
+        return query_timeout_response()
+    except Exception as e:
+        logger.error(f"Error getting orders: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/customers/autocomplete')
+@conditional_get('orders')
+@coalesce_requests
+async def autocomplete_customers():
+    """Sugerencias de nombres de cliente: primero por prefijo, luego por subcadena."""
+    try:
+        query_text = request.args.get('q', '').strip()
+        limit = min(int(request.args.get('limit', 10)), 50)
+        if len(query_text) < AUTOCOMPLETE_MIN_CHARS:
+            return jsonify({'customers': []})
+        
+        queries = [async_db.fetch(CUSTOMER_PREFIX_QUERY, {
+            'prefix': _like_escape(query_text.lower()) + '%',
+            'limit': limit
+        })]
+        # Con 3+ caracteres la búsqueda por subcadena (trigram) corre a la vez
+        if len(query_text) >= 3:
+            queries.append(async_db.fetch(CUSTOMER_SUBSTRING_QUERY, {
+                'pattern': '%' + _like_escape(query_text) + '%',
+                'limit': limit
+            }))
+        results = await asyncio.gather(*queries)
+        
+        customers = [row['customer_name'] for row in results[0]]
+        for row in results[1] if len(results) > 1 else []:
+            if row['customer_name'] not in customers and len(customers) < limit:
+                customers.append(row['customer_name'])
+        
+        return jsonify({'customers': customers})
+    except QUERY_TIMEOUT_ERRORS:
+        return query_timeout_response()
+    except Exception as e:
+        logger.error(f"Error autocompleting customers: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/export/csv')
+async def export_csv():
+    """API endpoint para exportar datos a CSV; el archivo se descarga de /api/jobs/<id>/download."""
+    try:
+        return await job_accepted('export_csv')
+    except Exception as e:
+        logger.error(f"Error exporting CSV: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/powerbi/orders')
+@conditional_get('orders')
+@coalesce_requests
+@admission('analytics')
+@analytics_read
+async def powerbi_orders():
+    """API endpoint específico para Power BI (``fields=`` limita las columnas;
+    acepta los filtros de /api/orders, p. ej. ``date_from``/``date_to``)."""
+    try:
+        try:
+            fields = parse_fields(request.args.get('fields'), extra=list(POWERBI_DERIVED_FIELDS))
+            where_clause, params = build_order_filters(request.args)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        orders = await async_db.fetch(powerbi_orders_query(fields, where_clause), params)
+        
+        return jsonify({
+            'data': orders,
+            'last_updated': datetime.now().isoformat(),
+            'total_records': len(orders)
+        })
+    except QUERY_TIMEOUT_ERRORS:
+        return query_timeout_response()
+    except Exception as e:
+        logger.error(f"Error getting Power BI data: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/powerbi/summary')
+@conditional_get('orders')
+@coalesce_requests
+@admission('analytics')
+@analytics_read
+async def powerbi_summary():
+    """API endpoint para resumen de datos para Power BI (tres consultas en paralelo)."""
+    try:
+        category_summary, yearly_summary, status_summary = await asyncio.gather(
+            async_db.fetch_prepared('powerbi_category_summary'),
+            async_db.fetch_prepared('powerbi_yearly_summary'),
+            async_db.fetch_prepared('powerbi_status_summary')
+        )
+        
+        return jsonify({
+            'category_summary': category_summary,
+            'yearly_summary': yearly_summary,
+            'status_summary': status_summary,
+            'last_updated': datetime.now().isoformat()
+        })
+    except QUERY_TIMEOUT_ERRORS:
+        return query_timeout_response()
+    except Exception as e:
+        logger.error(f"Error getting Power BI summary: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/replicas/status')
+async def replicas_status():
+    """API endpoint con el último estado observado de cada réplica de lectura."""
+    return jsonify({'replicas': db_connection.router.status()})
+
+@app.route('/api/admission/status')
+async def admission_status():
+    """API endpoint con la ocupación del bulkhead de consultas pesadas de este proceso."""
+    return jsonify(analytics_bulkhead.status())
+
+# ===== TAREAS EN SEGUNDO PLANO =====
+
+@app.route('/api/jobs', methods=['POST'])
+async def submit_job():
+    """API endpoint para encolar una tarea pesada; responde de inmediato con su id."""
+    try:
+        data = await request.get_json(silent=True) or {}
+        kind = data.get('type')
+        if kind not in job_service.kinds:
+            return jsonify({'error': f"type debe ser uno de: {', '.join(job_service.kinds)}"}), 400
+        
+        return await job_accepted(kind)
+    except Exception as e:
+        logger.error(f"Error submitting job: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/jobs')
+async def list_jobs():
+    """API endpoint para listar las tareas recientes."""
+    try:
+        limit = int(request.args.get('limit', 20))
+        return jsonify({'jobs': await asyncio.to_thread(job_service.list_recent, limit)})
+    except Exception as e:
+        logger.error(f"Error listing jobs: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/jobs/<job_id>')
+async def get_job(job_id):
+    """API endpoint para consultar estado, progreso y resultado de una tarea."""
+    try:
+        job = await asyncio.to_thread(job_service.get, job_id)
+        if not job:
+            return jsonify({'error': 'Tarea no encontrada'}), 404
+        return jsonify(job)
+    except Exception as e:
+        logger.error(f"Error getting job {job_id}: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/jobs/<job_id>/download')
+async def download_job_result(job_id):
+    """API endpoint para descargar el archivo generado por una tarea de exportación."""
+    try:
+        job = await asyncio.to_thread(job_service.get, job_id)
+        if not job:
+            return jsonify({'error': 'Tarea no encontrada'}), 404
+        if job['status'] != JOB_SUCCEEDED or not job['result'] or 'filename' not in job['result']:
+            return jsonify({'error': 'La tarea no tiene un archivo disponible'}), 409
+        
+        filename = job['result']['filename']
+        return await send_download(filename)
+    except Exception as e:
+        logger.error(f"Error downloading job {job_id} result: {e}")
+        return jsonify({'error': str(e)}), 500
+
+# ===== GESTIÓN DE ÓRDENES =====
+
+REQUIRED_FIELDS = ['status', 'customer_name', 'order_date', 'quantity',
+                   'subtotal_amount', 'tax_rate', 'shipping_cost', 'category', 'subcategory']
+
+@app.route('/api/orders/<int:order_id>')
+@conditional_get('orders')
+async def get_order(order_id):
+    """API endpoint para obtener una orden específica."""
+    try:
+        try:
+            statement = order_by_id_statement(parse_fields(request.args.get('fields')) or ())
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        orders = await async_db.fetch_prepared(statement, {"order_id": order_id})
+        
+        if not orders:
+            return jsonify({'error': 'Orden no encontrada'}), 404
+        
+        return jsonify(orders[0])
+    except QUERY_TIMEOUT_ERRORS:
+        return query_timeout_response()
+    except Exception as e:
+        logger.error(f"Error getting order {order_id}: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/orders/<int:order_id>', methods=['PUT'])
+async def update_order(order_id):
+    """API endpoint para actualizar una orden existente."""
+    try:
+        data = await request.get_json()
+        
+        for field in REQUIRED_FIELDS:
+            if field not in data:
+                return jsonify({'error': f'Campo requerido: {field}'}), 400
+        
+        # Validar con el esquema de OrderBase y actualizar
+        updated = await asyncio.to_thread(order_service.update_order, order_id,
+                                          {field: data[field] for field in REQUIRED_FIELDS})
+        if updated:
+            return jsonify({'message': 'Orden actualizada exitosamente', 'order_id': order_id})
+        else:
+            return jsonify({'error': 'Orden no encontrada'}), 404
+    
+    except OrderValidationError as e:
+        return jsonify({'error': 'Datos inválidos', 'details': e.errors}), 400
+    except Exception as e:
+        logger.error(f"Error updating order {order_id}: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/orders', methods=['POST'])
+async def create_order():
+    """API endpoint para crear una nueva orden."""
+    try:
+        data = await request.get_json()
+        
+        for field in REQUIRED_FIELDS:
+            if field not in data:
+                return jsonify({'error': f'Campo requerido: {field}'}), 400
+        
+        # Validar con el esquema de OrderBase e insertar
+        next_id = await asyncio.to_thread(order_service.create_order,
+                                          {field: data[field] for field in REQUIRED_FIELDS})
+        logger.info(f"New order {next_id} created successfully")
+        return jsonify({'message': 'Orden creada exitosamente', 'order_id': next_id}), 201
+    
+    except OrderValidationError as e:
+        return jsonify({'error': 'Datos inválidos', 'details': e.errors}), 400
+    except Exception as e:
+        logger.error(f"Error creating order: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/orders/bulk', methods=['POST'])
+async def create_orders_bulk():
+    """API endpoint para crear varias órdenes en lote (ver web_app)."""
+    try:
+        data = await request.get_json()
+        if not isinstance(data, list) or len(data) == 0:
+            return jsonify({'error': 'Se esperaba una lista no vacía de órdenes'}), 400
+        if not all(isinstance(row, dict) for row in data):
+            return jsonify({'error': 'Cada orden debe ser un objeto JSON'}), 400
+        
+        result = await asyncio.to_thread(order_service.create_orders, data)
+        status = 201 if result['inserted'] > 0 else 400
+        return jsonify(result), status
+    except Exception as e:
+        logger.error(f"Error in bulk order creation: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/orders/import', methods=['POST'])
+@admission('export')
+async def import_orders():
+    """API endpoint para importar órdenes desde un CSV (o .csv.gz) con encabezado.
+    
+    Igual que en web_app: ``file`` multipart o el cuerpo directo, ``import_id``
+    para reanudar y ``dedupe``. El cuerpo se vuelca a un archivo temporal por
+    bloques (sin límite de tamaño en esta ruta) y se importa en un hilo.
+    """
+    request.max_content_length = None
+    request.body_timeout = None
+    spooled = None
+    try:
+        files = await request.files if request.mimetype == 'multipart/form-data' else {}
+        if 'file' in files:
+            upload = files['file']
+            stream, source = upload.stream, upload.filename
+        else:
+            spooled = stream = tempfile.SpooledTemporaryFile(max_size=UPLOAD_SPOOL_BYTES)
+            source = None
+            async for chunk in request.body:
+                spooled.write(chunk)
+            spooled.seek(0)
+        
+        result = await asyncio.to_thread(
+            order_service.import_orders_stream,
+            stream,
+            import_id=request.args.get('import_id') or None,
+            source=source,
+            dedupe=request.args.get('dedupe', 'true').lower() != 'false'
+        )
+        return jsonify(result), import_status(result)
+    except QUERY_TIMEOUT_ERRORS:
+        return query_timeout_response()
+    except Exception as e:
+        logger.error(f"Error importing orders: {e}")
+        return jsonify({'error': str(e)}), 500
+    finally:
+        if spooled is not None:
+            spooled.close()
+
+@app.route('/api/orders/<int:order_id>', methods=['DELETE'])
+async def delete_order(order_id):
+    """API endpoint para eliminar una orden."""
+    try:
+        affected_rows = await async_db.execute_prepared_update('delete_order', {"order_id": order_id})
+        
+        if affected_rows == 0:
+            return jsonify({'error': 'Orden no encontrada'}), 404
+        
+        bump_data_version('orders')
+        logger.info(f"Order {order_id} deleted successfully")
+        return jsonify({'message': 'Orden eliminada exitosamente', 'order_id': order_id})
+    except Exception as e:
+        logger.error(f"Error deleting order {order_id}: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/orders/<int:order_id>/status', methods=['PATCH'])
+async def update_order_status(order_id):
+    """API endpoint para actualizar solo el estado de una orden."""
+    try:
+        data = await request.get_json()
+        
+        if 'status' not in data:
+            return jsonify({'error': 'Campo status es requerido'}), 400
+        validate_order_update({'status': data['status']})
+        
+        affected_rows = await async_db.execute_prepared_update('update_order_status', {
+            "order_id": order_id,
+            "status": data['status']
+        })
+        
+        if affected_rows == 0:
+            return jsonify({'error': 'Orden no encontrada'}), 404
+        
+        bump_data_version('orders')
+        logger.info(f"Order {order_id} status updated to {data['status']}")
+        return jsonify({'message': 'Estado actualizado exitosamente', 'order_id': order_id, 'new_status': data['status']})
+    
+    except OrderValidationError as e:
+        return jsonify({'error': 'Datos inválidos', 'details': e.errors}), 400
+    except Exception as e:
+        logger.error(f"Error updating order {order_id} status: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/orders/bulk-status', methods=['PATCH'])
+async def bulk_update_status():
+    """API endpoint para actualizar el estado de múltiples órdenes."""
+    try:
+        data = await request.get_json()
+        
+        if 'order_ids' not in data or 'status' not in data:
+            return jsonify({'error': 'order_ids y status son requeridos'}), 400
+        
+        order_ids = data['order_ids']
+        new_status = data['status']
+        
+        if not isinstance(order_ids, list) or len(order_ids) == 0:
+            return jsonify({'error': 'order_ids debe ser una lista no vacía'}), 400
+        validate_order_update({'status': new_status})
+        
+        affected_rows = await async_db.execute_prepared_update('bulk_update_status', {
+            'status': new_status,
+            'order_ids': order_ids
+        })
+        if affected_rows > 0:
+            bump_data_version('orders')
+        
+        logger.info(f"Bulk status update: {affected_rows} orders updated to {new_status}")
+        return jsonify({
+            'message': 'Estados actualizados exitosamente',
+            'updated_count': affected_rows,
+            'new_status': new_status
+        })
+    
+    except OrderValidationError as e:
+        return jsonify({'error': 'Datos inválidos', 'details': e.errors}), 400
+    except Exception as e:
+        logger.error(f"Error in bulk status update: {e}")
+        return jsonify({'error': str(e)}), 500
+
+if __name__ == '__main__':
+    logger.info("Starting ASGI application...")
+    app.run(debug=True, host='0.0.0.0', port=5000)
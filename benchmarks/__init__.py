@@ -0,0 +1 @@
+"""Benchmark suite: synthetic orders, throwaway PostgreSQL and latency/throughput runs."""
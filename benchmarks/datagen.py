@@ -0,0 +1,205 @@
+"""
+Synthetic generator for the ``orders`` table.
+
+Rows follow the schema of ``src.models.order.OrderBase`` and the shape of the
+real data (skewed status/category mix, log-normal amounts, dates since 2009),
+with optional injected duplicates, nulls and negative values so the cleaning
+rules have something to find.
+
+Usage:
+    python -m benchmarks.datagen --rows 1000000 --csv orders.csv.gz
+"""
+import argparse
+import io
+from dataclasses import dataclass
+from typing import Iterator, Optional
+import numpy as np
+import pandas as pd
+
+
+COLUMNS = ['order_id', 'status', 'customer_name', 'order_date', 'quantity',
+           'subtotal_amount', 'tax_rate', 'shipping_cost', 'category', 'subcategory']
+
+STATUSES = {'Order Finished': 0.895, 'Order Returned': 0.104, 'Order Cancelled': 0.001}
+
+SUBCATEGORIES = {
+    'Office Supplies': {
+        'Binders & Binder Accessories': 768, 'Paper': 736, 'Appliances': 375,
+        'Pens & Art Supplies': 359, 'Storage & Organization': 276, 'Labels': 206,
+        'Envelopes': 174, 'Rubber Bands': 97, 'Scissors, Rulers & Trimmers': 75,
+    },
+    'Technology': {
+        'Computer Peripherals': 561, 'Telephones & Communication': 429,
+        'Office Machines': 234, 'Copiers & Fax': 56,
+    },
+    'Furniture': {
+        'Office Furnishings': 530, 'Chairs & Chairmats': 301, 'Tables': 180, 'Bookcases': 142,
+    },
+}
+
+FIRST_NAMES = ['Annie', 'Muhammed', 'Carlos', 'Maria', 'John', 'Laura', 'Pedro', 'Ana', 'Luis',
+               'Sofia', 'David', 'Elena', 'Jorge', 'Lucia', 'Miguel', 'Paula', 'Andres', 'Camila']
+LAST_NAMES = ['Thurman', 'Mac Intyre', 'Garcia', 'Rodriguez', 'Smith', 'Lopez', 'Martinez',
+              'Gonzalez', 'Perez', 'Sanchez', 'Ramirez', 'Torres', 'Flores', 'Rivera', 'Gomez']
+
+DDL = """
+CREATE TABLE IF NOT EXISTS orders (
+  order_id        bigint PRIMARY KEY,
+  status          text {not_null},
+  customer_name   text {not_null},
+  order_date      date {not_null},
+  quantity        integer {not_null} {quantity_check},
+  subtotal_amount numeric(18,2) {not_null} {subtotal_check},
+  tax_rate        numeric(6,4) {not_null} {tax_check},
+  shipping_cost   numeric(18,2) {not_null} {shipping_check},
+  category        text {not_null},
+  subcategory     text {not_null}
+)
+"""
+
+
+@dataclass
+class GeneratorConfig:
+    """Size, randomness and data-quality defects of a synthetic dataset."""
+    rows: int = 100_000
+    seed: int = 42
+    chunk_size: int = 250_000
+    customers: int = 50_000
+    duplicate_rate: float = 0.01
+    null_rate: float = 0.001
+    negative_rate: float = 0.001
+    start_date: str = '2009-01-01'
+    end_date: str = '2025-09-21'
+
+    @property
+    def dirty(self) -> bool:
+        """Whether injected defects require a schema without NOT NULL/CHECK constraints."""
+        return self.null_rate > 0 or self.negative_rate > 0
+
+
+def create_table_sql(config: GeneratorConfig) -> str:
+    """DDL for ``orders``; constraints are relaxed when defects are injected."""
+    if config.dirty:
+        return DDL.format(not_null='', quantity_check='', subtotal_check='', tax_check='', shipping_check='')
+    return DDL.format(
+        not_null='NOT NULL',
+        quantity_check='CHECK (quantity >= 0)',
+        subtotal_check='CHECK (subtotal_amount >= 0)',
+        tax_check='CHECK (tax_rate >= 0)',
+        shipping_check='CHECK (shipping_cost >= 0)',
+    )
+
+
+def _customer_names(rng: np.random.Generator, count: int) -> np.ndarray:
+    first = rng.choice(FIRST_NAMES, size=count)
+    last = rng.choice(LAST_NAMES, size=count)
+    suffix = np.arange(count).astype(str)
+    return np.char.add(np.char.add(np.char.add(first, ' '), last), np.char.add(' ', suffix))
+
+
+def generate_orders(config: GeneratorConfig) -> Iterator[pd.DataFrame]:
+    """Yield DataFrame chunks of synthetic orders with consecutive order_ids."""
+    rng = np.random.default_rng(config.seed)
+    customers = _customer_names(rng, config.customers)
+    # Zipf-like customer popularity: a few customers place many orders
+    popularity = 1.0 / np.arange(1, config.customers + 1) ** 0.8
+    popularity /= popularity.sum()
+
+    categories = list(SUBCATEGORIES)
+    category_weights = np.array([3066, 1281, 1153], dtype=float)
+    category_weights /= category_weights.sum()
+    start = np.datetime64(config.start_date)
+    span_days = int((np.datetime64(config.end_date) - start).astype(int)) + 1
+
+    produced = 0
+    previous: Optional[pd.DataFrame] = None
+    while produced < config.rows:
+        size = min(config.chunk_size, config.rows - produced)
+        category = rng.choice(categories, size=size, p=category_weights)
+        subcategory = np.empty(size, dtype=object)
+        for name, subs in SUBCATEGORIES.items():
+            mask = category == name
+            weights = np.array(list(subs.values()), dtype=float)
+            subcategory[mask] = rng.choice(list(subs), size=mask.sum(), p=weights / weights.sum())
+
+        chunk = pd.DataFrame({
+            'order_id': np.arange(produced + 1, produced + size + 1, dtype=np.int64),
+            'status': rng.choice(list(STATUSES), size=size, p=list(STATUSES.values())),
+            'customer_name': customers[rng.choice(config.customers, size=size, p=popularity)],
+            'order_date': start + rng.integers(0, span_days, size=size).astype('timedelta64[D]'),
+            'quantity': rng.integers(1, 51, size=size),
+            'subtotal_amount': np.round(rng.lognormal(13.6, 1.4, size=size), 2),
+            'tax_rate': rng.integers(0, 11, size=size) / 100,
+            'shipping_cost': np.round(rng.lognormal(10.3, 1.5, size=size), 2),
+            'category': category,
+            'subcategory': subcategory,
+        })
+        chunk['order_date'] = pd.to_datetime(chunk['order_date']).dt.date
+
+        # Duplicates: copy business fields from earlier rows, keeping fresh order_ids
+        dup_count = int(size * config.duplicate_rate)
+        if dup_count:
+            source = chunk if previous is None else pd.concat([previous, chunk])
+            picks = source.sample(n=dup_count, random_state=int(rng.integers(1 << 31)))
+            targets = rng.choice(size, size=dup_count, replace=False)
+            for column in COLUMNS[1:]:
+                chunk.loc[chunk.index[targets], column] = picks[column].to_numpy()
+
+        # Nullable integer so injected nulls stay NULL instead of turning quantity into floats
+        chunk['quantity'] = chunk['quantity'].astype('Int64')
+        for column in COLUMNS[1:]:
+            null_mask = rng.random(size) < config.null_rate
+            if null_mask.any():
+                chunk.loc[null_mask, column] = None
+        for column in ['quantity', 'subtotal_amount', 'shipping_cost']:
+            negative_mask = rng.random(size) < config.negative_rate
+            if negative_mask.any():
+                chunk.loc[negative_mask, column] = -chunk.loc[negative_mask, column].abs()
+
+        previous = chunk.tail(min(len(chunk), 10_000))
+        produced += size
+        yield chunk
+
+
+def write_csv(path: str, config: GeneratorConfig):
+    """Write the dataset in the same format as ``/api/export/csv`` (gzip if path ends in .gz)."""
+    compression = 'gzip' if path.endswith('.gz') else None
+    for i, chunk in enumerate(generate_orders(config)):
+        chunk.to_csv(path, mode='w' if i == 0 else 'a', header=i == 0, index=False,
+                     compression=compression, float_format='%.2f')
+
+
+def load_into_postgres(conn, config: GeneratorConfig, table: str = 'orders') -> int:
+    """Create ``orders`` (dropping any previous one) and COPY the dataset into it."""
+    with conn.cursor() as cursor:
+        cursor.execute(f"DROP TABLE IF EXISTS {table}")
+        cursor.execute(create_table_sql(config).replace('orders', table, 1))
+        loaded = 0
+        for chunk in generate_orders(config):
+            buffer = io.StringIO()
+            chunk.to_csv(buffer, index=False, header=False, float_format='%.2f')
+            buffer.seek(0)
+            cursor.copy_expert(f"COPY {table} ({', '.join(COLUMNS)}) FROM STDIN WITH (FORMAT csv)", buffer)
+            loaded += len(chunk)
+        cursor.execute(f"ANALYZE {table}")
+    conn.commit()
+    return loaded
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description="Generate synthetic orders")
+    parser.add_argument('--rows', type=int, default=GeneratorConfig.rows)
+    parser.add_argument('--seed', type=int, default=GeneratorConfig.seed)
+    parser.add_argument('--duplicate-rate', type=float, default=GeneratorConfig.duplicate_rate)
+    parser.add_argument('--null-rate', type=float, default=GeneratorConfig.null_rate)
+    parser.add_argument('--negative-rate', type=float, default=GeneratorConfig.negative_rate)
+    parser.add_argument('--csv', required=True, help="Output path (.csv or .csv.gz)")
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = _parse_args()
+    config = GeneratorConfig(rows=args.rows, seed=args.seed, duplicate_rate=args.duplicate_rate,
+                             null_rate=args.null_rate, negative_rate=args.negative_rate)
+    write_csv(args.csv, config)
+    print(f"Wrote {config.rows:,} orders to {args.csv}")
@@ -0,0 +1,123 @@
+"""
+Import-time budget check for the application entry points.
+
+Each entry point is imported in a fresh interpreter several times. The check
+fails if a heavy module that should be loaded lazily (pandas, SQLAlchemy,
+plotly) shows up at import, or if the median import time exceeds its budget.
+Budgets are ratios to a baseline measured on the same machine: the
+third-party packages the entry point cannot avoid importing (Flask,
+pydantic-settings, loguru, psycopg2), so the result does not depend on how
+fast the machine is. ``--lazy-only`` skips timing altogether.
+
+Usage:
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --runs 10 --budget-scale 1.5 --top 15
+    python -m benchmarks.import_time --lazy-only
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Third-party packages every entry point imports eagerly
+CORE_BASELINE = 'pydantic_settings, loguru, psycopg2.extras'
+WEB_BASELINE = f'flask, flask_cors, {CORE_BASELINE}'
+
+# Entry point -> (baseline imports, budget as a multiple of the baseline's median).
+# Loose enough for machine noise, tight enough that pandas loading eagerly fails
+BUDGETS = {
+    'web_app': (WEB_BASELINE, 2.0),
+    'main': (CORE_BASELINE, 2.0),
+    'src.services.order_service': (CORE_BASELINE, 2.0),
+}
+
+# Modules that must only be imported on first use
+LAZY_MODULES = ['pandas', 'numpy', 'sqlalchemy', 'plotly']
+
+_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import {module}
+elapsed = (time.perf_counter() - started) * 1000
+print(json.dumps({{"ms": elapsed, "loaded": [m for m in {lazy!r} if m in sys.modules]}}))
+"""
+
+
+def measure_import(module: str, runs: int) -> Tuple[float, List[str]]:
+    """Median cold import time of ``module`` and the lazy modules it pulled in."""
+    timings = []
+    loaded: List[str] = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, '-c', _PROBE.format(module=module, lazy=LAZY_MODULES)],
+            cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip().splitlines()[-1]
+        result = json.loads(output)
+        timings.append(result['ms'])
+        loaded = result['loaded']
+    return statistics.median(timings), loaded
+
+
+def top_imports(module: str, count: int) -> List[Tuple[int, str]]:
+    """Slowest imports (cumulative microseconds) according to ``-X importtime``."""
+    stderr = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=PROJECT_ROOT, capture_output=True, text=True
+    ).stderr
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|', 2)
+        if cumulative.strip().isdigit():
+            entries.append((int(cumulative), name.strip()))
+    return sorted(entries, reverse=True)[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Presupuesto de tiempo de importación")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--budget-scale', type=float, default=1.0,
+                        help="Multiplicador de los presupuestos (relativos a la línea base)")
+    parser.add_argument('--lazy-only', action='store_true',
+                        help="Solo verificar los módulos diferidos, sin medir tiempos")
+    parser.add_argument('--top', type=int, default=0, help="Mostrar los N imports más lentos de cada módulo")
+    args = parser.parse_args()
+
+    failures: Dict[str, List[str]] = {}
+    baselines: Dict[str, float] = {}
+    for module, (baseline, ratio) in BUDGETS.items():
+        median_ms, loaded = measure_import(module, 1 if args.lazy_only else args.runs)
+        problems = []
+        if loaded:
+            problems.append(f"importa en caliente: {', '.join(loaded)}")
+        if args.lazy_only:
+            print(f"{'❌' if problems else '✅'} import {module}")
+        else:
+            if baseline not in baselines:
+                baselines[baseline] = measure_import(baseline, args.runs)[0]
+            budget = baselines[baseline] * ratio * args.budget_scale
+            if median_ms > budget:
+                problems.append(f"{median_ms:.0f}ms > {budget:.0f}ms")
+            print(f"{'❌' if problems else '✅'} import {module}: {median_ms:.0f}ms "
+                  f"(presupuesto {ratio * args.budget_scale:.2f} × {baselines[baseline]:.0f}ms de {baseline})")
+        if loaded:
+            print(f"   módulos que deberían cargarse de forma diferida: {', '.join(loaded)}")
+        if problems:
+            failures[module] = problems
+        for cumulative, name in top_imports(module, args.top) if args.top else []:
+            print(f"   {cumulative / 1000:8.1f}ms  {name}")
+
+    if failures:
+        print("\n❌ Presupuesto excedido: " + "; ".join(f"{m} ({', '.join(why)})" for m, why in failures.items()))
+        sys.exit(1)
+    print("\n✅ Todos los puntos de entrada dentro del presupuesto")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,294 @@
+"""
+HTTP load test for the Flask API with a realistic mix of users.
+
+Starts the app locally (Gunicorn or the Flask dev server) against a
+throwaway PostgreSQL filled with synthetic orders, or targets an already
+running instance with ``--url``. Virtual users replay a weighted mix of
+dashboard loads, paginated browsing, single-order reads/updates, bulk status
+changes and Power BI pulls; results are reported per endpoint.
+
+Usage:
+    python -m benchmarks.loadtest --rows 500000 --users 50 --duration 60
+    python -m benchmarks.loadtest --server dev --users 10 --duration 30
+    python -m benchmarks.loadtest --url http://localhost:5000 --users 20 --output load.json
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.datagen import GeneratorConfig, load_into_postgres
+from benchmarks.local_postgres import LocalPostgres, _free_port
+from benchmarks.run_benchmarks import SAMPLE_ORDER, percentile
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+STATUSES = ['Order Finished', 'Order Returned', 'Order Cancelled']
+CATEGORIES = ['Office Supplies', 'Technology', 'Furniture']
+
+
+class Recorder:
+    """Thread-safe collection of per-endpoint latencies and outcomes."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.statuses: Dict[str, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+
+    def record(self, endpoint: str, latency_ms: float, status: int, ok: bool):
+        with self._lock:
+            self.latencies[endpoint].append(latency_ms)
+            self.statuses[endpoint][status] += 1
+            if not ok:
+                self.errors[endpoint] += 1
+
+    def summary(self, elapsed: float) -> Dict[str, Any]:
+        """Throughput, latency percentiles and error rate per endpoint and overall."""
+        report = {}
+        everything = []
+        for endpoint, values in sorted(self.latencies.items()):
+            ordered = sorted(values)
+            everything.extend(values)
+            report[endpoint] = {
+                'requests': len(values),
+                'throughput_rps': round(len(values) / elapsed, 2),
+                'p50_ms': round(percentile(ordered, 0.50), 2),
+                'p95_ms': round(percentile(ordered, 0.95), 2),
+                'p99_ms': round(percentile(ordered, 0.99), 2),
+                'error_rate': round(self.errors[endpoint] / len(values), 4),
+                'status_codes': {str(code): count for code, count in sorted(self.statuses[endpoint].items())},
+            }
+        ordered = sorted(everything)
+        report['TOTAL'] = {
+            'requests': len(ordered),
+            'throughput_rps': round(len(ordered) / elapsed, 2),
+            'p50_ms': round(percentile(ordered, 0.50), 2),
+            'p95_ms': round(percentile(ordered, 0.95), 2),
+            'p99_ms': round(percentile(ordered, 0.99), 2),
+            'error_rate': round(sum(self.errors.values()) / len(ordered), 4) if ordered else 0.0,
+        }
+        return report
+
+
+class Client:
+    """Minimal JSON HTTP client on urllib (no extra dependencies)."""
+
+    def __init__(self, base_url: str, recorder: Recorder, timeout: float):
+        self.base_url = base_url.rstrip('/')
+        self.recorder = recorder
+        self.timeout = timeout
+
+    def request(self, label: str, method: str, path: str, body: Optional[dict] = None,
+                expected: Tuple[int, ...] = (200,)) -> Optional[Any]:
+        data = json.dumps(body).encode() if body is not None else None
+        req = urllib.request.Request(self.base_url + path, data=data, method=method,
+                                     headers={'Content-Type': 'application/json'} if data else {})
+        started = time.perf_counter()
+        payload, status = None, 0
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as response:
+                status = response.status
+                payload = response.read()
+        except urllib.error.HTTPError as e:
+            status = e.code
+            e.read()
+        except (urllib.error.URLError, OSError):
+            status = 0
+        latency = (time.perf_counter() - started) * 1000
+        self.recorder.record(label, latency, status, status in expected)
+        if payload and status == 200:
+            try:
+                return json.loads(payload)
+            except ValueError:
+                return None
+        return None
+
+
+def build_mix(max_order_id: int, total_pages: int) -> List[Tuple[float, Callable[[Client, random.Random], None]]]:
+    """Weighted user actions; each may issue one or more requests."""
+
+    def random_id(rng):
+        return rng.randint(1, max_order_id)
+
+    def dashboard(client, rng):
+        client.request('GET /', 'GET', '/')
+        client.request('GET /api/dashboard/stats', 'GET', '/api/dashboard/stats')
+
+    def browse(client, rng):
+        params = f"page={rng.randint(1, max(1, min(total_pages, 200)))}&per_page=50"
+        if rng.random() < 0.3:
+            params += f"&status={urllib.parse.quote(rng.choice(STATUSES))}"
+        if rng.random() < 0.3:
+            params += f"&category={urllib.parse.quote(rng.choice(CATEGORIES))}"
+        client.request('GET /api/orders', 'GET', f'/api/orders?{params}')
+
+    def get_order(client, rng):
+        client.request('GET /api/orders/<id>', 'GET', f'/api/orders/{random_id(rng)}', expected=(200, 404))
+
+    def put_order(client, rng):
+        client.request('PUT /api/orders/<id>', 'PUT', f'/api/orders/{random_id(rng)}',
+                       body={**SAMPLE_ORDER, 'status': rng.choice(STATUSES)}, expected=(200, 404))
+
+    def bulk_status(client, rng):
+        start = random_id(rng)
+        client.request('PATCH /api/orders/bulk-status', 'PATCH', '/api/orders/bulk-status',
+                       body={'order_ids': list(range(start, start + 20)), 'status': rng.choice(STATUSES)})
+
+    def powerbi_summary(client, rng):
+        client.request('GET /api/powerbi/summary', 'GET', '/api/powerbi/summary')
+
+    def powerbi_orders(client, rng):
+        client.request('GET /api/powerbi/orders', 'GET', '/api/powerbi/orders')
+
+    return [
+        (10, dashboard),
+        (35, browse),
+        (30, get_order),
+        (10, put_order),
+        (3, bulk_status),
+        (10, powerbi_summary),
+        (2, powerbi_orders),
+    ]
+
+
+def run_load(base_url: str, users: int, duration: float, think_time: float,
+             timeout: float, seed: int) -> Dict[str, Any]:
+    """Run ``users`` concurrent virtual users for ``duration`` seconds."""
+    probe = json.loads(urllib.request.urlopen(f"{base_url}/api/orders?per_page=1", timeout=timeout).read())
+    max_order_id = probe['orders'][0]['order_id'] if probe['orders'] else 1
+    mix = build_mix(max_order_id, max(1, probe['total'] // 50))
+    weights = [weight for weight, _ in mix]
+    actions = [action for _, action in mix]
+
+    recorder = Recorder()
+    deadline = time.monotonic() + duration
+
+    def user(index: int):
+        rng = random.Random(seed + index)
+        client = Client(base_url, recorder, timeout)
+        while time.monotonic() < deadline:
+            rng.choices(actions, weights)[0](client, rng)
+            if think_time:
+                time.sleep(rng.expovariate(1 / think_time))
+
+    started = time.monotonic()
+    threads = [threading.Thread(target=user, args=(i,), daemon=True) for i in range(users)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return recorder.summary(time.monotonic() - started)
+
+
+def start_server(kind: str, env: Dict[str, str], port: int, workers: Optional[int],
+                 threads: Optional[int]) -> subprocess.Popen:
+    """Start the app in a subprocess and wait until it answers."""
+    env = {**os.environ, **env, 'WEB_PORT': str(port), 'WEB_HOST': '127.0.0.1', 'LOG_LEVEL': 'WARNING'}
+    if kind == 'gunicorn':
+        command = [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py',
+                   '--access-logfile', os.devnull,
+                   '--pid', os.path.join(tempfile.gettempdir(), f'loadtest-{port}.pid')]
+        if workers:
+            command += ['--workers', str(workers)]
+        if threads:
+            command += ['--threads', str(threads)]
+        command.append('web_app:app')
+    else:
+        command = [sys.executable, '-c',
+                   f"from web_app import app; app.run(host='127.0.0.1', port={port}, threaded=True)"]
+    process = subprocess.Popen(command, cwd=PROJECT_ROOT, env=env)
+
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"El servidor terminó con código {process.returncode}")
+        try:
+            urllib.request.urlopen(f"{base_url}/api/orders?per_page=1", timeout=2)
+            return process
+        except (urllib.error.URLError, OSError):
+            time.sleep(0.5)
+    process.terminate()
+    raise TimeoutError("El servidor no respondió en 60s")
+
+
+def print_report(report: Dict[str, Any]):
+    print(f"\n{'endpoint':<34} {'reqs':>7} {'rps':>8} {'p50':>9} {'p95':>9} {'p99':>9} {'errors':>7}")
+    for endpoint, r in report.items():
+        print(f"{endpoint:<34} {r['requests']:>7} {r['throughput_rps']:>8.1f} {r['p50_ms']:>8.1f}ms "
+              f"{r['p95_ms']:>8.1f}ms {r['p99_ms']:>8.1f}ms {r['error_rate']:>7.2%}")
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description="Prueba de carga HTTP de la API")
+    parser.add_argument('--url', help="Probar una instancia ya en ejecución en lugar de levantar una")
+    parser.add_argument('--server', choices=['gunicorn', 'dev'], default='gunicorn')
+    parser.add_argument('--workers', type=int, help="Workers de Gunicorn")
+    parser.add_argument('--threads', type=int, help="Hilos por worker de Gunicorn")
+    parser.add_argument('--configured-db', action='store_true',
+                        help="Usar la base configurada en .env en lugar de un PostgreSQL temporal")
+    parser.add_argument('--rows', type=int, default=200_000)
+    parser.add_argument('--users', type=int, default=20, help="Usuarios concurrentes")
+    parser.add_argument('--duration', type=float, default=30.0, help="Segundos de prueba")
+    parser.add_argument('--think-time', type=float, default=0.0, help="Pausa media entre acciones (s)")
+    parser.add_argument('--timeout', type=float, default=30.0)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help="Guardar el reporte en JSON")
+    return parser.parse_args()
+
+
+def main():
+    args = _parse_args()
+
+    def load(base_url):
+        print(f"🚦 {args.users} usuarios durante {args.duration:.0f}s contra {base_url}")
+        return run_load(base_url, args.users, args.duration, args.think_time, args.timeout, args.seed)
+
+    if args.url:
+        report = load(args.url)
+    else:
+        port = _free_port()
+        if args.configured_db:
+            env = {}
+            pg = None
+        else:
+            pg = LocalPostgres()
+            pg.start()
+            print(f"🐘 PostgreSQL temporal en {pg.host}:{pg.port}; generando {args.rows:,} órdenes...")
+            conn = pg.connect()
+            load_into_postgres(conn, GeneratorConfig(rows=args.rows, seed=args.seed, null_rate=0, negative_rate=0))
+            conn.close()
+            env = pg.env
+        server = None
+        try:
+            server = start_server(args.server, env, port, args.workers, args.threads)
+            report = load(f"http://127.0.0.1:{port}")
+        finally:
+            if server:
+                server.terminate()
+                server.wait(timeout=30)
+            if pg:
+                pg.stop()
+
+    print_report(report)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'config': vars(args), 'results': report}, f, indent=2)
+        print(f"\n💾 Reporte guardado en {args.output}")
+
+
+if __name__ == '__main__':
+    main()
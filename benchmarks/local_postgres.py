@@ -0,0 +1,108 @@
+"""
+Throwaway local PostgreSQL instance for benchmarks and load tests.
+
+Runs ``initdb`` + ``pg_ctl`` from the local PostgreSQL installation into a
+temporary directory on a free port, with durability turned off for speed,
+and deletes everything on exit. Nothing touches the configured database.
+"""
+import os
+import shutil
+import socket
+import subprocess
+import tempfile
+from typing import Optional
+import psycopg2
+
+
+def _find_binary(name: str) -> str:
+    """Locate a PostgreSQL server binary on PATH or via pg_config."""
+    path = shutil.which(name)
+    if path:
+        return path
+    pg_config = shutil.which('pg_config')
+    if pg_config:
+        bindir = subprocess.run([pg_config, '--bindir'], capture_output=True, text=True).stdout.strip()
+        candidate = os.path.join(bindir, name)
+        if os.path.exists(candidate):
+            return candidate
+    raise RuntimeError(f"'{name}' not found; install the PostgreSQL server binaries to run benchmarks")
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class LocalPostgres:
+    """Context manager that starts a disposable PostgreSQL server.
+
+    Example:
+        with LocalPostgres() as pg:
+            pg.apply_to_settings()   # point src.config at the throwaway server
+    """
+
+    def __init__(self, dbname: str = 'benchdb', user: str = 'postgres', port: Optional[int] = None):
+        self.dbname = dbname
+        self.user = user
+        self.port = port or _free_port()
+        self.host = '127.0.0.1'
+        self.data_dir = None
+
+    def __enter__(self) -> 'LocalPostgres':
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def start(self):
+        """Initialize a cluster in a temp dir, start it and create the database."""
+        self.data_dir = tempfile.mkdtemp(prefix='bench-pg-')
+        subprocess.run(
+            [_find_binary('initdb'), '-D', self.data_dir, '-U', self.user, '-A', 'trust', '-E', 'UTF8'],
+            check=True, capture_output=True
+        )
+        options = (f"-p {self.port} -k {self.data_dir} -c listen_addresses={self.host} "
+                   "-c fsync=off -c synchronous_commit=off -c full_page_writes=off")
+        subprocess.run(
+            [_find_binary('pg_ctl'), '-D', self.data_dir, '-o', options, '-w',
+             '-l', os.path.join(self.data_dir, 'server.log'), 'start'],
+            check=True, capture_output=True
+        )
+        conn = psycopg2.connect(host=self.host, port=self.port, user=self.user, dbname='postgres')
+        conn.autocommit = True
+        with conn.cursor() as cursor:
+            cursor.execute(f'CREATE DATABASE "{self.dbname}"')
+        conn.close()
+
+    def stop(self):
+        """Stop the server and remove its data directory."""
+        if not self.data_dir:
+            return
+        subprocess.run([_find_binary('pg_ctl'), '-D', self.data_dir, '-m', 'immediate', 'stop'],
+                       capture_output=True)
+        shutil.rmtree(self.data_dir, ignore_errors=True)
+        self.data_dir = None
+
+    def connect(self) -> psycopg2.extensions.connection:
+        """Open a plain psycopg2 connection to the benchmark database."""
+        return psycopg2.connect(host=self.host, port=self.port, user=self.user, dbname=self.dbname)
+
+    @property
+    def env(self) -> dict:
+        """Environment variables for a subprocess (e.g. a web server) using this database."""
+        return {'PG_HOST': self.host, 'PG_PORT': str(self.port), 'PG_DB': self.dbname,
+                'PG_USER': self.user, 'PG_PASS': ''}
+
+    def apply_to_settings(self):
+        """Point the application's global database settings at this server."""
+        from src.config.settings import db_settings
+        from src.database.connection import db_connection
+
+        db_settings.host = self.host
+        db_settings.port = self.port
+        db_settings.name = self.dbname
+        db_settings.user = self.user
+        db_settings.password = ''
+        db_connection.dispose()
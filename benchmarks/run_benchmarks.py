@@ -0,0 +1,357 @@
+"""
+Repeatable benchmarks for every OrderService method and web_app.py endpoint.
+
+By default a throwaway PostgreSQL is started and filled with synthetic
+orders; each case is run ``--repeat`` times after ``--warmup`` runs and
+reported as latency percentiles, throughput and peak RSS. Results are
+saved as JSON and can be compared against a previous run to catch
+regressions.
+
+Usage:
+    python -m benchmarks.run_benchmarks --rows 1000000 --output benchmarks/results/base.json
+    python -m benchmarks.run_benchmarks --rows 1000000 --compare benchmarks/results/base.json
+    python -m benchmarks.run_benchmarks --configured-db --only api/orders
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+# Keep benchmark output readable; must be set before src.* configures logging
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.datagen import GeneratorConfig, load_into_postgres
+from benchmarks.local_postgres import LocalPostgres
+
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+SAMPLE_ORDER = {
+    'status': 'Order Finished', 'customer_name': 'Benchmark Customer', 'order_date': '2024-05-01',
+    'quantity': 3, 'subtotal_amount': 1500.00, 'tax_rate': 0.05, 'shipping_cost': 120.00,
+    'category': 'Technology', 'subcategory': 'Computer Peripherals',
+}
+
+
+class RssSampler:
+    """Track the peak resident set size of this process while active."""
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    @staticmethod
+    def current_rss() -> int:
+        """Current RSS in bytes (psutil if installed, else /proc, else ru_maxrss)."""
+        try:
+            import psutil
+            return psutil.Process().memory_info().rss
+        except ImportError:
+            pass
+        try:
+            with open('/proc/self/statm') as statm:
+                return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+        except (OSError, ValueError):
+            import resource
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, self.current_rss())
+            time.sleep(self.interval)
+
+    def __enter__(self) -> 'RssSampler':
+        self.peak = self.current_rss()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, self.current_rss())
+
+
+@dataclass
+class Case:
+    """One benchmark: ``run(setup())`` is timed, ``setup`` is not."""
+    name: str
+    run: Callable[[Any], Any]
+    setup: Optional[Callable[[], Any]] = None
+    route: Optional[str] = None
+    method: str = 'GET'
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Linear-interpolated percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    position = (len(sorted_values) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def measure(case: Case, repeat: int, warmup: int) -> Dict[str, Any]:
+    """Run a case and summarize its latency, throughput and memory."""
+    for _ in range(warmup):
+        case.run(case.setup() if case.setup else None)
+
+    latencies = []
+    with RssSampler() as rss:
+        for _ in range(repeat):
+            argument = case.setup() if case.setup else None
+            started = time.perf_counter()
+            case.run(argument)
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    ordered = sorted(latencies)
+    total_seconds = sum(latencies) / 1000
+    return {
+        'runs': repeat,
+        'p50_ms': round(percentile(ordered, 0.50), 3),
+        'p95_ms': round(percentile(ordered, 0.95), 3),
+        'p99_ms': round(percentile(ordered, 0.99), 3),
+        'mean_ms': round(sum(ordered) / len(ordered), 3),
+        'min_ms': round(ordered[0], 3),
+        'max_ms': round(ordered[-1], 3),
+        'throughput_ops_s': round(repeat / total_seconds, 3) if total_seconds else None,
+        'peak_rss_mb': round(rss.peak / (1024 * 1024), 1),
+    }
+
+
+def service_cases(service, sample_id: int) -> List[Case]:
+    """One case per public OrderService method."""
+    return [
+        Case('service.get_all_orders', lambda _: service.get_all_orders()),
+        Case('service.get_orders_by_status', lambda _: service.get_orders_by_status('Order Finished')),
+        Case('service.get_orders_dataframe', lambda _: service.get_orders_dataframe()),
+        Case('service.clean_duplicate_orders', lambda _: service.clean_duplicate_orders()),
+        Case('service.clean_incomplete_records', lambda _: service.clean_incomplete_records()),
+        Case('service.validate_data_types', lambda _: service.validate_data_types()),
+        Case('service.get_data_quality_report', lambda _: service.get_data_quality_report()),
+        Case('service.update_order', lambda _: service.update_order(sample_id, {'status': 'Order Finished'})),
+    ]
+
+
+def _check(response, expected=(200,)):
+    if response.status_code not in expected:
+        raise RuntimeError(f"{response.request.method} {response.request.path} -> {response.status_code}: "
+                           f"{response.get_data(as_text=True)[:200]}")
+    return response
+
+
+def _wait_for_job(client, job_id: str, timeout: float = 600.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = client.get(f'/api/jobs/{job_id}').get_json()
+        if job['status'] in ('succeeded', 'failed'):
+            return job
+        time.sleep(0.05)
+    raise TimeoutError(f"Job {job_id} did not finish in {timeout}s")
+
+
+def endpoint_cases(client, sample_id: int) -> List[Case]:
+    """One case per route and method of the Flask app."""
+
+    def create_order(_=None):
+        return _check(client.post('/api/orders', json=SAMPLE_ORDER), (201,)).get_json()['order_id']
+
+    def finished_export_job():
+        job_id = _check(client.post('/api/jobs', json={'type': 'export_csv'}), (202,)).get_json()['job_id']
+        _wait_for_job(client, job_id)
+        return job_id
+
+    def submitted_job():
+        return _check(client.post('/api/jobs', json={'type': 'validate'}), (202,)).get_json()['job_id']
+
+    def get(path, **kwargs):
+        return lambda _: _check(client.get(path, **kwargs))
+
+    return [
+        Case('GET /', get('/'), route='/'),
+        Case('GET /api/dashboard/stats', get('/api/dashboard/stats'), route='/api/dashboard/stats'),
+        Case('GET /api/data-quality/report', get('/api/data-quality/report'), route='/api/data-quality/report'),
+        Case('GET /api/data-cleaning/duplicates', get('/api/data-cleaning/duplicates'),
+             route='/api/data-cleaning/duplicates'),
+        Case('GET /api/data-cleaning/incomplete', get('/api/data-cleaning/incomplete'),
+             route='/api/data-cleaning/incomplete'),
+        Case('GET /api/data-cleaning/validate', get('/api/data-cleaning/validate'),
+             route='/api/data-cleaning/validate'),
+        Case('GET /api/orders (page 1)', get('/api/orders?page=1&per_page=50'), route='/api/orders'),
+        Case('GET /api/orders (deep page, filtered)',
+             get('/api/orders?page=200&per_page=50&status=Order+Finished&category=Technology'),
+             route='/api/orders'),
+        Case('GET /api/export/csv', get('/api/export/csv'), route='/api/export/csv'),
+        Case('GET /api/powerbi/orders', get('/api/powerbi/orders'), route='/api/powerbi/orders'),
+        Case('GET /api/powerbi/summary', get('/api/powerbi/summary'), route='/api/powerbi/summary'),
+        Case('GET /api/orders/<id>', get(f'/api/orders/{sample_id}'), route='/api/orders/<int:order_id>'),
+        Case('PUT /api/orders/<id>', lambda _: _check(client.put(f'/api/orders/{sample_id}', json=SAMPLE_ORDER)),
+             route='/api/orders/<int:order_id>', method='PUT'),
+        Case('PATCH /api/orders/<id>/status',
+             lambda _: _check(client.patch(f'/api/orders/{sample_id}/status', json={'status': 'Order Finished'})),
+             route='/api/orders/<int:order_id>/status', method='PATCH'),
+        Case('PATCH /api/orders/bulk-status',
+             lambda _: _check(client.patch('/api/orders/bulk-status', json={
+                 'order_ids': list(range(sample_id, sample_id + 100)), 'status': 'Order Finished'})),
+             route='/api/orders/bulk-status', method='PATCH'),
+        Case('POST /api/orders', create_order, route='/api/orders', method='POST'),
+        Case('DELETE /api/orders/<id>', lambda order_id: _check(client.delete(f'/api/orders/{order_id}')),
+             setup=create_order, route='/api/orders/<int:order_id>', method='DELETE'),
+        Case('POST /api/jobs', lambda _: submitted_job(), route='/api/jobs', method='POST'),
+        Case('GET /api/jobs', get('/api/jobs'), route='/api/jobs'),
+        Case('GET /api/jobs/<id>', lambda job_id: _check(client.get(f'/api/jobs/{job_id}')),
+             setup=submitted_job, route='/api/jobs/<job_id>'),
+        Case('GET /api/jobs/<id>/download', lambda job_id: _check(client.get(f'/api/jobs/{job_id}/download')),
+             setup=finished_export_job, route='/api/jobs/<job_id>/download'),
+    ]
+
+
+def uncovered_routes(app, cases: List[Case]) -> List[str]:
+    """Routes of the app (method + rule) that no case exercises."""
+    covered = {(case.method, case.route) for case in cases if case.route}
+    missing = []
+    for rule in app.url_map.iter_rules():
+        if rule.endpoint == 'static':
+            continue
+        for method in sorted(rule.methods - {'HEAD', 'OPTIONS'}):
+            if (method, rule.rule) not in covered:
+                missing.append(f"{method} {rule.rule}")
+    return missing
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """Print a comparison table and return the names of regressed cases."""
+    regressions = []
+    print(f"\n{'case':<45} {'p50 base':>10} {'p50 now':>10} {'Δ':>8} {'RSS base':>9} {'RSS now':>9}")
+    for name, now in current['results'].items():
+        base = baseline['results'].get(name)
+        if not base:
+            print(f"{name:<45} {'-':>10} {now['p50_ms']:>10.2f}      new")
+            continue
+        delta = (now['p50_ms'] - base['p50_ms']) / base['p50_ms'] if base['p50_ms'] else 0.0
+        rss_delta = (now['peak_rss_mb'] - base['peak_rss_mb']) / base['peak_rss_mb'] if base['peak_rss_mb'] else 0.0
+        flag = ''
+        if delta > threshold or rss_delta > threshold:
+            flag = '  REGRESSION'
+            regressions.append(name)
+        print(f"{name:<45} {base['p50_ms']:>10.2f} {now['p50_ms']:>10.2f} {delta:>+8.1%} "
+              f"{base['peak_rss_mb']:>9.1f} {now['peak_rss_mb']:>9.1f}{flag}")
+    return regressions
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args) -> Dict[str, Any]:
+    """Prepare the database, run the selected cases and collect results."""
+    from src.database.connection import db_connection
+    from src.services.order_service import OrderService
+    import web_app
+
+    service = OrderService()
+    sample_id = int(db_connection.execute_query("SELECT MIN(order_id) AS id FROM orders")[0]['id'])
+    client = web_app.app.test_client()
+
+    cases = service_cases(service, sample_id) + endpoint_cases(client, sample_id)
+    for route in uncovered_routes(web_app.app, cases):
+        print(f"⚠️  Sin benchmark: {route}")
+    if args.only:
+        cases = [case for case in cases if any(pattern in case.name for pattern in args.only)]
+
+    results = {}
+    for case in cases:
+        print(f"▶ {case.name} ...", end=' ', flush=True)
+        results[case.name] = measure(case, args.repeat, args.warmup)
+        r = results[case.name]
+        print(f"p50={r['p50_ms']:.1f}ms p95={r['p95_ms']:.1f}ms p99={r['p99_ms']:.1f}ms "
+              f"{r['throughput_ops_s']} ops/s rss={r['peak_rss_mb']}MB")
+
+    return {
+        'meta': {
+            'timestamp': datetime.now().isoformat(),
+            'commit': _git_commit(),
+            'rows': args.rows if not args.configured_db else None,
+            'seed': args.seed,
+            'repeat': args.repeat,
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'cpus': os.cpu_count(),
+        },
+        'results': results,
+    }
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description="Benchmarks de OrderService y de la API Flask")
+    parser.add_argument('--rows', type=int, default=100_000, help="Filas sintéticas (hasta 10M)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--duplicate-rate', type=float, default=0.01)
+    parser.add_argument('--null-rate', type=float, default=0.0,
+                        help="Nulos inyectados (> 0 crea la tabla sin restricciones NOT NULL)")
+    parser.add_argument('--negative-rate', type=float, default=0.0,
+                        help="Negativos inyectados (> 0 crea la tabla sin restricciones CHECK)")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--warmup', type=int, default=1)
+    parser.add_argument('--only', nargs='*', help="Ejecutar solo los casos cuyo nombre contenga alguno de estos textos")
+    parser.add_argument('--configured-db', action='store_true',
+                        help="Usar la base configurada en .env en lugar de un PostgreSQL temporal")
+    parser.add_argument('--output', help="Archivo JSON de resultados (por defecto benchmarks/results/<fecha>.json)")
+    parser.add_argument('--compare', help="Resultados previos contra los que comparar")
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help="Aumento relativo de p50 o RSS considerado regresión (0.10 = 10%%)")
+    return parser.parse_args()
+
+
+def main():
+    args = _parse_args()
+
+    if args.configured_db:
+        report = run(args)
+    else:
+        with LocalPostgres() as pg:
+            print(f"🐘 PostgreSQL temporal en {pg.host}:{pg.port}; generando {args.rows:,} órdenes...")
+            conn = pg.connect()
+            started = time.perf_counter()
+            load_into_postgres(conn, GeneratorConfig(
+                rows=args.rows, seed=args.seed, duplicate_rate=args.duplicate_rate,
+                null_rate=args.null_rate, negative_rate=args.negative_rate
+            ))
+            conn.close()
+            print(f"   cargadas en {time.perf_counter() - started:.1f}s")
+            pg.apply_to_settings()
+            report = run(args)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n💾 Resultados guardados en {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regresiones por encima de {args.threshold:.0%}")
+            sys.exit(1)
+        print("\n✅ Sin regresiones")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,37 @@
+"""
+Genera los assets estáticos para producción: minifica (con el paquete
+opcional ``rjsmin``), agrega huella de contenido y precomprime (gzip y, si
+está instalado, brotli) los archivos de ``static/``. Gunicorn lo ejecuta
+automáticamente al arrancar.
+
+Uso:
+    python build_assets.py
+    python build_assets.py --force
+"""
+import argparse
+import os
+
+from src.utils.assets import DIST_DIR, STATIC_DIR, build_assets, rjsmin
+from src.utils.compression import brotli
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generar assets estáticos con huella y precomprimidos")
+    parser.add_argument('--force', action='store_true', help="Regenerar aunque no haya cambios")
+    args = parser.parse_args()
+
+    manifest = build_assets(force=args.force)
+    for source, built in manifest.items():
+        original = os.path.getsize(os.path.join(STATIC_DIR, source))
+        print(f"📦 {source} -> dist/{built}")
+        etiqueta = 'minificado' if rjsmin is not None else "sin minificar (instala 'rjsmin')"
+        print(f"   original {original:,} B | {etiqueta} {os.path.getsize(os.path.join(DIST_DIR, built)):,} B"
+              f" | gzip {os.path.getsize(os.path.join(DIST_DIR, built + '.gz')):,} B", end='')
+        if brotli is not None:
+            print(f" | brotli {os.path.getsize(os.path.join(DIST_DIR, built + '.br')):,} B")
+        else:
+            print("  (instala 'brotli' para generar variantes .br)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+"""
+Verifica que el backend analítico embebido (DuckDB sobre el snapshot Parquet)
+devuelve los mismos resultados que pandas/PostgreSQL sobre la base actual:
+reporte de calidad exacto, detección de duplicados, agregados del dashboard y
+estadísticas por columna. Muestra además el tiempo de cada backend.
+
+Uso:
+    python check_analytics_parity.py
+
+Sale con código 1 si encuentra alguna diferencia.
+"""
+import math
+import sys
+import time
+
+from src.services.order_service import OrderService
+from src.services.statistics_engine import STATS_COLUMNS, StatisticsEngine
+from src.utils.logger import setup_logging
+
+
+# Campos de las estadísticas por columna que no dependen del orden de las filas
+EXACT_STATS_FIELDS = ['count', 'nulls', 'min', 'max', 'distinct_estimate']
+
+
+def cronometrar(nombre, funcion, *args, **kwargs):
+    inicio = time.perf_counter()
+    resultado = funcion(*args, **kwargs)
+    print(f"   ⏱️  {nombre}: {time.perf_counter() - inicio:.2f} s")
+    return resultado
+
+
+def comparar(nombre, esperado, obtenido, diferencias):
+    if esperado == obtenido:
+        print(f"   ✅ {nombre}")
+    else:
+        print(f"   ❌ {nombre}\n      pandas: {esperado}\n      duckdb: {obtenido}")
+        diferencias.append(nombre)
+
+
+def comparar_top(nombre, esperado, obtenido, diferencias):
+    """Top N por conteo: con empates en el corte, ambos pueden elegir valores distintos."""
+    mismos_conteos = sorted(esperado.values()) == sorted(obtenido.values())
+    comunes = all(esperado[valor] == obtenido[valor] for valor in esperado.keys() & obtenido.keys())
+    comparar(nombre, True, mismos_conteos and comunes, diferencias)
+
+
+def comparar_reporte(servicio, diferencias):
+    print("\n📋 Reporte de calidad exacto")
+    pandas_report = cronometrar('pandas', servicio.get_data_quality_report, backend='pandas')
+    duckdb_report = cronometrar('duckdb', servicio.get_data_quality_report, backend='duckdb')
+    for campo in ('total_records', 'total_columns', 'null_values', 'duplicate_records', 'data_completeness'):
+        comparar(campo, pandas_report[campo], duckdb_report[campo], diferencias)
+    comparar('value_distributions.status', pandas_report['value_distributions'].get('status'),
+             duckdb_report['value_distributions']['status'], diferencias)
+    comparar_top('value_distributions.category', pandas_report['value_distributions'].get('category', {}),
+                 duckdb_report['value_distributions']['category'], diferencias)
+
+
+def comparar_estadisticas(servicio, diferencias):
+    # Se recalculan en ambos lados: el reporte las toma del almacén compartido
+    print("\n📈 Estadísticas por columna")
+    frame = servicio.get_orders_dataframe(STATS_COLUMNS)
+    pandas_stats = cronometrar('pandas', lambda: _engine(frame).summary())
+    duckdb_stats = cronometrar('duckdb', lambda: _engine_batches(servicio).summary())
+    for columna in STATS_COLUMNS:
+        esperado = {campo: pandas_stats[columna].get(campo) for campo in EXACT_STATS_FIELDS}
+        obtenido = {campo: duckdb_stats[columna].get(campo) for campo in EXACT_STATS_FIELDS}
+        comparar(f"{columna} (conteos y extremos)", esperado, obtenido, diferencias)
+        if 'mean' in pandas_stats[columna]:
+            iguales = math.isclose(pandas_stats[columna]['mean'], duckdb_stats[columna]['mean'], rel_tol=1e-9)
+            comparar(f"{columna} (media)", True, iguales, diferencias)
+
+
+def _engine(frame):
+    engine = StatisticsEngine()
+    engine.consume(frame)
+    return engine
+
+
+def _engine_batches(servicio):
+    engine = StatisticsEngine()
+    for batch in servicio.embedded_analytics.column_batches(STATS_COLUMNS):
+        engine.consume(batch)
+    return engine
+
+
+def comparar_duplicados(servicio, diferencias):
+    print("\n🔍 Detección de duplicados")
+    pandas_result = cronometrar('pandas', servicio.clean_duplicate_orders, backend='pandas')
+    duckdb_result = cronometrar('duckdb', servicio.clean_duplicate_orders, backend='duckdb')
+    comparar('total_records', pandas_result.total_records, duckdb_result.total_records, diferencias)
+    comparar('duplicates_found', pandas_result.cleaned_records, duckdb_result.cleaned_records, diferencias)
+    comparar('duplicate_examples', pandas_result.cleaning_summary.get('duplicate_examples'),
+             duckdb_result.cleaning_summary.get('duplicate_examples'), diferencias)
+
+
+def _normalizar_dashboard(total, status_stats, category_stats, year_stats):
+    return {
+        'total': int(total),
+        'status': {item['status']: int(item['count']) for item in status_stats},
+        'category': {item['category']: (int(item['count']), item['total_amount']) for item in category_stats},
+        'year': [(int(item['year']), int(item['count']), item['total_amount']) for item in year_stats],
+    }
+
+
+def comparar_dashboard(servicio, diferencias):
+    print("\n📊 Agregados del dashboard")
+    esperado = _normalizar_dashboard(*cronometrar('postgresql', servicio.get_dashboard_rollups, backend='pandas'))
+    obtenido = _normalizar_dashboard(*cronometrar('duckdb', servicio.get_dashboard_rollups, backend='duckdb'))
+    for campo in esperado:
+        comparar(campo, esperado[campo], obtenido[campo], diferencias)
+
+
+def main():
+    setup_logging()
+    servicio = OrderService()
+    print("🔄 Preparando snapshot Parquet de orders...")
+    # min_age=0: comparar contra los datos actuales, no contra un snapshot reciente
+    version, ruta = cronometrar('snapshot', servicio.embedded_analytics.snapshot, min_age=0)
+    print(f"   {ruta} (versión {version})")
+
+    diferencias = []
+    comparar_reporte(servicio, diferencias)
+    comparar_estadisticas(servicio, diferencias)
+    comparar_duplicados(servicio, diferencias)
+    comparar_dashboard(servicio, diferencias)
+
+    if diferencias:
+        print(f"\n❌ {len(diferencias)} diferencias: {', '.join(diferencias)}")
+        sys.exit(1)
+    print("\n✅ Ambos backends producen los mismos resultados")
+
+
+if __name__ == '__main__':
+    main()
@@ -10,11 +10,12 @@ sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
 from src.database.connection import db_connection
 from src.services.order_service import OrderService
-from src.utils.logger import logger
+from src.utils.logger import logger, setup_logging
 
 
 def demo_completo():
     """Demo completo de todas las funcionalidades del proyecto."""
+    setup_logging()
     print("🚀" + "=" * 60)
     print("   DEMO COMPLETO - PROYECTO DE LIMPIEZA DE DATOS")
     print("=" * 62)
@@ -100,16 +101,11 @@ def demo_completo():
         # 9. Análisis temporal
         print("\n9️⃣ ANÁLISIS TEMPORAL")
         print("-" * 50)
-        year_query = """
-        SELECT EXTRACT(YEAR FROM order_date) as year, COUNT(*) as orders, SUM(subtotal_amount) as total
-        FROM orders 
-        GROUP BY EXTRACT(YEAR FROM order_date)
-        ORDER BY year
-        """
-        years = db_connection.execute_query(year_query)
+        # Consulta preparada: un rango de order_date por año (poda particiones)
+        years = db_connection.execute_prepared('year_stats')
         print("📅 Órdenes por año:")
         for year_data in years:
-            print(f"   {int(year_data['year'])}: {year_data['orders']} órdenes, ${year_data['total']:,.0f}")
+            print(f"   {int(year_data['year'])}: {year_data['count']} órdenes, ${year_data['total_amount']:,.0f}")
         
         # 10. Resumen final
         print("\n🔟 RESUMEN FINAL")
@@ -0,0 +1,88 @@
+"""
+Configuración de Gunicorn para servir la aplicación web en producción.
+
+Uso:
+    gunicorn -c gunicorn.conf.py web_app:app
+    python start_web_app.py --prod
+
+Recarga elegante de workers: kill -HUP $(cat logs/gunicorn.pid)
+"""
+import multiprocessing
+import os
+import subprocess
+import sys
+
+from src.config.settings import job_settings, server_settings
+
+bind = f"{server_settings.bind_host}:{server_settings.bind_port}"
+
+# Pre-fork: N procesos worker, cada uno con un pool de hilos
+workers = server_settings.workers or multiprocessing.cpu_count() * 2 + 1
+threads = server_settings.threads
+worker_class = "gthread"
+
+# Cargar la app en el master antes de hacer fork: los imports (pandas, etc.)
+# se comparten copy-on-write entre workers
+preload_app = server_settings.preload
+
+timeout = server_settings.timeout
+graceful_timeout = server_settings.graceful_timeout
+max_requests = server_settings.max_requests
+max_requests_jitter = server_settings.max_requests_jitter
+
+pidfile = server_settings.pid_file
+accesslog = "-"
+errorlog = "-"
+
+
+def on_starting(server):
+    """Preparar el master antes de crear los workers.
+
+    Genera los assets estáticos con huella (minificados y precomprimidos) y,
+    con preload, carga los módulos pesados que la app importa de forma diferida.
+    """
+    from src.utils.assets import build_assets
+
+    manifest = build_assets()
+    server.log.info(f"Assets estáticos: {', '.join(manifest.values())}")
+
+    if preload_app:
+        import pandas  # noqa: F401
+        import src.services.quality_rules  # noqa: F401
+
+
+def when_ready(server):
+    """Con JOB_RUNNER=process, arrancar el proceso que ejecuta las tareas.
+
+    Queda fuera de los workers: el reciclado por max_requests o una recarga
+    no interrumpe las tareas en curso.
+    """
+    if job_settings.runner != "process":
+        return
+    project_dir = os.path.dirname(os.path.abspath(__file__))
+    server.job_runner = subprocess.Popen([sys.executable, os.path.join(project_dir, "run_jobs.py")], cwd=project_dir)
+    server.log.info(f"Proceso de tareas en segundo plano: {server.job_runner.pid}")
+
+
+def on_exit(server):
+    """Detener el proceso de tareas dejando terminar las que están en curso."""
+    runner = getattr(server, "job_runner", None)
+    if runner is None or runner.poll() is not None:
+        return
+    runner.terminate()
+    try:
+        runner.wait(timeout=graceful_timeout)
+    except subprocess.TimeoutExpired:
+        server.log.warning("El proceso de tareas no terminó a tiempo; se detiene a la fuerza")
+        runner.kill()
+
+
+def post_fork(server, worker):
+    """Cada worker crea su propio pool, dimensionado a sus hilos."""
+    from src.database.connection import db_connection
+
+    # worker.cfg refleja también los overrides de línea de comandos (--threads)
+    pool_size = worker.cfg.threads
+    db_connection.dispose()
+    db_connection.pool_max_size = pool_size
+    server.log.info(f"Worker {worker.pid}: pool de {pool_size} conexiones")
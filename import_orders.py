@@ -0,0 +1,75 @@
+"""
+Importa órdenes desde un CSV (o .csv.gz) con el formato de /api/export/csv.
+
+El archivo se procesa en streaming por lotes (memoria acotada sin importar su
+tamaño): validación, ``COPY`` a una tabla de staging y merge en ``orders``
+que omite las órdenes ya existentes. Cada lote se confirma junto con su
+checkpoint, así que volver a ejecutar el mismo comando tras una interrupción
+continúa donde quedó. Las filas inválidas se escriben en un archivo de
+rechazos.
+
+Uso:
+    python import_orders.py ordenes.csv.gz
+    python import_orders.py ordenes.csv --lote 100000 --rechazos rechazos.csv
+    zcat ordenes.csv.gz | python import_orders.py - --import-id carga-2024-06
+"""
+import argparse
+import sys
+import time
+
+from src.database.connection import db_connection
+from src.services.order_import import OrderImport, file_import_id, open_csv_stream
+from src.utils.logger import setup_logging
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Importar órdenes desde un CSV en streaming")
+    parser.add_argument('archivo', help="Ruta del CSV (.csv o .csv.gz) o '-' para leer de la entrada estándar")
+    parser.add_argument('--import-id',
+                        help="Identificador para reanudar (por defecto se deriva de la ruta, tamaño y fecha del archivo)")
+    parser.add_argument('--lote', type=int, help="Filas por lote (por defecto IMPORT_CHUNK_ROWS)")
+    parser.add_argument('--rechazos', help="Archivo de rechazos (por defecto IMPORT_REJECTS_DIR/<id>.rejects.csv)")
+    parser.add_argument('--sin-dedupe', action='store_true',
+                        help="Solo descartar order_id repetidos, no órdenes con la misma clave de negocio")
+    args = parser.parse_args()
+
+    if args.archivo == '-':
+        if not args.import_id:
+            parser.error("--import-id es obligatorio al leer de la entrada estándar")
+        stream, import_id = sys.stdin.buffer, args.import_id
+    else:
+        stream, import_id = open(args.archivo, 'rb'), args.import_id or file_import_id(args.archivo)
+
+    setup_logging()
+    importer = OrderImport(db_connection, import_id=import_id, source=args.archivo,
+                           rejects_path=args.rechazos, chunk_rows=args.lote, dedupe=not args.sin_dedupe)
+    start = time.perf_counter()
+
+    def progress(summary):
+        elapsed = time.perf_counter() - start
+        rate = (summary['received'] - summary['resumed_from']) / elapsed if elapsed else 0
+        print(f"   {summary['received']:,} filas leídas | {summary['inserted']:,} insertadas | "
+              f"{summary['duplicates']:,} duplicadas | {summary['rejected']:,} rechazadas | {rate:,.0f} filas/s")
+
+    print(f"📥 Importando {args.archivo} (id {import_id})")
+    try:
+        with stream:
+            summary = importer.run(open_csv_stream(stream), progress)
+    except Exception as e:
+        print(f"❌ Importación interrumpida: {e}")
+        print("   Vuelve a ejecutar el mismo comando para continuar desde el último lote confirmado")
+        sys.exit(1)
+
+    if summary.get('already_completed'):
+        print("ℹ️  Este archivo ya se importó por completo")
+    elif summary['resumed_from']:
+        print(f"↪️  Reanudada tras {summary['resumed_from']:,} filas")
+    print(f"✅ {summary['inserted']:,} órdenes insertadas de {summary['received']:,} filas "
+          f"({summary['duplicates']:,} ya existían, {summary['rejected']:,} rechazadas) "
+          f"en {time.perf_counter() - start:.1f} s")
+    if summary['rejects_file']:
+        print(f"📄 Filas rechazadas: {summary['rejects_file']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -8,13 +8,14 @@ from typing import Dict, Any
 # Add src to path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
-from src.utils.logger import logger
+from src.utils.logger import logger, setup_logging
 from src.database.connection import db_connection
 from src.services.order_service import OrderService
 
 
 def main():
     """Main application function."""
+    setup_logging()
     logger.info("Starting data cleaning application")
     
     try:
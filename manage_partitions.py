@@ -0,0 +1,95 @@
+"""
+Mantenimiento del particionado por año de la tabla ``orders``.
+
+Uso:
+    python manage_partitions.py migrar [--anios-futuros 1]
+    python manage_partitions.py estado
+    python manage_partitions.py crear [--anios 2]
+    python manage_partitions.py archivar --antes-de 2015 [--csv archivo/] [--eliminar]
+
+``crear`` es idempotente: conviene programarlo (cron) para que la partición
+del año siguiente exista antes de que lleguen sus órdenes.
+"""
+import argparse
+import sys
+
+from src.database.connection import db_connection
+from src.database.partitioning import (
+    archive_partitions, ensure_partitions, is_partitioned, list_partitions, migrate_to_partitioned
+)
+from src.services.data_version import bump_data_version
+
+
+def cmd_migrar(args):
+    result = migrate_to_partitioned(db_connection, years_ahead=args.anios_futuros)
+    bump_data_version('orders')
+    print(f"✅ orders particionada por año ({result['first_year']}-{result['last_year']}), "
+          f"{result['rows']:,} filas copiadas")
+    print(f"   Índices recreados: {', '.join(result['indexes']) or 'ninguno'}")
+    print(f"   Tabla original conservada como {result['old_table']}: elimínala cuando verifiques los datos")
+
+
+def cmd_estado(args):
+    if not is_partitioned(db_connection):
+        print("ℹ️  orders no está particionada (ejecuta 'migrar')")
+        return
+    print("📂 Particiones de orders:")
+    for partition in list_partitions(db_connection):
+        print(f"   {partition['partition']:<16} ~{partition['estimated_rows']:>10,} filas "
+              f"{partition['total_bytes'] / 1024 / 1024:>9.1f} MB  {partition['bounds']}")
+
+
+def cmd_crear(args):
+    created = ensure_partitions(db_connection, years_ahead=args.anios)
+    if created:
+        bump_data_version('orders')
+        print(f"✅ Particiones creadas: {', '.join(created)}")
+    else:
+        print("✅ Todas las particiones ya existen")
+
+
+def cmd_archivar(args):
+    archived = archive_partitions(db_connection, args.antes_de, export_dir=args.csv, drop=args.eliminar)
+    if not archived:
+        print(f"ℹ️  No hay particiones anteriores a {args.antes_de}")
+        return
+    bump_data_version('orders')
+    for item in archived:
+        destino = 'eliminada' if item['dropped'] else 'movida al esquema archive'
+        exportado = f", exportada a {item['exported_to']}" if item['exported_to'] else ''
+        print(f"📦 {item['partition']}: {destino}{exportado}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Particionado por año de la tabla orders")
+    subparsers = parser.add_subparsers(dest='comando', required=True)
+
+    migrar = subparsers.add_parser('migrar', help="Convertir orders en tabla particionada por año")
+    migrar.add_argument('--anios-futuros', type=int, default=1,
+                        help="Años posteriores al actual con partición creada (por defecto 1)")
+    migrar.set_defaults(func=cmd_migrar)
+
+    estado = subparsers.add_parser('estado', help="Listar particiones, filas estimadas y tamaño")
+    estado.set_defaults(func=cmd_estado)
+
+    crear = subparsers.add_parser('crear', help="Crear las particiones de los próximos años")
+    crear.add_argument('--anios', type=int, default=2, help="Años hacia adelante (por defecto 2)")
+    crear.set_defaults(func=cmd_crear)
+
+    archivar = subparsers.add_parser('archivar', help="Separar las particiones antiguas de orders")
+    archivar.add_argument('--antes-de', type=int, required=True, help="Archivar los años anteriores a este")
+    archivar.add_argument('--csv', help="Directorio donde exportar cada partición como .csv.gz")
+    archivar.add_argument('--eliminar', action='store_true',
+                          help="Eliminar las particiones en lugar de moverlas (requiere --csv)")
+    archivar.set_defaults(func=cmd_archivar)
+
+    args = parser.parse_args()
+    try:
+        args.func(args)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
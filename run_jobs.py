@@ -0,0 +1,36 @@
+"""
+Proceso que ejecuta las tareas en segundo plano (``/api/jobs`` y las rutas
+síncronas pesadas) fuera de los workers web.
+
+Con ``JOB_RUNNER=process`` los workers solo encolan las tareas en el almacén
+SQLite y este proceso las toma y las ejecuta con ``JOB_MAX_WORKERS`` hilos.
+Gunicorn lo arranca y lo detiene solo (ver ``gunicorn.conf.py``); sin
+Gunicorn (p. ej. con el servidor ASGI) hay que ejecutarlo aparte.
+
+Uso:
+    python run_jobs.py
+
+Con SIGTERM o Ctrl+C deja de tomar tareas nuevas y espera a que terminen las
+que están en curso.
+"""
+import signal
+import threading
+
+from src.utils.logger import setup_logging
+
+
+def main():
+    setup_logging()
+    # Las tareas se registran al importar la aplicación
+    from web_app import job_service
+
+    stop = threading.Event()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, lambda *_: stop.set())
+
+    print(f"⚙️  Ejecutando tareas en segundo plano: {', '.join(job_service.kinds)}")
+    job_service.run_forever(stop)
+
+
+if __name__ == '__main__':
+    main()
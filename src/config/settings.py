@@ -2,7 +2,7 @@
 Configuration settings for the database connection and application.
 """
 import os
-from typing import Optional
+from typing import List, Optional
 from pydantic import Field
 from pydantic_settings import BaseSettings
 
@@ -10,18 +10,37 @@ from pydantic_settings import BaseSettings
 class DatabaseSettings(BaseSettings):
     """Database configuration settings."""
     
-    host: str = Field(default="localhost", env="PG_HOST")
-    port: int = Field(default=5432, env="PG_PORT")
-    name: str = Field(default="DropshipingDB", env="PG_DB")
-    user: str = Field(default="postgres", env="PG_USER")
-    password: str = Field(default="postgres", env="PG_PASS")
-    db_schema: str = Field(default="public", env="PG_SCHEMA_RAW")
+    host: str = Field(default="localhost", validation_alias="PG_HOST")
+    port: int = Field(default=5432, validation_alias="PG_PORT")
+    name: str = Field(default="DropshipingDB", validation_alias="PG_DB")
+    user: str = Field(default="postgres", validation_alias="PG_USER")
+    password: str = Field(default="postgres", validation_alias="PG_PASS")
+    db_schema: str = Field(default="public", validation_alias="PG_SCHEMA_RAW")
+    pool_max_size: int = Field(default=10, validation_alias="PG_POOL_MAX")
+    pool_timeout: float = Field(default=30.0, validation_alias="PG_POOL_TIMEOUT")
+    # Idle pooled connections older than this (seconds) are pinged before reuse
+    pool_ping_after: float = Field(default=30.0, validation_alias="PG_POOL_PING_AFTER")
+    # asyncpg pool of each ASGI worker (asgi_app.py)
+    async_pool_min_size: int = Field(default=2, validation_alias="PG_ASYNC_POOL_MIN")
+    async_pool_max_size: int = Field(default=20, validation_alias="PG_ASYNC_POOL_MAX")
+    replica_dsns: str = Field(default="", validation_alias="PG_REPLICA_DSNS")  # comma-separated
+    replica_max_lag: float = Field(default=5.0, validation_alias="PG_REPLICA_MAX_LAG")
+    replica_check_interval: float = Field(default=5.0, validation_alias="PG_REPLICA_CHECK_INTERVAL")
+    replica_connect_timeout: int = Field(default=3, validation_alias="PG_REPLICA_CONNECT_TIMEOUT")
+    read_your_writes_seconds: float = Field(default=10.0, validation_alias="PG_READ_YOUR_WRITES")
+    # Server-side statement_timeout of every pooled connection, ms (0 = PostgreSQL default)
+    statement_timeout_ms: int = Field(default=0, validation_alias="PG_STATEMENT_TIMEOUT")
     
     @property
     def connection_string(self) -> str:
         """Generate PostgreSQL connection string."""
         return f"postgresql://{self.user}:{self.password}@{self.host}:{self.port}/{self.name}"
     
+    @property
+    def replica_dsn_list(self) -> List[str]:
+        """Read-replica DSNs (libpq URIs or key=value strings)."""
+        return [dsn.strip() for dsn in self.replica_dsns.split(",") if dsn.strip()]
+    
     model_config = {
         "env_file": ".env",
         "case_sensitive": False,
@@ -32,8 +51,183 @@ class DatabaseSettings(BaseSettings):
 class LoggingSettings(BaseSettings):
     """Logging configuration settings."""
     
-    level: str = Field(default="INFO", env="LOG_LEVEL")
-    file_path: str = Field(default="logs/app.log", env="LOG_FILE")
+    level: str = Field(default="INFO", validation_alias="LOG_LEVEL")
+    file_path: str = Field(default="logs/app.log", validation_alias="LOG_FILE")
+    json_file_path: Optional[str] = Field(default="logs/app.jsonl", validation_alias="LOG_JSON_FILE")
+    enqueue: bool = Field(default=True, validation_alias="LOG_ENQUEUE")
+    colorize: bool = Field(default=True, validation_alias="LOG_COLORIZE")
+    rate_limit: int = Field(default=20, validation_alias="LOG_RATE_LIMIT")
+    rate_limit_window: float = Field(default=60.0, validation_alias="LOG_RATE_LIMIT_WINDOW")
+    
+    model_config = {
+        "env_file": ".env",
+        "case_sensitive": False,
+        "extra": "ignore"
+    }
+
+
+class ServerSettings(BaseSettings):
+    """Production WSGI server settings."""
+    
+    bind_host: str = Field(default="0.0.0.0", validation_alias="WEB_HOST")
+    bind_port: int = Field(default=5000, validation_alias="WEB_PORT")
+    workers: int = Field(default=0, validation_alias="WEB_WORKERS")  # 0 = 2 * CPUs + 1
+    threads: int = Field(default=4, validation_alias="WEB_THREADS")
+    timeout: int = Field(default=120, validation_alias="WEB_TIMEOUT")
+    graceful_timeout: int = Field(default=30, validation_alias="WEB_GRACEFUL_TIMEOUT")
+    preload: bool = Field(default=True, validation_alias="WEB_PRELOAD")
+    max_requests: int = Field(default=1000, validation_alias="WEB_MAX_REQUESTS")
+    max_requests_jitter: int = Field(default=100, validation_alias="WEB_MAX_REQUESTS_JITTER")
+    pid_file: str = Field(default="logs/gunicorn.pid", validation_alias="WEB_PID_FILE")
+    
+    model_config = {
+        "env_file": ".env",
+        "case_sensitive": False,
+        "extra": "ignore"
+    }
+
+
+class JobSettings(BaseSettings):
+    """Background job runner settings."""
+    
+    store_path: str = Field(default="data/jobs.db", validation_alias="JOB_STORE_PATH")
+    max_workers: int = Field(default=2, validation_alias="JOB_MAX_WORKERS")
+    retention_hours: int = Field(default=24, validation_alias="JOB_RETENTION_HOURS")
+    # process: jobs run in run_jobs.py (started with the server); thread: in the
+    # submitting web worker, sharing its threads and GIL (single-process setups)
+    runner: str = Field(default="process", validation_alias="JOB_RUNNER")
+    heartbeat_seconds: float = Field(default=10.0, validation_alias="JOB_HEARTBEAT_SECONDS")
+    # Running jobs without a heartbeat for this long are marked failed
+    stale_seconds: float = Field(default=60.0, validation_alias="JOB_STALE_SECONDS")
+    # How often the runner process looks for queued jobs
+    poll_seconds: float = Field(default=1.0, validation_alias="JOB_POLL_SECONDS")
+    
+    model_config = {
+        "env_file": ".env",
+        "case_sensitive": False,
+        "extra": "ignore"
+    }
+
+
+class QualitySettings(BaseSettings):
+    """Data quality rule execution settings."""
+    
+    workers: int = Field(default=0, validation_alias="QUALITY_WORKERS")  # 0 = CPU count
+    parallel_min_rows: int = Field(default=500000, validation_alias="QUALITY_PARALLEL_MIN_ROWS")
+    partitions_per_worker: int = Field(default=2, validation_alias="QUALITY_PARTITIONS_PER_WORKER")
+    approx_sample_rows: int = Field(default=50000, validation_alias="QUALITY_APPROX_SAMPLE_ROWS")
+    approx_sampling: str = Field(default="SYSTEM", validation_alias="QUALITY_APPROX_SAMPLING")  # SYSTEM or BERNOULLI
+    approx_confidence: float = Field(default=0.95, validation_alias="QUALITY_APPROX_CONFIDENCE")
+    hll_precision: int = Field(default=14, validation_alias="QUALITY_HLL_PRECISION")
+    kll_k: int = Field(default=200, validation_alias="QUALITY_KLL_K")
+    stats_store_path: str = Field(default="data/statistics.json", validation_alias="QUALITY_STATS_STORE")
+    # Full-table customer_name HyperLogLog of the approximate report, per data version
+    distinct_store_path: str = Field(default="data/customer_distinct.json", validation_alias="QUALITY_DISTINCT_STORE")
+    # Seconds a stored sketch is served after the data changed before it is rebuilt in the background
+    distinct_refresh: float = Field(default=300.0, validation_alias="QUALITY_DISTINCT_REFRESH")
+    stats_top_k: int = Field(default=10, validation_alias="QUALITY_STATS_TOP_K")
+    stats_histogram_bins: int = Field(default=10, validation_alias="QUALITY_STATS_HISTOGRAM_BINS")
+    
+    model_config = {
+        "env_file": ".env",
+        "case_sensitive": False,
+        "extra": "ignore"
+    }
+
+
+class CacheSettings(BaseSettings):
+    """HTTP conditional request (ETag/Last-Modified) settings."""
+    
+    enabled: bool = Field(default=True, validation_alias="HTTP_CACHE_ENABLED")
+    version_store_path: str = Field(default="data/versions.db", validation_alias="HTTP_CACHE_VERSION_STORE")
+    
+    model_config = {
+        "env_file": ".env",
+        "case_sensitive": False,
+        "extra": "ignore"
+    }
+
+
+class CompressionSettings(BaseSettings):
+    """HTTP response compression and static asset settings."""
+    
+    enabled: bool = Field(default=True, validation_alias="COMPRESS_ENABLED")
+    min_size: int = Field(default=1024, validation_alias="COMPRESS_MIN_SIZE")  # bytes
+    gzip_level: int = Field(default=6, validation_alias="COMPRESS_GZIP_LEVEL")
+    brotli_quality: int = Field(default=4, validation_alias="COMPRESS_BROTLI_QUALITY")
+    asset_max_age: int = Field(default=31536000, validation_alias="ASSET_MAX_AGE")  # seconds
+    
+    model_config = {
+        "env_file": ".env",
+        "case_sensitive": False,
+        "extra": "ignore"
+    }
+
+
+class NotifySettings(BaseSettings):
+    """Live change notifications (LISTEN/NOTIFY + Server-Sent Events) settings."""
+    
+    enabled: bool = Field(default=True, validation_alias="NOTIFY_ENABLED")
+    channel: str = Field(default="orders_changed", validation_alias="NOTIFY_CHANNEL")
+    keepalive_seconds: float = Field(default=15.0, validation_alias="NOTIFY_KEEPALIVE")
+    max_queue: int = Field(default=100, validation_alias="NOTIFY_MAX_QUEUE")
+    # Each open stream holds a server thread: cap them per process (0 = half of WEB_THREADS)
+    max_streams: int = Field(default=0, validation_alias="NOTIFY_MAX_STREAMS")
+    stream_max_seconds: int = Field(default=300, validation_alias="NOTIFY_STREAM_MAX_SECONDS")
+    
+    model_config = {
+        "env_file": ".env",
+        "case_sensitive": False,
+        "extra": "ignore"
+    }
+
+
+class AdmissionSettings(BaseSettings):
+    """Admission control and per-route query timeouts for the web app."""
+    
+    enabled: bool = Field(default=True, validation_alias="ADMISSION_ENABLED")
+    # Expensive requests running at once per process (0 = a quarter of WEB_THREADS, at least 1)
+    max_concurrent: int = Field(default=0, validation_alias="ADMISSION_MAX_CONCURRENT")
+    max_queue: int = Field(default=4, validation_alias="ADMISSION_MAX_QUEUE")
+    max_wait: float = Field(default=2.0, validation_alias="ADMISSION_MAX_WAIT")  # seconds
+    retry_after: int = Field(default=5, validation_alias="ADMISSION_RETRY_AFTER")  # seconds
+    # statement_timeout per route class, ms (0 = no limit)
+    default_timeout_ms: int = Field(default=5000, validation_alias="ADMISSION_DEFAULT_TIMEOUT_MS")
+    analytics_timeout_ms: int = Field(default=60000, validation_alias="ADMISSION_ANALYTICS_TIMEOUT_MS")
+    export_timeout_ms: int = Field(default=300000, validation_alias="ADMISSION_EXPORT_TIMEOUT_MS")
+    
+    model_config = {
+        "env_file": ".env",
+        "case_sensitive": False,
+        "extra": "ignore"
+    }
+
+
+class AnalyticsSettings(BaseSettings):
+    """Backend for the analytical reports (quality report, duplicates, dashboard)."""
+    
+    backend: str = Field(default="pandas", validation_alias="ANALYTICS_BACKEND")  # pandas or duckdb
+    snapshot_dir: str = Field(default="data/snapshots", validation_alias="ANALYTICS_SNAPSHOT_DIR")
+    # A snapshot younger than this (seconds) is served even if the data changed since
+    snapshot_min_age: float = Field(default=30.0, validation_alias="ANALYTICS_SNAPSHOT_MIN_AGE")
+    # Superseded snapshots are kept this long (seconds) for queries still reading them
+    snapshot_grace: float = Field(default=300.0, validation_alias="ANALYTICS_SNAPSHOT_GRACE")
+    threads: int = Field(default=0, validation_alias="ANALYTICS_THREADS")  # 0 = DuckDB default (all cores)
+    memory_limit: str = Field(default="", validation_alias="ANALYTICS_MEMORY_LIMIT")  # e.g. "2GB"; empty = DuckDB default
+    
+    model_config = {
+        "env_file": ".env",
+        "case_sensitive": False,
+        "extra": "ignore"
+    }
+
+
+class ImportSettings(BaseSettings):
+    """Streaming CSV import settings (CLI and /api/orders/import)."""
+    
+    chunk_rows: int = Field(default=50000, validation_alias="IMPORT_CHUNK_ROWS")  # rows per COPY + merge transaction
+    rejects_dir: str = Field(default="data/rejects", validation_alias="IMPORT_REJECTS_DIR")
+    max_reported_errors: int = Field(default=100, validation_alias="IMPORT_MAX_REPORTED_ERRORS")
     
     model_config = {
         "env_file": ".env",
@@ -45,3 +239,12 @@ class LoggingSettings(BaseSettings):
 # Global settings instances
 db_settings = DatabaseSettings()
 logging_settings = LoggingSettings()
+server_settings = ServerSettings()
+job_settings = JobSettings()
+quality_settings = QualitySettings()
+cache_settings = CacheSettings()
+compression_settings = CompressionSettings()
+notify_settings = NotifySettings()
+admission_settings = AdmissionSettings()
+analytics_settings = AnalyticsSettings()
+import_settings = ImportSettings()
@@ -0,0 +1,149 @@
+"""
+Asynchronous PostgreSQL access (asyncpg) for the ASGI application.
+
+Queries use the same ``%(name)s`` placeholders as ``DatabaseConnection``
+and are rewritten to asyncpg's ``$n`` parameters. asyncpg prepares every
+distinct statement once per connection and caches it, so registry statements
+skip parsing and planning just as they do with psycopg2. Reads honour
+``db_connection.prefer_replica()`` and ``db_connection.statement_timeout()``;
+both are context variables, so under asyncio they apply per task.
+"""
+import asyncio
+from typing import Any, Dict, List, Optional, Union
+import asyncpg
+from loguru import logger
+
+from src.config.settings import db_settings
+from src.database.connection import db_connection
+from src.database.queries import PreparedStatement, query_registry, to_positional
+
+
+class AsyncDatabaseConnection:
+    """asyncpg pools for the primary and each read replica of one event loop.
+
+    ``connect()`` must run on the loop that will use the pools (e.g. in the
+    ASGI app's startup hook) and ``close()`` on shutdown.
+    """
+
+    def __init__(self):
+        self.min_size = db_settings.async_pool_min_size
+        self.max_size = db_settings.async_pool_max_size
+        self._pool: Optional[asyncpg.Pool] = None
+        self._replica_pools: Dict[str, asyncpg.Pool] = {}
+        self._replica_lock: Optional[asyncio.Lock] = None
+
+    async def _create_pool(self, dsn: str) -> asyncpg.Pool:
+        server_settings = {}
+        if db_settings.statement_timeout_ms > 0:
+            server_settings['statement_timeout'] = str(db_settings.statement_timeout_ms)
+        return await asyncpg.create_pool(
+            dsn=dsn,
+            min_size=self.min_size,
+            max_size=self.max_size,
+            server_settings=server_settings
+        )
+
+    async def connect(self):
+        """Create the primary pool."""
+        if self._pool is None:
+            try:
+                self._pool = await self._create_pool(db_settings.connection_string)
+                self._replica_lock = asyncio.Lock()
+                logger.info(f"Async connection pool created (max {self.max_size} connections)")
+            except Exception as e:
+                logger.error(f"Failed to create async connection pool: {e}")
+                raise
+
+    async def close(self):
+        """Close every pool."""
+        pools = list(self._replica_pools.values())
+        if self._pool is not None:
+            pools.append(self._pool)
+        await asyncio.gather(*(pool.close() for pool in pools))
+        self._pool = None
+        self._replica_pools = {}
+
+    async def _replica_pool(self, dsn: str) -> asyncpg.Pool:
+        """Pool for one read replica, created on first use."""
+        if dsn not in self._replica_pools:
+            async with self._replica_lock:
+                if dsn not in self._replica_pools:
+                    self._replica_pools[dsn] = await self._create_pool(dsn)
+        return self._replica_pools[dsn]
+
+    async def _read_pool(self) -> asyncpg.Pool:
+        """Pool for a read under the current routing (see ``prefer_replica``)."""
+        if db_connection.prefers_replica and db_connection.router:
+            from src.services.data_version import get_version_store
+
+            try:
+                _, last_write_at = get_version_store().get("orders")
+            except Exception as e:
+                logger.warning(f"Could not read last write time, using primary: {e}")
+                return self._pool
+            # Lag checks use blocking psycopg2 connections: keep them off the loop
+            replica = await asyncio.to_thread(db_connection.router.choose, last_write_at)
+            if replica is not None:
+                return await self._replica_pool(replica.dsn)
+        return self._pool
+
+    @staticmethod
+    def _timeout() -> Optional[float]:
+        """Client-side timeout (seconds) from the current ``statement_timeout`` block.
+
+        On expiry asyncpg cancels the statement on the server and raises
+        ``asyncio.TimeoutError``.
+        """
+        timeout_ms = db_connection.current_statement_timeout
+        return timeout_ms / 1000 if timeout_ms else None
+
+    @staticmethod
+    def _bind(sql: str, params: Optional[Dict[str, Any]]):
+        query, names = to_positional(sql)
+        return query, [(params or {})[name] for name in names]
+
+    async def fetch(self, query: str, params: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Execute a SELECT query and return results."""
+        sql, args = self._bind(query, params)
+        try:
+            pool = await self._read_pool()
+            async with pool.acquire(timeout=db_settings.pool_timeout) as conn:
+                rows = await conn.fetch(sql, *args, timeout=self._timeout())
+                return [dict(row) for row in rows]
+        except Exception as e:
+            logger.error(f"Async query execution failed: {e}")
+            raise
+
+    async def fetch_prepared(self, statement: Union[str, PreparedStatement],
+                             params: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Execute a registered SELECT (by name or statement) and return results."""
+        if isinstance(statement, str):
+            statement = query_registry.get(statement)
+        try:
+            pool = await self._read_pool()
+            async with pool.acquire(timeout=db_settings.pool_timeout) as conn:
+                rows = await conn.fetch(statement.positional_sql, *statement.bind(params or {}),
+                                        timeout=self._timeout())
+                return [dict(row) for row in rows]
+        except Exception as e:
+            logger.error(f"Async prepared query {statement.name} failed: {e}")
+            raise
+
+    async def execute_prepared_update(self, statement: Union[str, PreparedStatement],
+                                      params: Optional[Dict[str, Any]] = None) -> int:
+        """Execute a registered UPDATE/INSERT/DELETE on the primary and return affected rows."""
+        if isinstance(statement, str):
+            statement = query_registry.get(statement)
+        try:
+            async with self._pool.acquire(timeout=db_settings.pool_timeout) as conn:
+                status = await conn.execute(statement.positional_sql, *statement.bind(params or {}),
+                                            timeout=self._timeout())
+                # Command tag, e.g. "UPDATE 3"
+                return int(status.split()[-1])
+        except Exception as e:
+            logger.error(f"Async prepared update {statement.name} failed: {e}")
+            raise
+
+
+# Global async database connection instance
+async_db = AsyncDatabaseConnection()
@@ -1,15 +1,121 @@
 """
 Database connection management for PostgreSQL.
 """
+import os
+import queue
+import threading
+import time
+from contextvars import ContextVar, Token
 import psycopg2
+import psycopg2.errors
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE, TRANSACTION_STATUS_UNKNOWN
 from psycopg2.extras import RealDictCursor
-from sqlalchemy import create_engine, text
-from sqlalchemy.orm import sessionmaker
 from contextlib import contextmanager
-from typing import Generator, Dict, Any, List, Optional
+from typing import Generator, Dict, Any, Iterator, List, Optional, Union
 from loguru import logger
 
 from src.config.settings import db_settings
+from src.database.queries import PreparedStatement, query_registry
+from src.database.replicas import ReplicaRouter
+
+
+# Where reads of the current request/thread go: "primary" or "replica"
+_read_target: ContextVar[str] = ContextVar("read_target", default="primary")
+# statement_timeout (ms) for connections checked out by the current request/thread;
+# None keeps the process default (PG_STATEMENT_TIMEOUT)
+_statement_timeout: ContextVar[Optional[int]] = ContextVar("statement_timeout", default=None)
+
+
+def _connect_options(statement_timeout_ms: int) -> Dict[str, Any]:
+    """Extra psycopg2.connect() arguments shared by the primary and replica pools."""
+    if statement_timeout_ms > 0:
+        return {'options': f"-c statement_timeout={statement_timeout_ms}"}
+    return {}
+
+
+class PreparingConnection(psycopg2.extensions.connection):
+    """psycopg2 connection that remembers which registry statements it prepared."""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared_statements = set()
+
+
+class ConnectionPool:
+    """Bounded, lazily filled pool of psycopg2 connections.
+
+    Connections are opened on demand up to ``max_size`` and kept open between
+    uses; callers wait up to ``timeout`` seconds for a free slot. Connections
+    idle for more than ``ping_after`` seconds are checked with a round trip
+    before reuse, so one dropped by a server restart or an idle timeout is
+    replaced instead of failing the request that gets it.
+    """
+    
+    def __init__(self, max_size: int, timeout: float, ping_after: Optional[float] = None, **connect_kwargs):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.ping_after = db_settings.pool_ping_after if ping_after is None else ping_after
+        self.connect_kwargs = connect_kwargs
+        # (connection, monotonic time it was returned)
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(max_size)
+    
+    def _usable(self, conn: psycopg2.extensions.connection, idle_since: float) -> bool:
+        """Whether an idle connection can be handed out."""
+        if conn.closed or conn.info.transaction_status != TRANSACTION_STATUS_IDLE:
+            return False
+        if time.monotonic() - idle_since < self.ping_after:
+            return True
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except (psycopg2.OperationalError, psycopg2.InterfaceError) as e:
+            logger.warning(f"Discarding dead pooled connection: {e}")
+            return False
+    
+    def getconn(self) -> psycopg2.extensions.connection:
+        """Take a live idle connection or open a new one."""
+        if not self._slots.acquire(timeout=self.timeout):
+            raise TimeoutError(f"No database connection available after {self.timeout}s")
+        try:
+            while True:
+                try:
+                    conn, idle_since = self._idle.get_nowait()
+                except queue.Empty:
+                    return psycopg2.connect(**self.connect_kwargs)
+                if self._usable(conn, idle_since):
+                    return conn
+                if not conn.closed:
+                    conn.close()
+        except Exception:
+            self._slots.release()
+            raise
+    
+    def putconn(self, conn: psycopg2.extensions.connection):
+        """Return a connection, resetting or discarding it as needed."""
+        try:
+            if not conn.closed:
+                status = conn.info.transaction_status
+                if status == TRANSACTION_STATUS_UNKNOWN:
+                    conn.close()
+                else:
+                    if status != TRANSACTION_STATUS_IDLE:
+                        conn.rollback()
+                    self._idle.put((conn, time.monotonic()))
+        except psycopg2.Error:
+            conn.close()
+        finally:
+            self._slots.release()
+    
+    def closeall(self):
+        """Close every idle connection."""
+        while True:
+            try:
+                self._idle.get_nowait()[0].close()
+            except queue.Empty:
+                break
 
 
 class DatabaseConnection:
@@ -17,51 +123,240 @@ class DatabaseConnection:
     
     def __init__(self):
         self.connection_string = db_settings.connection_string
-        self.engine = None
-        self.SessionLocal = None
-        self._initialize_engine()
+        self._engine = None
+        self._session_factory = None
+        self.pool_max_size = db_settings.pool_max_size
+        # Session statement_timeout of new connections (see set_default_statement_timeout)
+        self.default_statement_timeout_ms = db_settings.statement_timeout_ms
+        self._pool = None
+        self._pool_pid = None
+        self._pool_lock = threading.Lock()
+        self._router = None
+        self._router_pid = None
+    
+    @property
+    def engine(self):
+        """SQLAlchemy engine, created (and SQLAlchemy imported) on first use."""
+        if self._engine is None:
+            self._initialize_engine()
+        return self._engine
+    
+    @property
+    def SessionLocal(self):
+        """SQLAlchemy session factory, created on first use."""
+        if self._session_factory is None:
+            self._initialize_engine()
+        return self._session_factory
     
     def _initialize_engine(self):
         """Initialize SQLAlchemy engine and session factory."""
+        from sqlalchemy import create_engine
+        from sqlalchemy.orm import sessionmaker
+        
         try:
-            self.engine = create_engine(
+            self._engine = create_engine(
                 self.connection_string,
                 echo=False,
                 pool_pre_ping=True,
-                pool_recycle=300
+                pool_recycle=300,
+                pool_size=self.pool_max_size,
+                max_overflow=0,
+                pool_timeout=db_settings.pool_timeout,
+                connect_args=_connect_options(self.default_statement_timeout_ms)
             )
-            self.SessionLocal = sessionmaker(
+            self._session_factory = sessionmaker(
                 autocommit=False,
                 autoflush=False,
-                bind=self.engine
+                bind=self._engine
             )
             logger.info("Database engine initialized successfully")
         except Exception as e:
             logger.error(f"Failed to initialize database engine: {e}")
             raise
     
+    def _get_pool(self) -> ConnectionPool:
+        """Return this process' connection pool, creating it on first use.
+
+        The pool is tied to the creating PID so that a forked worker never
+        reuses sockets inherited from its parent.
+        """
+        if self._pool is None or self._pool_pid != os.getpid():
+            with self._pool_lock:
+                if self._pool is None or self._pool_pid != os.getpid():
+                    self._pool = ConnectionPool(
+                        max_size=self.pool_max_size,
+                        timeout=db_settings.pool_timeout,
+                        host=db_settings.host,
+                        port=db_settings.port,
+                        database=db_settings.name,
+                        user=db_settings.user,
+                        password=db_settings.password,
+                        cursor_factory=RealDictCursor,
+                        connection_factory=PreparingConnection,
+                        **_connect_options(self.default_statement_timeout_ms)
+                    )
+                    self._pool_pid = os.getpid()
+                    logger.info(f"Connection pool created (max {self.pool_max_size} connections, pid {self._pool_pid})")
+        return self._pool
+    
+    def _replica_pool(self, dsn: str) -> ConnectionPool:
+        """Pool for one read replica, sized like the primary pool."""
+        return ConnectionPool(
+            max_size=self.pool_max_size,
+            timeout=db_settings.pool_timeout,
+            dsn=dsn,
+            connect_timeout=db_settings.replica_connect_timeout,
+            cursor_factory=RealDictCursor,
+            connection_factory=PreparingConnection,
+            **_connect_options(self.default_statement_timeout_ms)
+        )
+    
+    @property
+    def router(self) -> ReplicaRouter:
+        """This process' replica router (empty when no replicas are configured)."""
+        if self._router is None or self._router_pid != os.getpid():
+            with self._pool_lock:
+                if self._router is None or self._router_pid != os.getpid():
+                    self._router = ReplicaRouter(
+                        db_settings.replica_dsn_list,
+                        self._replica_pool,
+                        max_lag=db_settings.replica_max_lag,
+                        check_interval=db_settings.replica_check_interval,
+                        read_your_writes=db_settings.read_your_writes_seconds
+                    )
+                    self._router_pid = os.getpid()
+        return self._router
+    
+    @contextmanager
+    def prefer_replica(self):
+        """Route reads inside the block to a read replica when one is usable.
+        
+        Writes always go to the primary. A replica is skipped when it is down,
+        lags more than ``PG_REPLICA_MAX_LAG`` or, within ``PG_READ_YOUR_WRITES``
+        seconds of the last write through this application, has not replayed
+        that write yet.
+        """
+        token = _read_target.set("replica")
+        try:
+            yield
+        finally:
+            _read_target.reset(token)
+    
+    def set_default_statement_timeout(self, timeout_ms: int):
+        """Open this process' connections with ``timeout_ms`` as their statement_timeout.
+        
+        The value goes in the connect options, so ``statement_timeout`` blocks
+        asking for it need no ``SET LOCAL`` on checkout. Pools and engine
+        created before the change are dropped.
+        """
+        if timeout_ms != self.default_statement_timeout_ms:
+            self.default_statement_timeout_ms = timeout_ms
+            self.dispose()
+    
+    def set_statement_timeout(self, timeout_ms: Optional[int]) -> Token:
+        """Enter a ``statement_timeout`` scope; undo it with ``reset_statement_timeout``.
+        
+        For scopes that cannot be a ``with`` block, such as a request's
+        before/teardown hooks.
+        """
+        return _statement_timeout.set(timeout_ms)
+    
+    def reset_statement_timeout(self, token: Token):
+        _statement_timeout.reset(token)
+    
     @contextmanager
-    def get_connection(self) -> Generator[psycopg2.extensions.connection, None, None]:
-        """Get a raw psycopg2 connection with context manager."""
+    def statement_timeout(self, timeout_ms: Optional[int]):
+        """Cap every statement run inside the block at ``timeout_ms`` milliseconds.
+        
+        Applied with ``SET LOCAL`` when a connection is checked out inside the
+        block (unless it matches the connections' default), so it lasts until
+        that connection's first commit or rollback and never leaks to the next
+        user of the pooled connection. ``0`` disables the limit; ``None`` keeps
+        ``PG_STATEMENT_TIMEOUT``. A statement over the limit fails with
+        ``psycopg2.errors.QueryCanceled``.
+        """
+        token = self.set_statement_timeout(timeout_ms)
+        try:
+            yield
+        finally:
+            self.reset_statement_timeout(token)
+    
+    def _apply_statement_timeout(self, conn: psycopg2.extensions.connection):
+        """``SET LOCAL`` the current timeout when it differs from the connection's own."""
+        timeout_ms = _statement_timeout.get()
+        if timeout_ms is None:
+            timeout_ms = db_settings.statement_timeout_ms
+            if timeout_ms == self.default_statement_timeout_ms:
+                return
+        elif timeout_ms == self.default_statement_timeout_ms and timeout_ms > 0:
+            return
+        with conn.cursor() as cursor:
+            cursor.execute("SET LOCAL statement_timeout = %s", (int(timeout_ms),))
+    
+    @property
+    def current_statement_timeout(self) -> Optional[int]:
+        """Timeout set by the innermost ``statement_timeout`` block, if any."""
+        return _statement_timeout.get()
+    
+    @property
+    def prefers_replica(self) -> bool:
+        """Whether the current request/thread is inside ``prefer_replica``."""
+        return _read_target.get() == "replica"
+    
+    def _read_pool(self) -> ConnectionPool:
+        """Pool for a read under the current routing."""
+        if self.prefers_replica and self.router:
+            from src.services.data_version import get_version_store
+            
+            try:
+                _, last_write_at = get_version_store().get("orders")
+            except Exception as e:
+                logger.warning(f"Could not read last write time, using primary: {e}")
+                return self._get_pool()
+            replica = self.router.choose(last_write_at)
+            if replica is not None:
+                return replica.pool
+        return self._get_pool()
+    
+    def dispose(self):
+        """Drop pooled connections, e.g. right after forking a worker process.
+
+        Connections inherited from a parent process are forgotten without being
+        closed so the parent's sockets stay usable.
+        """
+        with self._pool_lock:
+            if self._pool is not None and self._pool_pid == os.getpid():
+                self._pool.closeall()
+            self._pool = None
+            self._pool_pid = None
+            self._router = None
+            self._router_pid = None
+        if self._engine is not None:
+            # Recreated on first use, sized to the (possibly new) pool_max_size
+            self._engine.dispose(close=False)
+            self._engine = None
+            self._session_factory = None
+    
+    @contextmanager
+    def get_connection(self, read_only: bool = False) -> Generator[psycopg2.extensions.connection, None, None]:
+        """Get a pooled psycopg2 connection with context manager.
+        
+        ``read_only`` connections may come from a read replica (see
+        ``prefer_replica``); all others come from the primary.
+        """
+        pool = self._read_pool() if read_only else self._get_pool()
         conn = None
         try:
-            conn = psycopg2.connect(
-                host=db_settings.host,
-                port=db_settings.port,
-                database=db_settings.name,
-                user=db_settings.user,
-                password=db_settings.password,
-                cursor_factory=RealDictCursor
-            )
+            conn = pool.getconn()
+            self._apply_statement_timeout(conn)
             yield conn
         except Exception as e:
             logger.error(f"Database connection error: {e}")
-            if conn:
-                conn.rollback()
             raise
         finally:
             if conn:
-                conn.close()
+                # putconn rolls back any open transaction before reuse
+                pool.putconn(conn)
     
     @contextmanager
     def get_session(self):
@@ -93,7 +388,7 @@ class DatabaseConnection:
     def execute_query(self, query: str, params: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
         """Execute a SELECT query and return results."""
         try:
-            with self.get_connection() as conn:
+            with self.get_connection(read_only=True) as conn:
                 with conn.cursor() as cursor:
                     cursor.execute(query, params)
                     results = cursor.fetchall()
@@ -102,6 +397,71 @@ class DatabaseConnection:
             logger.error(f"Query execution failed: {e}")
             raise
     
+    def stream_query(self, query: str, params: Optional[Dict[str, Any]] = None,
+                     batch_size: int = 10000) -> Iterator[List[Dict[str, Any]]]:
+        """Execute a SELECT through a server-side cursor, yielding batches of rows."""
+        try:
+            with self.get_connection(read_only=True) as conn:
+                with conn.cursor(name="stream_query") as cursor:
+                    cursor.itersize = batch_size
+                    cursor.execute(query, params)
+                    while True:
+                        rows = cursor.fetchmany(batch_size)
+                        if not rows:
+                            break
+                        yield [dict(row) for row in rows]
+        except Exception as e:
+            logger.error(f"Streaming query failed: {e}")
+            raise
+    
+    def _execute_prepared(self, cursor, statement: PreparedStatement, params: Dict[str, Any]):
+        """Run ``statement`` by name, preparing it first on this connection if needed."""
+        conn = cursor.connection
+        for attempt in range(2):
+            if statement.name not in conn.prepared_statements:
+                cursor.execute(statement.prepare_sql)
+                conn.prepared_statements.add(statement.name)
+            try:
+                cursor.execute(statement.execute_sql, statement.bind(params))
+                return
+            except psycopg2.errors.InvalidSqlStatementName:
+                # The session lost its prepared statements (e.g. DISCARD ALL): prepare again
+                conn.rollback()
+                conn.prepared_statements.clear()
+                if attempt:
+                    raise
+                # The rollback also ended the SET LOCAL of get_connection
+                self._apply_statement_timeout(conn)
+    
+    def execute_prepared(self, statement: Union[str, PreparedStatement],
+                         params: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Execute a registered SELECT (by name or statement) and return results."""
+        if isinstance(statement, str):
+            statement = query_registry.get(statement)
+        try:
+            with self.get_connection(read_only=True) as conn:
+                with conn.cursor() as cursor:
+                    self._execute_prepared(cursor, statement, params or {})
+                    return [dict(row) for row in cursor.fetchall()]
+        except Exception as e:
+            logger.error(f"Prepared query {statement.name} failed: {e}")
+            raise
+    
+    def execute_prepared_update(self, statement: Union[str, PreparedStatement],
+                                params: Optional[Dict[str, Any]] = None) -> int:
+        """Execute a registered UPDATE/INSERT/DELETE and return affected rows."""
+        if isinstance(statement, str):
+            statement = query_registry.get(statement)
+        try:
+            with self.get_connection() as conn:
+                with conn.cursor() as cursor:
+                    self._execute_prepared(cursor, statement, params or {})
+                    conn.commit()
+                    return cursor.rowcount
+        except Exception as e:
+            logger.error(f"Prepared update {statement.name} failed: {e}")
+            raise
+    
     def execute_update(self, query: str, params: Optional[Dict[str, Any]] = None) -> int:
         """Execute an UPDATE/INSERT/DELETE query and return affected rows."""
         try:
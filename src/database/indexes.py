@@ -0,0 +1,90 @@
+"""
+Secondary indexes backing the order filters, customer search and the
+duplicate check of the CSV import.
+
+Indexes are created with ``CREATE INDEX CONCURRENTLY`` so they can be added
+to a live table without blocking writes. On a partitioned ``orders`` (see
+``src.database.partitioning``) the parent index is created ``ON ONLY`` the
+parent and each partition's index is built concurrently and attached.
+"""
+from typing import List, Tuple
+from loguru import logger
+
+
+# (name, definition) pairs; each definition follows "ON orders ..."
+ORDER_INDEXES: List[Tuple[str, str]] = [
+    ("idx_orders_order_date", "(order_date)"),
+    ("idx_orders_subtotal_amount", "(subtotal_amount)"),
+    ("idx_orders_status", "(status)"),
+    ("idx_orders_category_subcategory", "(category, subcategory)"),
+    # customer_prefix filter and autocomplete: lower(customer_name) LIKE 'abc%'
+    ("idx_orders_customer_lower_prefix", "(lower(customer_name) text_pattern_ops)"),
+    # customer substring filter: customer_name ILIKE '%abc%'
+    ("idx_orders_customer_trgm", "USING gin (customer_name gin_trgm_ops)"),
+    # duplicate check of the CSV import: the business key of DUPLICATE_KEY_COLUMNS
+    ("idx_orders_business_key", "(customer_name, order_date, category, quantity, subtotal_amount)"),
+]
+
+
+# Partitions that have no index attached to the given partitioned index yet
+_UNINDEXED_PARTITIONS = """
+    SELECT child.relname AS partition
+    FROM pg_inherits i
+    JOIN pg_class child ON child.oid = i.inhrelid
+    WHERE i.inhparent = 'orders'::regclass
+      AND NOT EXISTS (
+          SELECT 1 FROM pg_inherits ii
+          JOIN pg_index x ON x.indexrelid = ii.inhrelid
+          WHERE ii.inhparent = %(index)s::regclass AND x.indrelid = child.oid
+      )
+"""
+
+
+def _install_partitioned_index(cursor, name: str, definition: str):
+    """Build ``name`` partition by partition without blocking writes.
+
+    CONCURRENTLY is not supported on a partitioned table, so the parent index
+    is created ``ON ONLY orders`` (instant, invalid until every partition has
+    its index attached) and each partition's index is built concurrently.
+    """
+    cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON ONLY orders {definition}")
+    cursor.execute(_UNINDEXED_PARTITIONS, {'index': name})
+    for row in cursor.fetchall():
+        partition_index = f"{row['partition']}_{name[len('idx_orders_'):]}_idx"[:63]
+        cursor.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {partition_index} ON {row['partition']} {definition}")
+        cursor.execute(f"ALTER INDEX {name} ATTACH PARTITION {partition_index}")
+
+
+def install_indexes(db=None) -> List[str]:
+    """Create the pg_trgm extension and any missing order indexes.
+
+    Returns the names of the indexes that are now present. An interrupted
+    concurrent build leaves an INVALID index that ``IF NOT EXISTS`` skips;
+    drop it and run again.
+    """
+    if db is None:
+        from src.database.connection import db_connection as db
+    created = []
+    try:
+        with db.get_connection() as conn:
+            # CONCURRENTLY cannot run inside a transaction block
+            conn.autocommit = True
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+                    cursor.execute("SELECT relkind = 'p' AS partitioned FROM pg_class WHERE oid = 'orders'::regclass")
+                    partitioned = cursor.fetchone()['partitioned']
+                    for name, definition in ORDER_INDEXES:
+                        logger.info(f"Creating index {name} (if missing)")
+                        if partitioned:
+                            _install_partitioned_index(cursor, name, definition)
+                        else:
+                            cursor.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON orders {definition}")
+                        created.append(name)
+                    cursor.execute("ANALYZE orders")
+            finally:
+                conn.autocommit = False
+        return created
+    except Exception as e:
+        logger.error(f"Failed to create order indexes: {e}")
+        raise
@@ -0,0 +1,238 @@
+"""
+Change notifications for the ``orders`` table via PostgreSQL LISTEN/NOTIFY.
+
+A statement-level trigger publishes one compact JSON payload per INSERT,
+UPDATE or DELETE with the deltas the dashboard needs (total, per-status,
+per-category and per-year counts and revenue). Each process runs a single
+``ChangeListener`` thread on a dedicated connection and fans notifications
+out to in-process subscribers (e.g. Server-Sent Events streams).
+"""
+import json
+import os
+import queue
+import select
+import threading
+import time
+from typing import Any, Dict, List, Optional
+import psycopg2
+from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+from loguru import logger
+
+from src.config.settings import db_settings, notify_settings
+
+
+# Delta rows of the current statement, built from the transition tables
+_DELTA_SOURCES = {
+    "INSERT": "SELECT order_id, status, category, order_date, subtotal_amount, 1 AS sign FROM new_rows",
+    "DELETE": "SELECT order_id, status, category, order_date, subtotal_amount, -1 AS sign FROM old_rows",
+    "UPDATE": (
+        "SELECT order_id, status, category, order_date, subtotal_amount, 1 AS sign FROM new_rows "
+        "UNION ALL "
+        "SELECT order_id, status, category, order_date, subtotal_amount, -1 AS sign FROM old_rows"
+    ),
+}
+
+TRIGGER_SQL = """
+CREATE OR REPLACE FUNCTION notify_orders_change() RETURNS trigger AS $fn$
+DECLARE
+    payload json;
+    delta_source text;
+BEGIN
+    delta_source := CASE TG_OP
+        WHEN 'INSERT' THEN %(insert)s
+        WHEN 'DELETE' THEN %(delete)s
+        ELSE %(update)s
+    END;
+
+    EXECUTE format($q$
+        WITH delta AS (%%s),
+        amounts AS (
+            SELECT *, sign * COALESCE(subtotal_amount, 0) AS amount FROM delta
+        )
+        SELECT json_build_object(
+            'op', %%L,
+            'rows', (SELECT count(DISTINCT order_id) FROM delta),
+            'order_ids', (SELECT json_agg(order_id) FROM (
+                SELECT DISTINCT order_id FROM delta ORDER BY order_id LIMIT 50) ids),
+            'total', (SELECT COALESCE(sum(sign), 0) FROM delta),
+            'status', (SELECT json_object_agg(status, n) FROM (
+                SELECT status, sum(sign) AS n FROM delta
+                WHERE status IS NOT NULL GROUP BY status HAVING sum(sign) <> 0) s),
+            'category', (SELECT json_object_agg(category, json_build_object('count', n, 'amount', a)) FROM (
+                SELECT category, sum(sign) AS n, sum(amount) AS a FROM amounts
+                WHERE category IS NOT NULL GROUP BY category
+                HAVING sum(sign) <> 0 OR sum(amount) <> 0) c),
+            'year', (SELECT json_object_agg(year, json_build_object('count', n, 'amount', a)) FROM (
+                SELECT EXTRACT(YEAR FROM order_date)::int AS year, sum(sign) AS n, sum(amount) AS a
+                FROM amounts WHERE order_date IS NOT NULL GROUP BY 1
+                HAVING sum(sign) <> 0 OR sum(amount) <> 0) y)
+        )
+    $q$, delta_source, TG_OP) INTO payload;
+
+    IF (payload->>'rows')::int > 0 THEN
+        PERFORM pg_notify(%(channel)s, payload::text);
+    END IF;
+    RETURN NULL;
+END
+$fn$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS orders_notify_insert ON orders;
+DROP TRIGGER IF EXISTS orders_notify_update ON orders;
+DROP TRIGGER IF EXISTS orders_notify_delete ON orders;
+CREATE TRIGGER orders_notify_insert AFTER INSERT ON orders
+    REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION notify_orders_change();
+CREATE TRIGGER orders_notify_update AFTER UPDATE ON orders
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION notify_orders_change();
+CREATE TRIGGER orders_notify_delete AFTER DELETE ON orders
+    REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION notify_orders_change();
+"""
+
+
+def change_trigger_params() -> Dict[str, Any]:
+    """Parameters of ``TRIGGER_SQL``."""
+    return {
+        "insert": _DELTA_SOURCES["INSERT"],
+        "delete": _DELTA_SOURCES["DELETE"],
+        "update": _DELTA_SOURCES["UPDATE"],
+        "channel": notify_settings.channel,
+    }
+
+
+def install_change_trigger(db=None):
+    """Create (or replace) the ``orders`` change-notification trigger.
+
+    Requires PostgreSQL 11+ (statement triggers with transition tables and
+    ``EXECUTE FUNCTION``).
+    """
+    if db is None:
+        from src.database.connection import db_connection as db
+    try:
+        with db.get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(TRIGGER_SQL, change_trigger_params())
+            conn.commit()
+        logger.info(f"Change notification trigger installed on orders (channel {notify_settings.channel})")
+    except Exception as e:
+        logger.error(f"Failed to install change notification trigger: {e}")
+        raise
+
+
+class Subscription:
+    """Bounded queue of notifications for one consumer.
+
+    A consumer that falls behind loses the oldest events and is flagged as
+    ``lagged`` so it can resynchronize with a full reload.
+    """
+
+    def __init__(self, max_queue: int):
+        self.queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=max_queue)
+        self.lagged = False
+
+    def put(self, event: Dict[str, Any]):
+        while True:
+            try:
+                self.queue.put_nowait(event)
+                return
+            except queue.Full:
+                self.lagged = True
+                try:
+                    self.queue.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def get(self, timeout: float) -> Optional[Dict[str, Any]]:
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class ChangeListener:
+    """Single LISTEN connection per process fanning out to subscribers.
+
+    The listener thread starts with the first subscription, reconnects with
+    backoff if the connection drops and is tied to the creating PID, like the
+    connection pool.
+    """
+
+    def __init__(self, channel: str):
+        self.channel = channel
+        self._subscribers: List[Subscription] = []
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+
+    @property
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(self._subscribers)
+
+    def subscribe(self) -> Subscription:
+        """Register a consumer and make sure the listener thread is running."""
+        subscription = Subscription(notify_settings.max_queue)
+        with self._lock:
+            self._subscribers.append(subscription)
+            if self._thread is None or self._pid != os.getpid() or not self._thread.is_alive():
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name="orders-listener", daemon=True)
+                self._thread.start()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            if subscription in self._subscribers:
+                self._subscribers.remove(subscription)
+
+    def _publish(self, event: Dict[str, Any]):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            subscription.put(event)
+
+    def _connect(self) -> psycopg2.extensions.connection:
+        conn = psycopg2.connect(
+            host=db_settings.host,
+            port=db_settings.port,
+            database=db_settings.name,
+            user=db_settings.user,
+            password=db_settings.password
+        )
+        conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+        with conn.cursor() as cursor:
+            cursor.execute(f'LISTEN "{self.channel}"')
+        return conn
+
+    def _run(self):
+        backoff = 1.0
+        pid = os.getpid()
+        while self._pid == pid:
+            conn = None
+            try:
+                conn = self._connect()
+                logger.info(f"Listening for changes on channel {self.channel} (pid {pid})")
+                if backoff > 1.0:
+                    # Notifications sent while disconnected were lost
+                    self._publish({"type": "resync"})
+                backoff = 1.0
+                while self._pid == pid:
+                    if select.select([conn], [], [], notify_settings.keepalive_seconds) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        notify = conn.notifies.pop(0)
+                        try:
+                            payload = json.loads(notify.payload)
+                        except ValueError:
+                            payload = {"raw": notify.payload}
+                        self._publish({"type": "orders", **payload})
+            except Exception as e:
+                logger.error(f"Change listener error, reconnecting in {backoff:.0f}s: {e}")
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 30.0)
+            finally:
+                if conn is not None:
+                    conn.close()
+
+
+# Global listener instance
+change_listener = ChangeListener(notify_settings.channel)
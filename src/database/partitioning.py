@@ -0,0 +1,328 @@
+"""
+Range partitioning of ``orders`` by ``order_date`` year.
+
+``migrate_to_partitioned`` rebuilds ``orders`` as a partitioned table with
+one partition per calendar year (``orders_2010``, ``orders_2011``, ...) and a
+DEFAULT partition for dates outside them, keeping the original table as
+``orders_unpartitioned``. Queries that filter ``order_date`` with plain ranges
+(``order_date >= start AND order_date < end``) are pruned by the planner to
+the partitions they need; expressions such as ``EXTRACT(YEAR FROM
+order_date)`` in a WHERE clause are not.
+
+PostgreSQL requires the primary key of a partitioned table to include the
+partition key, so it becomes ``(order_id, order_date)``. Order ids stay
+unique through the ``order_ids`` registry: statement triggers on ``orders``
+add the ids of inserted rows to its primary key (a repeated id fails the
+insert) and remove deleted ones. Ids of archived partitions stay registered,
+so they are never handed out again.
+"""
+import gzip
+import os
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+from loguru import logger
+
+from src.database.indexes import ORDER_INDEXES
+from src.database.notifications import TRIGGER_SQL, change_trigger_params
+
+
+DEFAULT_PARTITION = "orders_default"
+ARCHIVE_SCHEMA = "archive"
+OLD_TABLE = "orders_unpartitioned"
+ORDER_IDS_TABLE = "order_ids"
+
+ORDER_IDS_TRIGGER_SQL = """
+CREATE OR REPLACE FUNCTION register_order_ids() RETURNS trigger AS $fn$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO order_ids SELECT order_id FROM new_rows;
+    ELSE
+        DELETE FROM order_ids i USING old_rows o WHERE i.order_id = o.order_id;
+    END IF;
+    RETURN NULL;
+END
+$fn$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS orders_register_insert ON orders;
+DROP TRIGGER IF EXISTS orders_register_delete ON orders;
+CREATE TRIGGER orders_register_insert AFTER INSERT ON orders
+    REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION register_order_ids();
+CREATE TRIGGER orders_register_delete AFTER DELETE ON orders
+    REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION register_order_ids();
+"""
+
+PARTITIONS_QUERY = """
+    SELECT child.relname AS partition,
+           pg_get_expr(child.relpartbound, child.oid) AS bounds,
+           child.reltuples::bigint AS estimated_rows,
+           pg_total_relation_size(child.oid) AS total_bytes
+    FROM pg_inherits i
+    JOIN pg_class child ON child.oid = i.inhrelid
+    WHERE i.inhparent = 'orders'::regclass AND child.relkind IN ('r', 'p')
+    ORDER BY child.relname
+"""
+
+
+def partition_name(year: int) -> str:
+    return f"orders_{year}"
+
+
+def partition_year(name: str) -> Optional[int]:
+    """Year of a yearly partition name, None for the DEFAULT partition."""
+    suffix = name[len("orders_"):]
+    return int(suffix) if name.startswith("orders_") and suffix.isdigit() else None
+
+
+def year_bounds(year: int) -> Tuple[date, date]:
+    """``[start, end)`` of a yearly partition."""
+    return date(year, 1, 1), date(year + 1, 1, 1)
+
+
+def _bound_clause(year: int) -> str:
+    # Plain literals: PostgreSQL < 12 accepts no expressions (casts) in bounds
+    start, end = year_bounds(year)
+    return f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+
+
+def _exists(cursor, relation: str) -> bool:
+    cursor.execute("SELECT to_regclass(%s) IS NOT NULL AS present", (relation,))
+    return cursor.fetchone()['present']
+
+
+def is_partitioned(db) -> bool:
+    """Whether ``orders`` is already a partitioned table."""
+    rows = db.execute_query("SELECT relkind = 'p' AS partitioned FROM pg_class WHERE oid = 'orders'::regclass")
+    return bool(rows and rows[0]['partitioned'])
+
+
+def list_partitions(db) -> List[Dict[str, Any]]:
+    """Partitions of ``orders`` with their bounds, planner row estimate and size."""
+    partitions = db.execute_query(PARTITIONS_QUERY)
+    for partition in partitions:
+        partition['year'] = partition_year(partition['partition'])
+    return partitions
+
+
+def _install_order_ids(cursor, source: str):
+    """(Re)build the ``order_ids`` registry from ``source`` and its triggers on orders."""
+    cursor.execute(f"CREATE TABLE IF NOT EXISTS {ORDER_IDS_TABLE} (order_id bigint PRIMARY KEY)")
+    cursor.execute(f"TRUNCATE {ORDER_IDS_TABLE}")
+    cursor.execute(f"INSERT INTO {ORDER_IDS_TABLE} SELECT order_id FROM {source}")
+    cursor.execute(ORDER_IDS_TRIGGER_SQL)
+
+
+def install_order_id_registry(db) -> bool:
+    """Create the ``order_ids`` registry of a partitioned orders if missing.
+
+    For tables partitioned before the registry existed. Blocks writes to
+    orders while the registry is filled. Returns whether it was created.
+
+    Raises:
+        psycopg2.IntegrityError: If orders already holds repeated order ids.
+    """
+    try:
+        with db.get_connection() as conn:
+            with conn.cursor() as cursor:
+                if _exists(cursor, ORDER_IDS_TABLE):
+                    return False
+                cursor.execute("LOCK TABLE orders IN SHARE MODE")
+                _install_order_ids(cursor, "orders")
+            conn.commit()
+        logger.info(f"Order id registry {ORDER_IDS_TABLE} created")
+        return True
+    except Exception as e:
+        logger.error(f"Failed to create the order id registry: {e}")
+        raise
+
+
+def migrate_to_partitioned(db, years_ahead: int = 1) -> Dict[str, Any]:
+    """Rebuild ``orders`` as a table partitioned by ``order_date`` year.
+
+    Runs in one transaction holding an EXCLUSIVE lock on ``orders``: reads
+    keep working, writes wait until the swap commits. Creates one partition
+    per year from the oldest order to ``years_ahead`` years after the current
+    one, copies the rows, rebuilds the secondary indexes that existed on the
+    old table and the change-notification trigger, fills the ``order_ids``
+    registry, then renames the old table to ``orders_unpartitioned`` (drop it
+    once the new table is verified).
+
+    Raises:
+        ValueError: If ``orders`` is already partitioned or a previous
+            migration left ``orders_unpartitioned`` behind.
+    """
+    if is_partitioned(db):
+        raise ValueError("orders is already partitioned")
+    try:
+        with db.get_connection() as conn:
+            with conn.cursor() as cursor:
+                if _exists(cursor, OLD_TABLE):
+                    raise ValueError(f"{OLD_TABLE} already exists; drop or rename it first")
+                cursor.execute("LOCK TABLE orders IN EXCLUSIVE MODE")
+                cursor.execute("""
+                    SELECT EXTRACT(YEAR FROM min(order_date))::int AS first_year,
+                           EXTRACT(YEAR FROM max(order_date))::int AS last_year
+                    FROM orders
+                """)
+                span = cursor.fetchone()
+                current_year = date.today().year
+                first_year = span['first_year'] or current_year
+                last_year = max(span['last_year'] or current_year, current_year) + years_ahead
+
+                # Index names are per schema: free them for the new table
+                existing_indexes = [(name, definition) for name, definition in ORDER_INDEXES
+                                    if _exists(cursor, name)]
+                for name, _ in existing_indexes:
+                    cursor.execute(f"ALTER INDEX {name} RENAME TO {name}_unpartitioned")
+                cursor.execute("""
+                    SELECT count(*) > 0 AS installed FROM pg_trigger
+                    WHERE tgrelid = 'orders'::regclass AND tgname = 'orders_notify_insert'
+                """)
+                notify_trigger = cursor.fetchone()['installed']
+
+                cursor.execute("""
+                    CREATE TABLE orders_partitioned
+                        (LIKE orders INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING STORAGE INCLUDING COMMENTS)
+                    PARTITION BY RANGE (order_date)
+                """)
+                for year in range(first_year, last_year + 1):
+                    cursor.execute(f"CREATE TABLE {partition_name(year)} PARTITION OF orders_partitioned {_bound_clause(year)}")
+                cursor.execute(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF orders_partitioned DEFAULT")
+
+                logger.info(f"Copying orders into {last_year - first_year + 1} yearly partitions")
+                cursor.execute("INSERT INTO orders_partitioned SELECT * FROM orders")
+                copied = cursor.rowcount
+
+                # Built after the copy (faster than maintaining them row by row);
+                # the new table is not visible to anyone yet, so no CONCURRENTLY
+                cursor.execute("ALTER TABLE orders_partitioned ADD PRIMARY KEY (order_id, order_date)")
+                for name, definition in existing_indexes:
+                    cursor.execute(f"CREATE INDEX {name} ON orders_partitioned {definition}")
+
+                for trigger in ('insert', 'update', 'delete'):
+                    cursor.execute(f"DROP TRIGGER IF EXISTS orders_notify_{trigger} ON orders")
+                cursor.execute(f"ALTER TABLE orders RENAME TO {OLD_TABLE}")
+                cursor.execute("ALTER TABLE orders_partitioned RENAME TO orders")
+                if notify_trigger:
+                    cursor.execute(TRIGGER_SQL, change_trigger_params())
+                _install_order_ids(cursor, "orders")
+                cursor.execute("ANALYZE orders")
+            conn.commit()
+        logger.info(f"orders partitioned by year ({first_year}-{last_year}); {copied} rows copied")
+        return {
+            'rows': copied,
+            'first_year': first_year,
+            'last_year': last_year,
+            'indexes': [name for name, _ in existing_indexes],
+            'notify_trigger': notify_trigger,
+            'old_table': OLD_TABLE,
+        }
+    except Exception as e:
+        logger.error(f"Failed to partition orders: {e}")
+        raise
+
+
+def create_year_partition(db, year: int) -> bool:
+    """Create and attach the partition for ``year`` if it does not exist.
+
+    Rows of that year that already landed in the DEFAULT partition are moved
+    into the new partition first (attaching would fail otherwise). Returns
+    whether a partition was created.
+    """
+    name = partition_name(year)
+    start, end = year_bounds(year)
+    try:
+        with db.get_connection() as conn:
+            with conn.cursor() as cursor:
+                if _exists(cursor, name):
+                    return False
+                cursor.execute(f"CREATE TABLE {name} (LIKE orders INCLUDING DEFAULTS INCLUDING CONSTRAINTS)")
+                moved = 0
+                if _exists(cursor, DEFAULT_PARTITION):
+                    # Statements on partitions skip the statement triggers of
+                    # orders, so the moved ids stay in the order_ids registry
+                    cursor.execute(f"""
+                        WITH moved AS (
+                            DELETE FROM {DEFAULT_PARTITION}
+                            WHERE order_date >= %(start)s AND order_date < %(end)s
+                            RETURNING *
+                        )
+                        INSERT INTO {name} SELECT * FROM moved
+                    """, {'start': start, 'end': end})
+                    moved = cursor.rowcount
+                # Indexes of the partitioned table are created on the new partition
+                cursor.execute(f"ALTER TABLE orders ATTACH PARTITION {name} {_bound_clause(year)}")
+            conn.commit()
+        logger.info(f"Partition {name} created ({moved} rows moved from {DEFAULT_PARTITION})")
+        return True
+    except Exception as e:
+        logger.error(f"Failed to create partition {name}: {e}")
+        raise
+
+
+def ensure_partitions(db, years_ahead: int = 2) -> List[str]:
+    """Create the partitions up to ``years_ahead`` years from now, plus any
+    year that currently has rows in the DEFAULT partition, and the
+    ``order_ids`` registry if the table was partitioned without it.
+
+    Raises:
+        ValueError: If ``orders`` is not partitioned yet.
+    """
+    if not is_partitioned(db):
+        raise ValueError("orders is not partitioned; run the migration first")
+    install_order_id_registry(db)
+    current_year = date.today().year
+    years = set(range(current_year, current_year + years_ahead + 1))
+    if any(partition['partition'] == DEFAULT_PARTITION for partition in list_partitions(db)):
+        stray = db.execute_query(
+            f"SELECT DISTINCT EXTRACT(YEAR FROM order_date)::int AS year FROM {DEFAULT_PARTITION}"
+        )
+        years.update(row['year'] for row in stray if row['year'] is not None)
+    return [partition_name(year) for year in sorted(years) if create_year_partition(db, year)]
+
+
+def archive_partitions(db, before_year: int, export_dir: Optional[str] = None,
+                       drop: bool = False) -> List[Dict[str, Any]]:
+    """Detach the yearly partitions older than ``before_year``.
+
+    Each detached table is optionally exported to ``export_dir`` as
+    ``<partition>.csv.gz`` and then either moved to the ``archive`` schema
+    (queryable, outside ``orders``) or dropped.
+
+    Raises:
+        ValueError: If ``drop`` is requested without an export.
+    """
+    if drop and not export_dir:
+        raise ValueError("Refusing to drop partitions without exporting them first")
+    archived = []
+    for partition in list_partitions(db):
+        year = partition['year']
+        if year is None or year >= before_year:
+            continue
+        name = partition['partition']
+        try:
+            with db.get_connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(f"ALTER TABLE orders DETACH PARTITION {name}")
+                conn.commit()
+
+                exported = None
+                if export_dir:
+                    os.makedirs(export_dir, exist_ok=True)
+                    exported = os.path.join(export_dir, f"{name}.csv.gz")
+                    with gzip.open(exported, 'wt', encoding='utf-8', newline='') as f:
+                        with conn.cursor() as cursor:
+                            cursor.copy_expert(f"COPY {name} TO STDOUT WITH (FORMAT csv, HEADER)", f)
+
+                with conn.cursor() as cursor:
+                    if drop:
+                        cursor.execute(f"DROP TABLE {name}")
+                    else:
+                        cursor.execute(f"CREATE SCHEMA IF NOT EXISTS {ARCHIVE_SCHEMA}")
+                        cursor.execute(f"ALTER TABLE {name} SET SCHEMA {ARCHIVE_SCHEMA}")
+                conn.commit()
+            logger.info(f"Partition {name} detached ({'dropped' if drop else 'moved to ' + ARCHIVE_SCHEMA})")
+            archived.append({'partition': name, 'year': year, 'exported_to': exported, 'dropped': drop})
+        except Exception as e:
+            logger.error(f"Failed to archive partition {name}: {e}")
+            raise
+    return archived
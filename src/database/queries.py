@@ -0,0 +1,181 @@
+"""
+Registry of named SQL statements executed as server-side prepared statements.
+
+Statements are written with the usual ``%(name)s`` placeholders; the
+registry rewrites them to ``$n`` parameters, and ``DatabaseConnection``
+``PREPARE``s each one once per pooled connection and then runs it with
+``EXECUTE``, so hot lookups and updates skip parsing and planning.
+Statements whose shape depends on a column list (projections, partial
+updates) are built only from whitelisted columns and registered on first
+use under a name derived from the column set.
+"""
+import re
+import threading
+from typing import Any, Dict, List, Sequence, Tuple
+
+from src.models.order import ORDER_FIELDS, ORDER_WRITE_FIELDS
+
+
+_PLACEHOLDER = re.compile(r"%\((\w+)\)s")
+
+
+def to_positional(sql: str) -> Tuple[str, List[str]]:
+    """Rewrite ``%(name)s`` placeholders to ``$n``.
+
+    Returns the rewritten SQL (with ``%%`` unescaped) and the parameter names
+    in ``$n`` order; a name used several times maps to a single parameter.
+    """
+    params: List[str] = []
+
+    def number(match: "re.Match") -> str:
+        param = match.group(1)
+        if param not in params:
+            params.append(param)
+        return f"${params.index(param) + 1}"
+
+    return _PLACEHOLDER.sub(number, sql).replace("%%", "%"), params
+
+
+class PreparedStatement:
+    """A named statement and the order of its parameters."""
+
+    def __init__(self, name: str, sql: str):
+        self.name = name
+        self.sql = sql
+        self.positional_sql, self.params = to_positional(sql)
+        self.prepare_sql = f"PREPARE {name} AS {self.positional_sql}"
+        placeholders = ", ".join(["%s"] * len(self.params))
+        self.execute_sql = f"EXECUTE {name} ({placeholders})" if self.params else f"EXECUTE {name}"
+
+    def bind(self, params: Dict[str, Any]) -> Tuple[Any, ...]:
+        """Positional values for ``execute_sql``.
+
+        Raises:
+            KeyError: If a parameter of the statement is missing.
+        """
+        return tuple(params[param] for param in self.params)
+
+
+class QueryRegistry:
+    """Thread-safe name -> ``PreparedStatement`` mapping."""
+
+    def __init__(self):
+        self._statements: Dict[str, PreparedStatement] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, sql: str) -> PreparedStatement:
+        with self._lock:
+            if name not in self._statements:
+                self._statements[name] = PreparedStatement(name, sql)
+            return self._statements[name]
+
+    def get(self, name: str) -> PreparedStatement:
+        """Registered statement ``name``.
+
+        Raises:
+            KeyError: If no statement has that name.
+        """
+        return self._statements[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._statements
+
+
+def _column_mask(columns: Sequence[str], allowed: List[str], kind: str) -> int:
+    """Bit mask of ``columns`` within ``allowed``, used to name statements.
+
+    Raises:
+        ValueError: If a column is not in the whitelist.
+    """
+    unknown = [column for column in columns if column not in allowed]
+    if unknown or not columns:
+        raise ValueError(f"Invalid {kind} columns: {', '.join(unknown) or '(none)'}")
+    return sum(1 << allowed.index(column) for column in set(columns))
+
+
+# Global registry instance
+query_registry = QueryRegistry()
+
+# Transaction-level advisory lock taken by every insert into orders. It
+# serializes order_id allocation (and the import's existence checks) between
+# writers while reads, updates and deletes of orders go on unblocked.
+ORDER_INSERT_LOCK_SQL = "SELECT pg_advisory_xact_lock(hashtext('orders.order_id'))"
+
+
+def order_by_id_statement(columns: Sequence[str] = ()) -> PreparedStatement:
+    """Single-order lookup projecting ``columns`` (all columns when empty)."""
+    columns = [field for field in ORDER_FIELDS if field in columns] if columns else ORDER_FIELDS
+    mask = _column_mask(columns, ORDER_FIELDS, "order")
+    return query_registry.register(
+        f"order_by_id_{mask:x}",
+        f"SELECT {', '.join(columns)} FROM orders WHERE order_id = %(order_id)s"
+    )
+
+
+def update_order_statement(columns: Sequence[str]) -> PreparedStatement:
+    """UPDATE of exactly ``columns`` (a subset of the writable fields) by order_id."""
+    columns = [field for field in ORDER_WRITE_FIELDS if field in columns]
+    mask = _column_mask(columns, ORDER_WRITE_FIELDS, "update")
+    assignments = ", ".join(f"{column} = %({column})s" for column in columns)
+    return query_registry.register(
+        f"update_order_{mask:x}",
+        f"UPDATE orders SET {assignments} WHERE order_id = %(order_id)s"
+    )
+
+
+query_registry.register("count_orders", "SELECT COUNT(*) AS total FROM orders")
+query_registry.register("order_exists", "SELECT order_id FROM orders WHERE order_id = %(order_id)s")
+query_registry.register("delete_order", "DELETE FROM orders WHERE order_id = %(order_id)s")
+query_registry.register(
+    "update_order_status", "UPDATE orders SET status = %(status)s WHERE order_id = %(order_id)s"
+)
+query_registry.register(
+    "bulk_update_status", "UPDATE orders SET status = %(status)s WHERE order_id = ANY(%(order_ids)s)"
+)
+query_registry.register(
+    "orders_by_status",
+    f"SELECT {', '.join(ORDER_FIELDS)} FROM orders WHERE status = %(status)s ORDER BY order_id"
+)
+query_registry.register("status_counts", "SELECT status, COUNT(*) AS count FROM orders GROUP BY status")
+query_registry.register("category_stats", """
+    SELECT category, COUNT(*) AS count, SUM(subtotal_amount) AS total_amount
+    FROM orders
+    GROUP BY category
+    ORDER BY total_amount DESC
+""")
+query_registry.register("year_stats", """
+    SELECT EXTRACT(YEAR FROM order_date) AS year, COUNT(*) AS count, SUM(subtotal_amount) AS total_amount
+    FROM orders
+    GROUP BY EXTRACT(YEAR FROM order_date)
+    ORDER BY year
+""")
+query_registry.register("powerbi_category_summary", """
+    SELECT
+        category,
+        COUNT(*) AS order_count,
+        SUM(subtotal_amount) AS total_revenue,
+        AVG(subtotal_amount) AS avg_order_value,
+        SUM(quantity) AS total_quantity
+    FROM orders
+    GROUP BY category
+    ORDER BY total_revenue DESC
+""")
+query_registry.register("powerbi_yearly_summary", """
+    SELECT
+        EXTRACT(YEAR FROM order_date) AS year,
+        COUNT(*) AS order_count,
+        SUM(subtotal_amount) AS total_revenue,
+        AVG(subtotal_amount) AS avg_order_value
+    FROM orders
+    GROUP BY EXTRACT(YEAR FROM order_date)
+    ORDER BY year
+""")
+query_registry.register("powerbi_status_summary", """
+    SELECT
+        status,
+        COUNT(*) AS order_count,
+        SUM(subtotal_amount) AS total_revenue
+    FROM orders
+    GROUP BY status
+    ORDER BY order_count DESC
+""")
@@ -0,0 +1,137 @@
+"""
+Read-replica selection with replication lag checks.
+
+Each replica gets its own connection pool. Before a replica serves a read,
+its replay lag (checked at most every ``check_interval`` seconds per process)
+must be within ``max_lag`` and, shortly after a write, it must already have
+replayed that write; otherwise the caller falls back to the primary.
+"""
+import itertools
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, List, Optional
+from loguru import logger
+
+
+# Lag is zero when everything received has been replayed; on an idle primary
+# the last replay timestamp grows old without the replica falling behind
+LAG_QUERY = """
+    SELECT pg_is_in_recovery() AS in_recovery,
+           pg_last_xact_replay_timestamp() AS replayed_at,
+           CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+                ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+           END AS lag_seconds
+"""
+
+
+class Replica:
+    """One replica DSN, its pool and its last observed replication state."""
+
+    def __init__(self, dsn: str, pool_factory: Callable[[str], object]):
+        self.dsn = dsn
+        self._pool_factory = pool_factory
+        self._pool = None
+        self.healthy = False
+        self.lag_seconds: Optional[float] = None
+        self.replayed_at: Optional[datetime] = None
+        self.checked_at = 0.0
+        self._refresh_lock = threading.Lock()
+
+    @property
+    def pool(self):
+        if self._pool is None:
+            self._pool = self._pool_factory(self.dsn)
+        return self._pool
+
+    def refresh_if_due(self, interval: float):
+        """Refresh unless checked recently; threads never wait on each other here."""
+        if not self._refresh_lock.acquire(blocking=False):
+            return
+        try:
+            if time.monotonic() - self.checked_at >= interval:
+                self.refresh()
+        finally:
+            self._refresh_lock.release()
+
+    def refresh(self):
+        """Query the replica's recovery state and replay lag."""
+        conn = None
+        try:
+            conn = self.pool.getconn()
+            with conn.cursor() as cursor:
+                cursor.execute(LAG_QUERY)
+                row = cursor.fetchone()
+            conn.rollback()
+            if not row['in_recovery']:
+                logger.warning(f"Replica {self.label} is not in recovery (promoted?); not routing reads to it")
+            self.healthy = bool(row['in_recovery'])
+            self.lag_seconds = float(row['lag_seconds'])
+            self.replayed_at = row['replayed_at']
+        except Exception as e:
+            logger.warning(f"Replica {self.label} unavailable: {e}")
+            self.healthy = False
+        finally:
+            if conn is not None:
+                self.pool.putconn(conn)
+            self.checked_at = time.monotonic()
+
+    @property
+    def label(self) -> str:
+        """DSN without credentials, for logs."""
+        if '@' in self.dsn:
+            return self.dsn.split('@')[-1]
+        return re.sub(r"password=\S+", "password=***", self.dsn)
+
+
+class ReplicaRouter:
+    """Round-robin over the replicas that are healthy and fresh enough."""
+
+    def __init__(self, dsns: List[str], pool_factory: Callable[[str], object],
+                 max_lag: float, check_interval: float, read_your_writes: float):
+        self.replicas = [Replica(dsn, pool_factory) for dsn in dsns]
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.read_your_writes = read_your_writes
+        self._cycle = itertools.cycle(range(len(self.replicas))) if self.replicas else None
+        self._lock = threading.Lock()
+
+    def __bool__(self) -> bool:
+        return bool(self.replicas)
+
+    def choose(self, last_write_at: Optional[datetime] = None) -> Optional[Replica]:
+        """A replica to read from, or None to use the primary.
+
+        ``last_write_at`` is when this application last wrote; within the
+        read-your-writes window a replica must have replayed past it.
+        """
+        if not self.replicas:
+            return None
+        recent_write = (
+            last_write_at is not None
+            and (datetime.now(timezone.utc) - last_write_at).total_seconds() < self.read_your_writes
+        )
+        with self._lock:
+            start = next(self._cycle)
+        for offset in range(len(self.replicas)):
+            replica = self.replicas[(start + offset) % len(self.replicas)]
+            replica.refresh_if_due(self.check_interval)
+            if not replica.healthy or replica.lag_seconds is None or replica.lag_seconds > self.max_lag:
+                continue
+            if recent_write and (replica.replayed_at is None or replica.replayed_at < last_write_at):
+                continue
+            return replica
+        return None
+
+    def status(self) -> List[dict]:
+        """Last observed state of every replica."""
+        return [
+            {
+                'replica': replica.label,
+                'healthy': replica.healthy,
+                'lag_seconds': replica.lag_seconds,
+                'replayed_at': replica.replayed_at.isoformat() if replica.replayed_at else None,
+            }
+            for replica in self.replicas
+        ]
@@ -1,8 +1,8 @@
 """
 Order model for the orders table.
 """
-from typing import Optional, Dict, Any
-from pydantic import BaseModel, Field, field_validator
+from typing import Optional, Dict, Any, List, Tuple
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError, field_validator
 from datetime import date
 from decimal import Decimal
 
@@ -33,6 +33,49 @@ class OrderBase(BaseModel):
         from_attributes = True
 
 
+# Columns of the orders table, in table order; the whitelist for projections
+ORDER_FIELDS: List[str] = list(OrderBase.model_fields)
+
+
+def parse_fields(fields: Optional[str], extra: Optional[List[str]] = None) -> Optional[List[str]]:
+    """Parse a comma-separated ``fields=`` projection.
+
+    Names are validated against the ``OrderBase`` fields (plus ``extra``
+    derived columns, if given) so they can be placed in a SELECT list safely.
+    Returns None when no projection was requested, meaning all columns.
+
+    Raises:
+        ValueError: If a requested field does not exist.
+    """
+    if not fields or not fields.strip():
+        return None
+    allowed = ORDER_FIELDS + (extra or [])
+    requested = []
+    for name in fields.split(','):
+        name = name.strip()
+        if not name:
+            continue
+        if name not in allowed:
+            raise ValueError(f"Unknown field '{name}'. Allowed: {', '.join(allowed)}")
+        if name not in requested:
+            requested.append(name)
+    return requested or None
+
+
+def select_list(columns: Optional[List[str]]) -> str:
+    """SELECT list for a projection of orders columns (all columns when None).
+
+    Raises:
+        ValueError: If a column is not an ``OrderBase`` field.
+    """
+    if not columns:
+        return ", ".join(ORDER_FIELDS)
+    unknown = [column for column in columns if column not in ORDER_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown order columns: {', '.join(unknown)}")
+    return ", ".join(columns)
+
+
 class OrderCreate(OrderBase):
     """Model for creating new orders."""
     pass
@@ -51,6 +94,79 @@ class Order(OrderBase):
         from_attributes = True
 
 
+# Compiled once: validating a whole list is a single call into pydantic-core
+ORDER_LIST_ADAPTER = TypeAdapter(List[OrderCreate])
+
+# Writable columns (order_id is assigned by the service)
+ORDER_WRITE_FIELDS: List[str] = [field for field in ORDER_FIELDS if field != 'order_id']
+
+
+class OrderValidationError(ValueError):
+    """Raised when orders fail schema validation; ``errors`` holds them per row."""
+    
+    def __init__(self, errors: List[Dict[str, Any]]):
+        self.errors = errors
+        super().__init__(f"{len(errors)} invalid order(s): {errors[0]['errors'] if errors else []}")
+
+
+def _row_errors(exc: ValidationError) -> Dict[int, List[Dict[str, str]]]:
+    """Group list validation errors by row index."""
+    by_row: Dict[int, List[Dict[str, str]]] = {}
+    for error in exc.errors(include_url=False):
+        index, *location = error['loc']
+        by_row.setdefault(index, []).append({
+            'field': '.'.join(str(part) for part in location),
+            'message': error['msg'],
+            'type': error['type'],
+        })
+    return by_row
+
+
+def validate_orders(rows: List[Dict[str, Any]]) -> Tuple[List[Tuple[int, OrderCreate]], List[Dict[str, Any]]]:
+    """Validate raw order dicts in batch without raising.
+    
+    Empty strings are treated as missing values (as they come from CSV).
+    Returns ``(valid, errors)``: ``valid`` pairs each row index with its
+    ``OrderCreate``; ``errors`` holds ``{'row': index, 'errors': [...]}`` for
+    every rejected row. When some rows fail, the valid ones are validated
+    again in a second batch call instead of one model at a time.
+    """
+    rows = [{key: (None if value == '' else value) for key, value in row.items()} for row in rows]
+    try:
+        return list(enumerate(ORDER_LIST_ADAPTER.validate_python(rows))), []
+    except ValidationError as e:
+        by_row = _row_errors(e)
+    
+    valid_indexes = [index for index in range(len(rows)) if index not in by_row]
+    models = ORDER_LIST_ADAPTER.validate_python([rows[index] for index in valid_indexes])
+    errors = [{'row': index, 'errors': by_row[index]} for index in sorted(by_row)]
+    return list(zip(valid_indexes, models)), errors
+
+
+def validate_order_update(update: Dict[str, Any]) -> Dict[str, Any]:
+    """Validate a partial update field by field with the ``OrderCreate`` rules.
+    
+    Returns the coerced values.
+    
+    Raises:
+        OrderValidationError: If a field is unknown or a value is invalid.
+    """
+    instance = OrderCreate.model_construct()
+    errors = []
+    for field, value in update.items():
+        if field not in ORDER_WRITE_FIELDS:
+            errors.append({'field': field, 'message': 'Unknown or read-only field', 'type': 'extra_forbidden'})
+            continue
+        try:
+            OrderCreate.__pydantic_validator__.validate_assignment(instance, field, None if value == '' else value)
+        except ValidationError as e:
+            errors.extend({'field': field, 'message': error['msg'], 'type': error['type']}
+                          for error in e.errors(include_url=False))
+    if errors:
+        raise OrderValidationError([{'row': 0, 'errors': errors}])
+    return {field: getattr(instance, field) for field in update}
+
+
 class OrderCleaningResult(BaseModel):
     """Model for data cleaning results."""
     total_records: int
@@ -0,0 +1,332 @@
+"""
+Embedded analytical backend: DuckDB over a Parquet snapshot of ``orders``.
+
+With ``ANALYTICS_BACKEND=duckdb`` the exact quality report, duplicate
+detection and dashboard rollups run as SQL on DuckDB's multi-threaded,
+vectorized engine instead of in pandas (or in PostgreSQL). The snapshot is
+written by a single ``COPY`` from PostgreSQL, preferably from a read replica,
+once per orders data version (see ``src.services.data_version``), so
+PostgreSQL only does work when the data has changed, and at most once every
+``ANALYTICS_SNAPSHOT_MIN_AGE`` seconds: until then the previous snapshot is
+served, and its version is reported with ``note_served_version`` so HTTP
+caches are validated against the data actually returned. One process writes each snapshot (the others wait on a lock file and
+then use it), and superseded snapshots are kept for
+``ANALYTICS_SNAPSHOT_GRACE`` seconds so queries of other workers that already
+picked them never find them deleted. Results have the same shape and values
+as the pandas implementations in ``OrderService``;
+``check_analytics_parity.py`` compares both against a live database.
+"""
+import glob
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple, TYPE_CHECKING
+from loguru import logger
+
+from src.config.settings import admission_settings, analytics_settings
+from src.models.order import ORDER_FIELDS
+from src.services.data_version import get_version_store, note_served_version
+
+try:
+    import duckdb
+except ImportError:  # optional dependency, only needed with ANALYTICS_BACKEND=duckdb
+    duckdb = None
+
+try:
+    import fcntl
+except ImportError:  # Windows: snapshots are only serialized within the process
+    fcntl = None
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+# DuckDB types of the snapshot columns, mirroring the PostgreSQL DDL of orders
+SNAPSHOT_COLUMNS = {
+    'order_id': 'BIGINT',
+    'status': 'VARCHAR',
+    'customer_name': 'VARCHAR',
+    'order_date': 'DATE',
+    'quantity': 'INTEGER',
+    'subtotal_amount': 'DECIMAL(18,2)',
+    'tax_rate': 'DECIMAL(6,4)',
+    'shipping_cost': 'DECIMAL(18,2)',
+    'category': 'VARCHAR',
+    'subcategory': 'VARCHAR',
+}
+
+# NULL marker of the intermediate CSV: keeps NULL distinct from ''
+NULL_MARKER = r'\N'
+
+# DuckDB vectors hold 2048 rows; batches of column_batches() are a multiple
+VECTOR_SIZE = 2048
+BATCH_SIZE = 10240
+
+DUPLICATE_EXAMPLE_COLUMNS = ['order_id', 'customer_name', 'order_date', 'category']
+DUPLICATE_EXAMPLES = 10
+
+SNAPSHOT_NAME = re.compile(r"orders-v(\d+)\.parquet$")
+LOCK_FILE = ".snapshot.lock"
+
+
+def _literal(value: str) -> str:
+    """Quote a string as a SQL literal (DuckDB COPY takes no parameters)."""
+    return "'" + value.replace("'", "''") + "'"
+
+
+class EmbeddedAnalytics:
+    """Analytical queries on DuckDB over the current orders snapshot."""
+
+    def __init__(self, db, snapshot_dir: Optional[str] = None):
+        if duckdb is None:
+            raise RuntimeError("ANALYTICS_BACKEND=duckdb requires the 'duckdb' package (pip install duckdb)")
+        self.db = db
+        self.snapshot_dir = snapshot_dir or analytics_settings.snapshot_dir
+        self._lock = threading.Lock()
+
+    def snapshot_path(self, version: int) -> str:
+        return os.path.join(self.snapshot_dir, f"orders-v{version}.parquet")
+
+    def _snapshots(self) -> List[Tuple[int, str]]:
+        """(version, path) of the snapshots on disk, oldest version first."""
+        found = []
+        for path in glob.glob(os.path.join(self.snapshot_dir, "orders-v*.parquet")):
+            match = SNAPSHOT_NAME.search(os.path.basename(path))
+            if match:
+                found.append((int(match.group(1)), path))
+        return sorted(found)
+
+    def _recent_snapshot(self, min_age: float) -> Optional[Tuple[int, str]]:
+        """(version, path) of the newest snapshot if it was written less than ``min_age`` seconds ago."""
+        snapshots = self._snapshots()
+        if not snapshots or min_age <= 0:
+            return None
+        version, path = snapshots[-1]
+        try:
+            return (version, path) if time.time() - os.path.getmtime(path) < min_age else None
+        except OSError:
+            return None
+
+    @contextmanager
+    def _build_lock(self):
+        """Serialize snapshot writes across the threads and processes of this host."""
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            os.makedirs(self.snapshot_dir, exist_ok=True)
+            with open(os.path.join(self.snapshot_dir, LOCK_FILE), 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def snapshot(self, min_age: Optional[float] = None) -> Tuple[int, str]:
+        """(version, path) of the snapshot to query, written if needed.
+
+        The snapshot of the current data version, or the newest one when it
+        is younger than ``min_age`` seconds (``ANALYTICS_SNAPSHOT_MIN_AGE``;
+        0 always serves the current version). The version is the one the
+        snapshot holds, which may be older than the current one.
+        """
+        min_age = analytics_settings.snapshot_min_age if min_age is None else min_age
+        version, _ = get_version_store().get('orders')
+        path = self.snapshot_path(version)
+        if os.path.exists(path):
+            return version, path
+        recent = self._recent_snapshot(min_age)
+        if recent:
+            return recent
+        with self._build_lock():
+            # Another worker may have written it (or a newer one) meanwhile
+            if os.path.exists(path):
+                return version, path
+            recent = self._recent_snapshot(min_age)
+            if recent:
+                return recent
+            self._write_snapshot(path)
+            self._remove_stale(path)
+        return version, path
+
+    def _connect(self) -> "duckdb.DuckDBPyConnection":
+        """In-memory DuckDB connection with the configured resource limits."""
+        con = duckdb.connect()
+        if analytics_settings.threads > 0:
+            con.execute(f"SET threads = {int(analytics_settings.threads)}")
+        if analytics_settings.memory_limit:
+            con.execute(f"SET memory_limit = {_literal(analytics_settings.memory_limit)}")
+        return con
+
+    def _write_snapshot(self, path: str):
+        """Dump orders to CSV with ``COPY`` and convert it to Parquet.
+
+        Both files are written next to the snapshot and the Parquet file is
+        renamed into place, so concurrent readers (other workers) never see a
+        partial snapshot.
+        """
+        os.makedirs(self.snapshot_dir, exist_ok=True)
+        dump = f"{path}.{os.getpid()}.csv"
+        temporary = f"{path}.{os.getpid()}.tmp"
+        try:
+            # A full-table dump: give it the export timeout, not the route's
+            with self.db.prefer_replica(), self.db.statement_timeout(admission_settings.export_timeout_ms):
+                with self.db.get_connection(read_only=True) as conn:
+                    with conn.cursor() as cursor, open(dump, 'w', encoding='utf-8', newline='') as f:
+                        cursor.copy_expert(
+                            f"COPY (SELECT {', '.join(ORDER_FIELDS)} FROM orders) TO STDOUT "
+                            f"WITH (FORMAT csv, HEADER, NULL {_literal(NULL_MARKER)})", f
+                        )
+            columns = ', '.join(f"{_literal(name)}: {_literal(SNAPSHOT_COLUMNS[name])}" for name in ORDER_FIELDS)
+            with self._connect() as con:
+                con.execute(
+                    f"COPY (SELECT * FROM read_csv({_literal(dump)}, header = true, "
+                    f"nullstr = {_literal(NULL_MARKER)}, columns = {{{columns}}})) "
+                    f"TO {_literal(temporary)} (FORMAT parquet, COMPRESSION zstd)"
+                )
+            os.replace(temporary, path)
+            logger.info(f"Wrote orders snapshot {path} ({os.path.getsize(path):,} bytes)")
+        except Exception as e:
+            logger.error(f"Failed to write orders snapshot: {e}")
+            raise
+        finally:
+            for leftover in (dump, temporary):
+                if os.path.exists(leftover):
+                    os.remove(leftover)
+
+    def _remove_stale(self, current: str):
+        """Delete the snapshots superseded more than ``ANALYTICS_SNAPSHOT_GRACE`` seconds ago.
+
+        A snapshot was superseded when the next newer one was written;
+        younger ones may still be read by queries that picked them before.
+        """
+        snapshots = [path for _, path in self._snapshots()]
+        now = time.time()
+        for path, successor in zip(snapshots, snapshots[1:]):
+            if path == current:
+                continue
+            try:
+                if now - os.path.getmtime(successor) > analytics_settings.snapshot_grace:
+                    os.remove(path)
+            except OSError as e:
+                # Already removed by another worker, or still open on Windows
+                logger.warning(f"Could not remove stale snapshot {path}: {e}")
+
+    @contextmanager
+    def _orders(self):
+        """DuckDB connection with an ``orders`` view over the current snapshot."""
+        version, path = self.snapshot()
+        note_served_version('orders', version)
+        with self._connect() as con:
+            con.execute(f"CREATE VIEW orders AS SELECT * FROM read_parquet({_literal(path)})")
+            yield con
+
+    @staticmethod
+    def _records(cursor) -> List[Dict[str, Any]]:
+        columns = [description[0] for description in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def quality_counts(self) -> Dict[str, Any]:
+        """Row count, nulls per column, duplicate rows and value distributions.
+
+        The inputs of the exact quality report, computed like the pandas
+        version: full-row duplicates beyond the first, NULLs equal to each
+        other; ``status`` counts for every value and the top 10 categories.
+        """
+        null_counts = ', '.join(f"count(*) - count({column}) AS {column}" for column in ORDER_FIELDS)
+        try:
+            with self._orders() as con:
+                row = self._records(con.execute(f"SELECT count(*) AS total_records, {null_counts} FROM orders"))[0]
+                distinct_rows = con.execute("SELECT count(*) FROM (SELECT DISTINCT * FROM orders)").fetchone()[0]
+                status = con.execute("""
+                    SELECT status, count(*) FROM orders WHERE status IS NOT NULL
+                    GROUP BY status ORDER BY 2 DESC, 1
+                """).fetchall()
+                category = con.execute("""
+                    SELECT category, count(*) FROM orders WHERE category IS NOT NULL
+                    GROUP BY category ORDER BY 2 DESC, 1 LIMIT 10
+                """).fetchall()
+        except Exception as e:
+            logger.error(f"Embedded quality counts failed: {e}")
+            raise
+        total_records = int(row.pop('total_records'))
+        return {
+            'total_records': total_records,
+            'null_values': {column: int(row[column]) for column in ORDER_FIELDS},
+            'duplicate_records': total_records - int(distinct_rows),
+            'value_distributions': {
+                'status': {str(value): int(count) for value, count in status},
+                'category': {str(value): int(count) for value, count in category},
+            },
+        }
+
+    def find_duplicates(self, key_columns: List[str]) -> Tuple[int, int, List[Dict[str, Any]]]:
+        """Total rows, duplicates on ``key_columns`` and the first duplicate rows.
+
+        A row is a duplicate when an earlier order_id has the same key, which
+        is what ``DataFrame.duplicated(keep='first')`` reports over rows in
+        order_id order.
+        """
+        keys = ', '.join(key_columns)
+        examples = ', '.join(DUPLICATE_EXAMPLE_COLUMNS)
+        try:
+            with self._orders() as con:
+                total_records, distinct_keys = con.execute(
+                    f"SELECT count(*), (SELECT count(*) FROM (SELECT DISTINCT {keys} FROM orders)) FROM orders"
+                ).fetchone()
+                duplicates = self._records(con.execute(f"""
+                    SELECT {examples} FROM (
+                        SELECT {examples}, row_number() OVER (PARTITION BY {keys} ORDER BY order_id) AS occurrence
+                        FROM orders
+                    ) numbered
+                    WHERE occurrence > 1
+                    ORDER BY order_id
+                    LIMIT {DUPLICATE_EXAMPLES}
+                """))
+        except Exception as e:
+            logger.error(f"Embedded duplicate detection failed: {e}")
+            raise
+        return int(total_records), int(total_records) - int(distinct_keys), duplicates
+
+    def dashboard_rollups(self) -> Tuple[int, List[Dict[str, Any]], List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Total orders and the status, category and year rollups of the dashboard.
+
+        Same rows as the ``count_orders``, ``status_counts``, ``category_stats``
+        and ``year_stats`` prepared statements.
+        """
+        try:
+            with self._orders() as con:
+                total = con.execute("SELECT count(*) FROM orders").fetchone()[0]
+                status_stats = self._records(con.execute(
+                    "SELECT status, count(*) AS count FROM orders GROUP BY status"
+                ))
+                category_stats = self._records(con.execute("""
+                    SELECT category, count(*) AS count, sum(subtotal_amount) AS total_amount
+                    FROM orders
+                    GROUP BY category
+                    ORDER BY total_amount DESC
+                """))
+                year_stats = self._records(con.execute("""
+                    SELECT CAST(year(order_date) AS INTEGER) AS year, count(*) AS count,
+                           sum(subtotal_amount) AS total_amount
+                    FROM orders
+                    WHERE order_date IS NOT NULL
+                    GROUP BY 1
+                    ORDER BY 1
+                """))
+        except Exception as e:
+            logger.error(f"Embedded dashboard rollups failed: {e}")
+            raise
+        return int(total), status_stats, category_stats, year_stats
+
+    def column_batches(self, columns: List[str], batch_size: int = BATCH_SIZE) -> Iterator["pd.DataFrame"]:
+        """Stream ``columns`` of the snapshot as DataFrames of about ``batch_size`` rows."""
+        with self._orders() as con:
+            con.execute(f"SELECT {', '.join(columns)} FROM orders")
+            while True:
+                batch = con.fetch_df_chunk(max(1, batch_size // VECTOR_SIZE))
+                if batch.empty:
+                    break
+                yield batch
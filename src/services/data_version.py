@@ -0,0 +1,137 @@
+"""
+Per-table data version counters used to validate HTTP caches.
+
+Write endpoints bump the counter of the table they modify; read endpoints
+derive their ETag and Last-Modified from it. The counters live in SQLite so
+every web worker process sees the same version without querying PostgreSQL.
+
+Readers that may answer from data older than the current version (the DuckDB
+snapshot) report the version they used with ``note_served_version``, so the
+response is tagged with that version instead of the current one.
+"""
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Dict, Iterator, Optional, Tuple
+from loguru import logger
+
+from src.config.settings import cache_settings
+
+
+# Versions reported by note_served_version inside track_served_versions
+_served_versions: ContextVar[Optional[Dict[str, int]]] = ContextVar("served_versions", default=None)
+
+
+class DataVersionStore:
+    """SQLite-backed change counter and last-modified timestamp per table."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        store_dir = os.path.dirname(path)
+        if store_dir and not os.path.exists(store_dir):
+            os.makedirs(store_dir)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS data_versions (
+                    table_name  TEXT PRIMARY KEY,
+                    version     INTEGER NOT NULL,
+                    modified_at REAL NOT NULL
+                )
+            """)
+
+    @contextmanager
+    def _connect(self):
+        """Reuse one connection per thread; reads here sit on every cached request."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30)
+            self._local.conn, self._local.pid = conn, os.getpid()
+        with conn:
+            yield conn
+
+    def get(self, table: str) -> Tuple[int, datetime]:
+        """Current version and last modification time (UTC) of ``table``.
+
+        A table that was never bumped is registered at version 1, modified now,
+        so caches populated before the first tracked write still revalidate.
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT version, modified_at FROM data_versions WHERE table_name = ?", (table,)
+            ).fetchone()
+            if row is None:
+                conn.execute(
+                    "INSERT OR IGNORE INTO data_versions (table_name, version, modified_at) VALUES (?, 1, ?)",
+                    (table, datetime.now(timezone.utc).timestamp())
+                )
+                row = conn.execute(
+                    "SELECT version, modified_at FROM data_versions WHERE table_name = ?", (table,)
+                ).fetchone()
+        return row[0], datetime.fromtimestamp(row[1], timezone.utc)
+
+    def bump(self, table: str) -> int:
+        """Record a change to ``table`` and return its new version."""
+        now = datetime.now(timezone.utc).timestamp()
+        with self._connect() as conn:
+            conn.execute("""
+                INSERT INTO data_versions (table_name, version, modified_at) VALUES (?, 2, ?)
+                ON CONFLICT(table_name) DO UPDATE SET version = version + 1, modified_at = excluded.modified_at
+            """, (table, now))
+            version = conn.execute(
+                "SELECT version FROM data_versions WHERE table_name = ?", (table,)
+            ).fetchone()[0]
+        logger.debug(f"Data version of {table} bumped to {version}")
+        return version
+
+
+_store: Optional[DataVersionStore] = None
+_store_lock = threading.Lock()
+
+
+def get_version_store() -> DataVersionStore:
+    """Process-wide store, created on first use."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = DataVersionStore(cache_settings.version_store_path)
+        return _store
+
+
+def bump_data_version(table: str = "orders") -> Optional[int]:
+    """Invalidate cached representations of ``table`` after a successful write.
+
+    Failures are logged and swallowed: the write itself already succeeded and
+    must not be reported as an error because a cache counter could not move.
+    """
+    try:
+        return get_version_store().bump(table)
+    except Exception as e:
+        logger.error(f"Error bumping data version of {table}: {e}")
+        return None
+
+
+@contextmanager
+def track_served_versions() -> Iterator[Dict[str, int]]:
+    """Collect the versions reported with ``note_served_version`` inside the block."""
+    served: Dict[str, int] = {}
+    token = _served_versions.set(served)
+    try:
+        yield served
+    finally:
+        _served_versions.reset(token)
+
+
+def note_served_version(table: str, version: int):
+    """Record that the current response was built from ``table`` at ``version``.
+
+    The oldest version reported for a table wins; outside
+    ``track_served_versions`` this does nothing.
+    """
+    served = _served_versions.get()
+    if served is not None:
+        served[table] = min(version, served.get(table, version))
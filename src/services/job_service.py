@@ -0,0 +1,322 @@
+"""
+Background job runner for long-running cleaning and export tasks.
+
+Job state lives in a SQLite table, so any web worker process can report
+status and results of a job submitted to another one. With
+``JOB_RUNNER=process`` (the default) web workers only queue jobs and a
+separate runner process (``run_jobs.py``, started with the server) claims and
+runs them, so jobs neither share a worker's GIL and memory nor die when
+Gunicorn recycles it; with ``thread`` they run on a thread pool of the
+submitting process, taking threads from the requests it serves.
+
+Running jobs refresh a heartbeat; one whose heartbeat is older than
+``JOB_STALE_SECONDS`` (its process was killed) is marked failed the next time
+jobs are read.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+from loguru import logger
+
+from src.config.settings import job_settings
+
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+# Where jobs run: on a thread pool of the submitting process or in run_jobs.py
+JOB_RUNNERS = ("thread", "process")
+
+
+class JobStore:
+    """SQLite-backed persistence for job state."""
+
+    def __init__(self, path: str):
+        self.path = path
+        store_dir = os.path.dirname(path)
+        if store_dir and not os.path.exists(store_dir):
+            os.makedirs(store_dir)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    job_id      TEXT PRIMARY KEY,
+                    kind        TEXT NOT NULL,
+                    status      TEXT NOT NULL,
+                    progress    REAL NOT NULL DEFAULT 0,
+                    message     TEXT,
+                    result      TEXT,
+                    error       TEXT,
+                    pid          INTEGER,
+                    created_at   TEXT NOT NULL,
+                    started_at   TEXT,
+                    finished_at  TEXT,
+                    heartbeat_at TEXT
+                )
+            """)
+            # Stores created before heartbeats existed
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+            if "heartbeat_at" not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN heartbeat_at TEXT")
+
+    @contextmanager
+    def _connect(self):
+        """Open a short-lived connection; commit on success and always close."""
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def create(self, job_id: str, kind: str):
+        """Insert a new queued job owned by the current process."""
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (job_id, kind, status, pid, created_at) VALUES (?, ?, ?, ?, ?)",
+                (job_id, kind, JOB_QUEUED, os.getpid(), datetime.now().isoformat())
+            )
+
+    def update(self, job_id: str, **fields):
+        """Update columns of a job; ``result`` is stored as JSON."""
+        if "result" in fields:
+            fields["result"] = json.dumps(fields["result"], default=str)
+        assignments = ", ".join(f"{column} = ?" for column in fields)
+        with self._connect() as conn:
+            conn.execute(f"UPDATE jobs SET {assignments} WHERE job_id = ?", (*fields.values(), job_id))
+
+    def start(self, job_id: str) -> bool:
+        """Move a queued job to running in this process; False if someone else took it."""
+        now = datetime.now().isoformat()
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, pid = ?, started_at = ?, heartbeat_at = ? "
+                "WHERE job_id = ? AND status = ?",
+                (JOB_RUNNING, os.getpid(), now, now, job_id, JOB_QUEUED)
+            )
+        return cursor.rowcount == 1
+
+    def claim_next(self, kinds: List[str]) -> Optional[Dict[str, Any]]:
+        """Start the oldest queued job of one of ``kinds``, or return None."""
+        if not kinds:
+            return None
+        placeholders = ", ".join("?" * len(kinds))
+        while True:
+            with self._connect() as conn:
+                row = conn.execute(
+                    f"SELECT job_id, kind FROM jobs WHERE status = ? AND kind IN ({placeholders}) "
+                    "ORDER BY created_at LIMIT 1",
+                    (JOB_QUEUED, *kinds)
+                ).fetchone()
+            if row is None:
+                return None
+            if self.start(row["job_id"]):
+                return dict(row)
+
+    def heartbeat(self, job_id: str):
+        with self._connect() as conn:
+            conn.execute("UPDATE jobs SET heartbeat_at = ? WHERE job_id = ?", (datetime.now().isoformat(), job_id))
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Fetch a job with its decoded result, or None if unknown."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def list_recent(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """List the most recent jobs without their results."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT job_id, kind, status, progress, message, created_at, finished_at "
+                "FROM jobs ORDER BY created_at DESC LIMIT ?",
+                (limit,)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def fail_stale(self, stale_after: timedelta) -> int:
+        """Mark running jobs without a heartbeat for ``stale_after`` as failed."""
+        cutoff = (datetime.now() - stale_after).isoformat()
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, finished_at = ? "
+                "WHERE status = ? AND COALESCE(heartbeat_at, started_at, created_at) < ?",
+                (JOB_FAILED, "Job interrupted (no heartbeat)", datetime.now().isoformat(), JOB_RUNNING, cutoff)
+            )
+        return cursor.rowcount
+
+    def fail_orphans(self):
+        """Mark unfinished jobs whose owning process is gone as failed."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT job_id, pid FROM jobs WHERE status IN (?, ?)", (JOB_QUEUED, JOB_RUNNING)
+            ).fetchall()
+        for row in rows:
+            if not _process_alive(row["pid"]):
+                self.update(row["job_id"], status=JOB_FAILED, error="Job interrupted (worker exited)",
+                            finished_at=datetime.now().isoformat())
+
+    def purge(self, older_than: timedelta):
+        """Delete finished jobs older than the retention period."""
+        cutoff = (datetime.now() - older_than).isoformat()
+        with self._connect() as conn:
+            conn.execute(
+                "DELETE FROM jobs WHERE finished_at IS NOT NULL AND finished_at < ?", (cutoff,)
+            )
+
+
+def _process_alive(pid: Optional[int]) -> bool:
+    """Check whether a local process id still exists."""
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        pass
+    return True
+
+
+class JobService:
+    """Submit registered tasks to a background pool and track them by id."""
+
+    def __init__(self, store: Optional[JobStore] = None, max_workers: Optional[int] = None,
+                 runner: Optional[str] = None):
+        self.store = store or JobStore(job_settings.store_path)
+        self.max_workers = max_workers or job_settings.max_workers
+        self.runner = (runner or job_settings.runner).lower()
+        if self.runner not in JOB_RUNNERS:
+            raise ValueError(f"Unknown job runner '{self.runner}'. Allowed: {', '.join(JOB_RUNNERS)}")
+        self._tasks: Dict[str, Callable[..., Any]] = {}
+        self._executor = None
+        self._executor_pid = None
+        self._executor_lock = threading.Lock()
+        self._last_sweep = 0.0
+        self.store.purge(timedelta(hours=job_settings.retention_hours))
+
+    def register(self, kind: str, task: Callable[..., Any]):
+        """Register a task; it is called as ``task(progress)`` and returns a JSON-serializable result."""
+        self._tasks[kind] = task
+
+    @property
+    def kinds(self) -> List[str]:
+        """Registered job types."""
+        return sorted(self._tasks)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Return this process' executor, creating it on first use."""
+        # Threads do not survive a fork, so each worker process gets its own pool
+        with self._executor_lock:
+            if self._executor is None or self._executor_pid != os.getpid():
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="job")
+                self._executor_pid = os.getpid()
+            return self._executor
+
+    def _sweep(self):
+        """Fail the jobs whose process died, at most once per heartbeat interval."""
+        now = time.monotonic()
+        if now - self._last_sweep < job_settings.heartbeat_seconds:
+            return
+        self._last_sweep = now
+        if self.runner == "thread":
+            # Queued jobs belong to the process that will run them
+            self.store.fail_orphans()
+        failed = self.store.fail_stale(timedelta(seconds=job_settings.stale_seconds))
+        if failed:
+            logger.warning(f"Marked {failed} jobs without heartbeat as failed")
+
+    def submit(self, kind: str) -> str:
+        """Queue a job and return its id immediately."""
+        if kind not in self._tasks:
+            raise KeyError(f"Unknown job type: {kind}")
+        job_id = uuid.uuid4().hex
+        self.store.create(job_id, kind)
+        if self.runner == "thread":
+            self._get_executor().submit(self._start_and_run, job_id, kind)
+        logger.info(f"Job {job_id} ({kind}) queued")
+        return job_id
+
+    def _start_and_run(self, job_id: str, kind: str):
+        if self.store.start(job_id):
+            self._run(job_id, kind)
+
+    def _run(self, job_id: str, kind: str):
+        """Execute a started task, recording heartbeat, progress and outcome."""
+        stop = threading.Event()
+
+        def beat():
+            while not stop.wait(job_settings.heartbeat_seconds):
+                try:
+                    self.store.heartbeat(job_id)
+                except Exception as e:
+                    logger.warning(f"Job {job_id} heartbeat failed: {e}")
+
+        def progress(fraction: float, message: Optional[str] = None):
+            self.store.update(job_id, progress=round(min(max(fraction, 0.0), 1.0) * 100, 1), message=message)
+
+        threading.Thread(target=beat, name=f"job-heartbeat-{job_id[:8]}", daemon=True).start()
+        try:
+            result = self._tasks[kind](progress)
+            self.store.update(job_id, status=JOB_SUCCEEDED, progress=100.0, result=result,
+                              finished_at=datetime.now().isoformat())
+            logger.info(f"Job {job_id} ({kind}) finished")
+        except Exception as e:
+            logger.error(f"Job {job_id} ({kind}) failed: {e}")
+            self.store.update(job_id, status=JOB_FAILED, error=str(e), finished_at=datetime.now().isoformat())
+        finally:
+            stop.set()
+
+    def run_forever(self, stop: Optional[threading.Event] = None):
+        """Claim and run queued jobs until ``stop`` is set (the runner process loop).
+
+        Up to ``max_workers`` jobs run at once. Once stopped no new job is
+        claimed and the running ones are waited for.
+        """
+        stop = stop or threading.Event()
+        slots = threading.BoundedSemaphore(self.max_workers)
+        executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="job")
+        logger.info(f"Job runner started (pid {os.getpid()}, {self.max_workers} workers)")
+        try:
+            while not stop.is_set():
+                self._sweep()
+                if not slots.acquire(timeout=job_settings.poll_seconds):
+                    continue
+                try:
+                    job = self.store.claim_next(self.kinds)
+                except Exception as e:
+                    logger.error(f"Failed to claim a job: {e}")
+                    job = None
+                if job is None:
+                    slots.release()
+                    stop.wait(job_settings.poll_seconds)
+                    continue
+                logger.info(f"Job {job['job_id']} ({job['kind']}) started")
+                future = executor.submit(self._run, job["job_id"], job["kind"])
+                future.add_done_callback(lambda _: slots.release())
+        finally:
+            executor.shutdown(wait=True)
+            logger.info("Job runner stopped")
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return the current state of a job."""
+        self._sweep()
+        return self.store.get(job_id)
+
+    def list_recent(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Return the most recent jobs."""
+        self._sweep()
+        return self.store.list_recent(limit)
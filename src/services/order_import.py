@@ -0,0 +1,361 @@
+"""
+Streaming CSV import of orders, resumable and with bounded memory.
+
+Files have the layout ``/api/export/csv`` produces (a header row with the
+``OrderBase`` fields; ``order_id`` may be empty) and may be gzip-compressed.
+Rows are parsed and validated in chunks (``validate_orders``); each chunk is
+then loaded with ``COPY`` into a temporary staging table and merged into
+``orders`` with one set-based INSERT that skips rows already present (same
+``order_id`` or same business key, see ``DUPLICATE_KEY_COLUMNS``) and assigns
+new ids to rows without one.
+
+Every chunk commits together with its checkpoint in ``order_imports``, so an
+interrupted import resumes after the last committed chunk. Invalid rows go to
+a rejects CSV (original columns plus row number and errors) whose length is
+checkpointed too, so resuming never duplicates or loses rejects.
+"""
+import csv
+import gzip
+import io
+import json
+import os
+import uuid
+from itertools import islice
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Optional, TextIO
+from loguru import logger
+
+from src.config.settings import import_settings
+from src.database.partitioning import ORDER_IDS_TABLE
+from src.database.queries import ORDER_INSERT_LOCK_SQL
+from src.models.order import ORDER_FIELDS, ORDER_WRITE_FIELDS, validate_orders
+from src.services.data_version import bump_data_version
+
+
+GZIP_MAGIC = b'\x1f\x8b'
+
+# NULL marker of the COPY data: keeps NULL distinct from ''
+NULL_MARKER = r'\N'
+
+IMPORT_RUNNING = 'running'
+IMPORT_COMPLETED = 'completed'
+IMPORT_FAILED = 'failed'
+
+CHECKPOINT_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS order_imports (
+        import_id      text PRIMARY KEY,
+        source         text,
+        status         text NOT NULL,
+        rows_done      bigint NOT NULL DEFAULT 0,
+        inserted       bigint NOT NULL DEFAULT 0,
+        duplicates     bigint NOT NULL DEFAULT 0,
+        rejected       bigint NOT NULL DEFAULT 0,
+        rejects_path   text,
+        rejects_offset bigint NOT NULL DEFAULT 0,
+        error          text,
+        started_at     timestamptz NOT NULL DEFAULT now(),
+        updated_at     timestamptz NOT NULL DEFAULT now()
+    )
+"""
+
+# Same columns and types as orders, without its NOT NULL constraints
+# (order_id may be empty); emptied by every commit
+STAGING_TABLE_SQL = f"""
+    CREATE TEMP TABLE IF NOT EXISTS order_import_staging ON COMMIT DELETE ROWS AS
+    SELECT 0::bigint AS line_no, {', '.join(ORDER_FIELDS)} FROM orders WITH NO DATA
+"""
+
+
+class _PrefixedReader(io.RawIOBase):
+    """Binary stream that replays bytes already read from ``stream`` first."""
+
+    def __init__(self, prefix: bytes, stream: BinaryIO):
+        self._prefix = prefix
+        self._stream = stream
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        if self._prefix:
+            size = min(len(buffer), len(self._prefix))
+            buffer[:size] = self._prefix[:size]
+            self._prefix = self._prefix[size:]
+            return size
+        data = self._stream.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+
+def open_csv_stream(stream: BinaryIO) -> TextIO:
+    """Text view of a binary CSV stream, decompressing it if it is gzip.
+
+    Compression is detected from the content, not the file name, so uploads
+    work whatever they are called. A UTF-8 BOM is skipped.
+    """
+    head = stream.read(2)
+    raw = io.BufferedReader(_PrefixedReader(head, stream))
+    if head == GZIP_MAGIC:
+        raw = gzip.GzipFile(fileobj=raw)
+    return io.TextIOWrapper(raw, encoding='utf-8-sig', newline='')
+
+
+def file_import_id(path: str) -> str:
+    """Stable import id of a local file (path, size and modification time),
+    so importing the same file again resumes instead of starting over."""
+    stat = os.stat(path)
+    return uuid.uuid5(uuid.NAMESPACE_URL, f"{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}").hex
+
+
+def _chunks(rows: Iterator[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _merge_sql(dedupe: bool, id_table: str = "orders") -> str:
+    """INSERT of the staged rows that are new, in file order.
+
+    Within the chunk the first occurrence of an order_id (and, with
+    ``dedupe``, of a business key) wins; rows whose order_id is already in
+    ``id_table`` (the ``order_ids`` registry of a partitioned orders, which
+    keeps the ids of archived partitions too) or whose business key already
+    exists in orders (``idx_orders_business_key``) are skipped. Rows without
+    order_id get ids from ``next_id`` on.
+    """
+    from src.services.order_service import DUPLICATE_KEY_COLUMNS
+
+    key_match = ' AND '.join(f"o.{column} = s.{column}" for column in DUPLICATE_KEY_COLUMNS)
+    ranks = ["CASE WHEN order_id IS NULL THEN 1 "
+             "ELSE row_number() OVER (PARTITION BY order_id ORDER BY line_no) END AS id_rank"]
+    conditions = [
+        "s.id_rank = 1",
+        f"NOT EXISTS (SELECT 1 FROM {id_table} o WHERE o.order_id = s.order_id)",
+    ]
+    if dedupe:
+        ranks.append(f"row_number() OVER (PARTITION BY {', '.join(DUPLICATE_KEY_COLUMNS)} ORDER BY line_no) AS key_rank")
+        conditions += ["s.key_rank = 1", f"NOT EXISTS (SELECT 1 FROM orders o WHERE {key_match})"]
+    return f"""
+        WITH ranked AS (
+            SELECT s.*, {', '.join(ranks)}
+            FROM order_import_staging s
+        ), fresh AS (
+            SELECT s.* FROM ranked s
+            WHERE {' AND '.join(conditions)}
+        )
+        INSERT INTO orders ({', '.join(ORDER_FIELDS)})
+        SELECT COALESCE(order_id, %(next_id)s - 1 + sum(CASE WHEN order_id IS NULL THEN 1 ELSE 0 END)
+                   OVER (ORDER BY line_no)),
+               {', '.join(ORDER_WRITE_FIELDS)}
+        FROM fresh
+    """
+
+
+class OrderImport:
+    """One import run: a source stream, its checkpoint row and rejects file."""
+
+    def __init__(self, db, import_id: Optional[str] = None, source: Optional[str] = None,
+                 rejects_path: Optional[str] = None, chunk_rows: Optional[int] = None, dedupe: bool = True):
+        self.db = db
+        self.import_id = import_id or uuid.uuid4().hex
+        self.source = source
+        self.rejects_path = rejects_path or os.path.join(import_settings.rejects_dir, f"{self.import_id}.rejects.csv")
+        self.chunk_rows = chunk_rows or import_settings.chunk_rows
+        self.dedupe = dedupe
+        self.summary: Dict[str, Any] = {
+            'import_id': self.import_id,
+            'received': 0,
+            'inserted': 0,
+            'duplicates': 0,
+            'rejected': 0,
+            'rejects_file': None,
+            'errors': [],
+            'resumed_from': 0,
+        }
+
+    def _checkpoint(self) -> Dict[str, Any]:
+        """Create the checkpoint row (and table) or load the one to resume from."""
+        with self.db.get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(CHECKPOINT_TABLE_SQL)
+                cursor.execute("""
+                    INSERT INTO order_imports (import_id, source, status, rejects_path)
+                    VALUES (%(import_id)s, %(source)s, %(status)s, %(rejects_path)s)
+                    ON CONFLICT (import_id) DO NOTHING
+                """, {'import_id': self.import_id, 'source': self.source,
+                      'status': IMPORT_RUNNING, 'rejects_path': self.rejects_path})
+                cursor.execute("SELECT * FROM order_imports WHERE import_id = %s", (self.import_id,))
+                checkpoint = cursor.fetchone()
+            conn.commit()
+        return checkpoint
+
+    def _set_status(self, status: str, error: Optional[str] = None):
+        with self.db.get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    UPDATE order_imports SET status = %s, error = %s, updated_at = now()
+                    WHERE import_id = %s
+                """, (status, error, self.import_id))
+            conn.commit()
+
+    def _open_rejects(self, fieldnames: List[str], offset: int) -> TextIO:
+        """Rejects file cut back to the last checkpoint (new files get a header)."""
+        rejects_dir = os.path.dirname(self.rejects_path)
+        if rejects_dir:
+            os.makedirs(rejects_dir, exist_ok=True)
+        rejects = open(self.rejects_path, 'a+', encoding='utf-8', newline='')
+        if os.path.getsize(self.rejects_path) < offset:
+            # The file was removed or cut since the checkpoint: start it over
+            offset = 0
+        rejects.truncate(offset)
+        if offset == 0:
+            csv.writer(rejects).writerow(['row', 'errors'] + fieldnames)
+        return rejects
+
+    def _write_rejects(self, rejects: TextIO, fieldnames: List[str], chunk: List[Dict[str, Any]],
+                       errors: List[Dict[str, Any]], first_row: int) -> int:
+        """Append the rejected rows of a chunk; returns the file length after them."""
+        writer = csv.writer(rejects)
+        for error in errors:
+            row = chunk[error['row']]
+            writer.writerow([first_row + error['row'], json.dumps(error['errors'], ensure_ascii=False)]
+                            + [row.get(field) for field in fieldnames])
+        rejects.flush()
+        return rejects.tell()
+
+    @staticmethod
+    def _copy_buffer(valid, first_row: int) -> io.StringIO:
+        """CSV for ``COPY order_import_staging`` from validated (index, order) pairs."""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for index, order in valid:
+            writer.writerow([first_row + index] + [
+                NULL_MARKER if value is None else value
+                for value in (getattr(order, field) for field in ORDER_FIELDS)
+            ])
+        buffer.seek(0)
+        return buffer
+
+    def _merge_chunk(self, valid, first_row: int, rows_done: int, rejected: int, rejects_offset: int) -> int:
+        """Stage and merge one chunk and advance the checkpoint, in one transaction.
+
+        Returns the number of inserted orders.
+
+        Raises:
+            RuntimeError: If another process advanced this import concurrently.
+        """
+        with self.db.get_connection() as conn:
+            with conn.cursor() as cursor:
+                inserted = 0
+                if valid:
+                    cursor.execute(STAGING_TABLE_SQL)
+                    cursor.copy_expert(
+                        f"COPY order_import_staging (line_no, {', '.join(ORDER_FIELDS)}) FROM STDIN "
+                        f"WITH (FORMAT csv, NULL '{NULL_MARKER}')",
+                        self._copy_buffer(valid, first_row)
+                    )
+                    # Temp tables are never auto-analyzed: without statistics the
+                    # planner may anti-join all of orders instead of probing
+                    # its indexes once per staged row
+                    cursor.execute("ANALYZE order_import_staging")
+                    cursor.execute("SELECT to_regclass(%s) IS NOT NULL AS registry", (ORDER_IDS_TABLE,))
+                    id_table = ORDER_IDS_TABLE if cursor.fetchone()['registry'] else "orders"
+                    # Taken after the COPY so only the merge holds it: id
+                    # allocation and the existence checks see no concurrent
+                    # insert, while updates and deletes of orders go on
+                    cursor.execute(ORDER_INSERT_LOCK_SQL)
+                    cursor.execute(f"""
+                        SELECT GREATEST((SELECT MAX(order_id) FROM {id_table}),
+                                        (SELECT MAX(order_id) FROM order_import_staging), 0) + 1 AS next_id
+                    """)
+                    cursor.execute(_merge_sql(self.dedupe, id_table), {'next_id': cursor.fetchone()['next_id']})
+                    inserted = cursor.rowcount
+                cursor.execute("""
+                    UPDATE order_imports
+                    SET rows_done = %(rows_done)s, inserted = inserted + %(inserted)s,
+                        duplicates = duplicates + %(duplicates)s, rejected = %(rejected)s,
+                        rejects_offset = %(rejects_offset)s, updated_at = now()
+                    WHERE import_id = %(import_id)s AND rows_done = %(first_row)s
+                """, {
+                    'rows_done': rows_done, 'inserted': inserted, 'duplicates': len(valid) - inserted,
+                    'rejected': rejected, 'rejects_offset': rejects_offset,
+                    'import_id': self.import_id, 'first_row': first_row,
+                })
+                if cursor.rowcount != 1:
+                    raise RuntimeError(f"Import {self.import_id} was advanced by another process")
+            conn.commit()
+        return inserted
+
+    def run(self, lines: TextIO, progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """Import the CSV text in ``lines``, resuming after the last checkpoint.
+
+        Returns counts for the whole import (including chunks committed by an
+        earlier run) and the first ``IMPORT_MAX_REPORTED_ERRORS`` rejected rows
+        of this run; every rejected row is in the rejects file.
+        """
+        checkpoint = self._checkpoint()
+        summary = self.summary
+        if checkpoint['status'] == IMPORT_COMPLETED:
+            logger.info(f"Import {self.import_id} already completed")
+            summary.update(received=checkpoint['rows_done'], inserted=checkpoint['inserted'],
+                           duplicates=checkpoint['duplicates'], rejected=checkpoint['rejected'],
+                           resumed_from=checkpoint['rows_done'], already_completed=True,
+                           rejects_file=checkpoint['rejects_path'] if checkpoint['rejected'] else None)
+            return summary
+        self.rejects_path = checkpoint['rejects_path'] or self.rejects_path
+        rows_done = summary['resumed_from'] = checkpoint['rows_done']
+        summary.update(received=rows_done, inserted=checkpoint['inserted'],
+                       duplicates=checkpoint['duplicates'], rejected=checkpoint['rejected'])
+        if checkpoint['status'] != IMPORT_RUNNING:
+            self._set_status(IMPORT_RUNNING)
+        if rows_done:
+            logger.info(f"Resuming import {self.import_id} after {rows_done} rows")
+
+        rejects = None
+        rejects_offset = checkpoint['rejects_offset']
+        try:
+            reader = csv.DictReader(lines)
+            fieldnames = reader.fieldnames or []
+            if fieldnames:
+                rejects = self._open_rejects(fieldnames, rejects_offset)
+            for chunk in _chunks(islice(reader, rows_done, None), self.chunk_rows):
+                first_row = rows_done
+                valid, errors = validate_orders(chunk)
+                if errors:
+                    rejects_offset = self._write_rejects(rejects, fieldnames, chunk, errors, first_row)
+                rows_done += len(chunk)
+                inserted = self._merge_chunk(valid, first_row, rows_done,
+                                             summary['rejected'] + len(errors), rejects_offset)
+                if inserted:
+                    bump_data_version("orders")
+
+                summary['received'] = rows_done
+                summary['inserted'] += inserted
+                summary['duplicates'] += len(valid) - inserted
+                summary['rejected'] += len(errors)
+                room = import_settings.max_reported_errors - len(summary['errors'])
+                summary['errors'].extend(
+                    dict(error, row=first_row + error['row']) for error in errors[:max(room, 0)]
+                )
+                logger.info(f"Import {self.import_id}: {rows_done} rows read, {summary['inserted']} inserted, "
+                            f"{summary['duplicates']} duplicates, {summary['rejected']} rejected")
+                if progress:
+                    progress(summary)
+            self._set_status(IMPORT_COMPLETED)
+        except Exception as e:
+            logger.error(f"Import {self.import_id} failed after {rows_done} rows: {e}")
+            try:
+                self._set_status(IMPORT_FAILED, str(e))
+            except Exception as status_error:
+                logger.warning(f"Could not mark import {self.import_id} as failed: {status_error}")
+            raise
+        finally:
+            if rejects is not None:
+                rejects.close()
+        if summary['rejected']:
+            summary['rejects_file'] = self.rejects_path
+        elif rejects is not None:
+            # Only the header: nothing was rejected
+            os.remove(self.rejects_path)
+        return summary
@@ -1,12 +1,30 @@
 """
 Order service for database operations and data cleaning.
 """
-from typing import List, Dict, Any, Optional, Tuple
-import pandas as pd
+from typing import List, Dict, Any, BinaryIO, Callable, Iterable, Optional, Tuple, TYPE_CHECKING
+from psycopg2.extras import execute_values
 from loguru import logger
 
+from src.config.settings import analytics_settings
 from src.database.connection import db_connection
-from src.models.order import Order, OrderCleaningResult
+from src.database.queries import ORDER_INSERT_LOCK_SQL, update_order_statement
+from src.services.data_version import bump_data_version, get_version_store
+from src.models.order import (
+    ORDER_FIELDS, ORDER_WRITE_FIELDS, OrderCleaningResult, OrderCreate, OrderValidationError,
+    select_list, validate_order_update, validate_orders
+)
+
+if TYPE_CHECKING:
+    import pandas as pd
+    from src.services.analytics_engine import EmbeddedAnalytics
+    from src.services.quality_rules import ParallelRuleExecutor
+
+
+# Business key used to detect duplicate orders
+DUPLICATE_KEY_COLUMNS = ['customer_name', 'order_date', 'category', 'quantity', 'subtotal_amount']
+
+# Engines for the quality report, duplicate detection and dashboard rollups
+ANALYTICS_BACKENDS = ('pandas', 'duckdb')
 
 
 class OrderService:
@@ -14,11 +32,37 @@ class OrderService:
     
     def __init__(self):
         self.db = db_connection
+        self._rule_executor = None
+        self._embedded_analytics = None
+    
+    @property
+    def rule_executor(self) -> "ParallelRuleExecutor":
+        """Quality rule executor; pandas is only imported once a check runs."""
+        if self._rule_executor is None:
+            from src.services.quality_rules import ParallelRuleExecutor
+            self._rule_executor = ParallelRuleExecutor(self.db)
+        return self._rule_executor
     
-    def get_all_orders(self) -> List[Dict[str, Any]]:
-        """Retrieve all orders from the database."""
+    @property
+    def embedded_analytics(self) -> "EmbeddedAnalytics":
+        """DuckDB analytics over the orders snapshot; duckdb is only imported on first use."""
+        if self._embedded_analytics is None:
+            from src.services.analytics_engine import EmbeddedAnalytics
+            self._embedded_analytics = EmbeddedAnalytics(self.db)
+        return self._embedded_analytics
+    
+    @staticmethod
+    def analytics_backend(backend: Optional[str] = None) -> str:
+        """``backend`` or the configured ``ANALYTICS_BACKEND``, validated."""
+        backend = (backend or analytics_settings.backend).lower()
+        if backend not in ANALYTICS_BACKENDS:
+            raise ValueError(f"Unknown analytics backend '{backend}'. Allowed: {', '.join(ANALYTICS_BACKENDS)}")
+        return backend
+    
+    def get_all_orders(self, columns: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Retrieve all orders from the database, optionally only some columns."""
         try:
-            query = "SELECT * FROM orders ORDER BY order_id"
+            query = f"SELECT {select_list(columns)} FROM orders ORDER BY order_id"
             orders = self.db.execute_query(query)
             logger.info(f"Retrieved {len(orders)} orders from database")
             return orders
@@ -26,51 +70,72 @@ class OrderService:
             logger.error(f"Failed to retrieve orders: {e}")
             raise
     
-    def get_orders_by_status(self, status: str) -> List[Dict[str, Any]]:
+    def get_orders_by_status(self, status: str, columns: Optional[List[str]] = None) -> List[Dict[str, Any]]:
         """Retrieve orders by status."""
         try:
-            query = "SELECT * FROM orders WHERE status = %(status)s ORDER BY order_id"
-            orders = self.db.execute_query(query, {"status": status})
+            if columns:
+                query = f"SELECT {select_list(columns)} FROM orders WHERE status = %(status)s ORDER BY order_id"
+                orders = self.db.execute_query(query, {"status": status})
+            else:
+                orders = self.db.execute_prepared('orders_by_status', {"status": status})
             logger.info(f"Retrieved {len(orders)} orders with status '{status}'")
             return orders
         except Exception as e:
             logger.error(f"Failed to retrieve orders by status: {e}")
             raise
     
-    def get_orders_dataframe(self) -> pd.DataFrame:
-        """Get all orders as a pandas DataFrame for data analysis."""
+    def get_orders_dataframe(self, columns: Optional[List[str]] = None) -> "pd.DataFrame":
+        """Get orders as a pandas DataFrame for data analysis.
+        
+        Only ``columns`` are fetched when given, so checks that use a few
+        columns transfer and hold proportionally less data.
+        """
+        import pandas as pd
+        
         try:
-            orders = self.get_all_orders()
-            df = pd.DataFrame(orders)
+            orders = self.get_all_orders(columns)
+            df = pd.DataFrame(orders, columns=columns)
             logger.info(f"Created DataFrame with {len(df)} rows and {len(df.columns)} columns")
             return df
         except Exception as e:
             logger.error(f"Failed to create DataFrame: {e}")
             raise
     
-    def clean_duplicate_orders(self) -> OrderCleaningResult:
-        """Remove duplicate orders based on business logic."""
+    def _find_duplicates(self) -> Tuple[int, int, List[Dict[str, Any]]]:
+        """Total rows, duplicate count and the first duplicate rows, with pandas."""
+        # Get the orders, only the columns the check uses
+        orders_df = self.get_orders_dataframe(['order_id'] + DUPLICATE_KEY_COLUMNS)
+        
+        # Identify duplicates based on business logic
+        # Duplicates: same customer, same date, same category, same quantity
+        duplicates = orders_df.duplicated(subset=DUPLICATE_KEY_COLUMNS, keep='first')
+        examples = orders_df[duplicates][['order_id', 'customer_name', 'order_date', 'category']].head(10)
+        return len(orders_df), int(duplicates.sum()), examples.to_dict('records')
+    
+    def clean_duplicate_orders(self, backend: Optional[str] = None) -> OrderCleaningResult:
+        """Remove duplicate orders based on business logic.
+        
+        ``backend`` overrides ``ANALYTICS_BACKEND`` (``pandas`` or ``duckdb``).
+        """
         try:
-            # Get all orders
-            orders_df = self.get_orders_dataframe()
-            total_records = len(orders_df)
-            
-            # Identify duplicates based on business logic
-            # Duplicates: same customer, same date, same category, same quantity
-            duplicates = orders_df.duplicated(
-                subset=['customer_name', 'order_date', 'category', 'quantity', 'subtotal_amount'], 
-                keep='first'
-            )
-            duplicate_count = duplicates.sum()
+            if self.analytics_backend(backend) == 'duckdb':
+                total_records, duplicate_count, duplicate_examples = \
+                    self.embedded_analytics.find_duplicates(DUPLICATE_KEY_COLUMNS)
+            else:
+                total_records, duplicate_count, duplicate_examples = self._find_duplicates()
             
             if duplicate_count > 0:
-                # Get duplicate records for review
-                duplicate_records = orders_df[duplicates]
                 logger.warning(f"Found {duplicate_count} duplicate orders")
                 
-                # Log some examples of duplicates
-                for idx, row in duplicate_records.head(5).iterrows():
-                    logger.warning(f"Duplicate: Customer={row['customer_name']}, Date={row['order_date']}, Category={row['category']}")
+                # Log some examples of duplicates in a single record
+                logger.opt(lazy=True).warning(
+                    "Duplicate examples: {}",
+                    lambda: "; ".join(
+                        f"Customer={example['customer_name']}, Date={example['order_date']}, "
+                        f"Category={example['category']}"
+                        for example in duplicate_examples[:5]
+                    )
+                )
                 
                 return OrderCleaningResult(
                     total_records=total_records,
@@ -79,7 +144,7 @@ class OrderService:
                     warnings=duplicate_count,
                     cleaning_summary={
                         "duplicates_found": duplicate_count,
-                        "duplicate_examples": duplicate_records[['order_id', 'customer_name', 'order_date', 'category']].head(10).to_dict('records')
+                        "duplicate_examples": duplicate_examples
                     }
                 )
             else:
@@ -96,75 +161,58 @@ class OrderService:
             logger.error(f"Failed to clean duplicate orders: {e}")
             raise
     
+    def _count_orders(self) -> int:
+        """Count rows in the orders table."""
+        return int(self.db.execute_prepared('count_orders')[0]['total'])
+    
     def clean_incomplete_records(self) -> OrderCleaningResult:
         """Clean incomplete records - missing required fields or invalid data."""
         try:
-            orders_df = self.get_orders_dataframe()
-            total_records = len(orders_df)
+            partial = self.rule_executor.run(
+                'incomplete', self._count_orders(), lambda columns: self.get_orders_dataframe(columns)
+            )
             errors = 0
             warnings = 0
-            incomplete_records = []
             
             # Check for null values in required fields
-            required_fields = ['status', 'customer_name', 'order_date', 'quantity', 
-                             'subtotal_amount', 'tax_rate', 'shipping_cost', 'category', 'subcategory']
-            
-            null_counts = orders_df[required_fields].isnull().sum()
-            total_nulls = null_counts.sum()
-            
+            null_counts = partial['null_counts']
+            total_nulls = sum(null_counts.values())
             if total_nulls > 0:
                 logger.warning(f"Found {total_nulls} null values in required fields")
                 warnings += total_nulls
-                
-                # Get records with null values
-                for field in required_fields:
-                    if null_counts[field] > 0:
-                        null_records = orders_df[orders_df[field].isnull()]
-                        incomplete_records.extend(null_records['order_id'].tolist())
-                        logger.warning(f"Field '{field}' has {null_counts[field]} null values")
+                for field, count in null_counts.items():
+                    if count > 0:
+                        logger.warning(f"Field '{field}' has {count} null values")
             
             # Check for empty strings in text fields
-            text_fields = ['status', 'customer_name', 'category', 'subcategory']
-            for field in text_fields:
-                empty_strings = (orders_df[field] == '').sum()
-                if empty_strings > 0:
-                    logger.warning(f"Field '{field}' has {empty_strings} empty strings")
-                    warnings += empty_strings
-                    empty_records = orders_df[orders_df[field] == '']
-                    incomplete_records.extend(empty_records['order_id'].tolist())
+            for field, count in partial['empty_strings'].items():
+                if count > 0:
+                    logger.warning(f"Field '{field}' has {count} empty strings")
+                    warnings += count
             
             # Check for negative values in numeric fields
-            numeric_fields = ['quantity', 'subtotal_amount', 'tax_rate', 'shipping_cost']
-            for field in numeric_fields:
-                negative_values = (orders_df[field] < 0).sum()
-                if negative_values > 0:
-                    logger.error(f"Field '{field}' has {negative_values} negative values")
-                    errors += negative_values
-                    negative_records = orders_df[orders_df[field] < 0]
-                    incomplete_records.extend(negative_records['order_id'].tolist())
+            for field, count in partial['negative_values'].items():
+                if count > 0:
+                    logger.error(f"Field '{field}' has {count} negative values")
+                    errors += count
             
             # Check for invalid tax rates (> 100%)
-            invalid_tax_rates = (orders_df['tax_rate'] > 1.0).sum()
+            invalid_tax_rates = partial['invalid_tax_rates']
             if invalid_tax_rates > 0:
                 logger.error(f"Found {invalid_tax_rates} invalid tax rates (> 100%)")
                 errors += invalid_tax_rates
-                invalid_tax_records = orders_df[orders_df['tax_rate'] > 1.0]
-                incomplete_records.extend(invalid_tax_records['order_id'].tolist())
-            
-            # Remove duplicates from incomplete records list
-            incomplete_records = list(set(incomplete_records))
             
             return OrderCleaningResult(
-                total_records=total_records,
-                cleaned_records=len(incomplete_records),
+                total_records=partial['total_records'],
+                cleaned_records=partial['problematic_records'],
                 errors=errors,
                 warnings=warnings,
                 cleaning_summary={
-                    "incomplete_records": len(incomplete_records),
-                    "null_values": null_counts.to_dict(),
+                    "incomplete_records": partial['problematic_records'],
+                    "null_values": null_counts,
                     "errors_found": errors,
                     "warnings_found": warnings,
-                    "problematic_order_ids": incomplete_records[:20]  # Show first 20
+                    "problematic_order_ids": partial['problematic_order_ids']  # Lowest 20 IDs
                 }
             )
                 
@@ -175,80 +223,49 @@ class OrderService:
     def validate_data_types(self) -> OrderCleaningResult:
         """Validate data types and business rules in orders data."""
         try:
-            orders_df = self.get_orders_dataframe()
-            total_records = len(orders_df)
+            partial = self.rule_executor.run(
+                'validation', self._count_orders(), lambda columns: self.get_orders_dataframe(columns)
+            )
+            counts = partial['counts']
             errors = 0
             warnings = 0
             validation_issues = []
-            
-            # Validate numeric fields
-            numeric_fields = {
-                'quantity': 'integer',
-                'subtotal_amount': 'decimal',
-                'tax_rate': 'decimal',
-                'shipping_cost': 'decimal'
-            }
-            
-            for field, expected_type in numeric_fields.items():
-                if field in orders_df.columns:
-                    # Check for non-numeric values
-                    invalid_numeric = pd.to_numeric(orders_df[field], errors='coerce').isnull().sum()
-                    if invalid_numeric > 0:
-                        warnings += invalid_numeric
-                        logger.warning(f"Found {invalid_numeric} invalid {field} values (non-numeric)")
-                        validation_issues.append(f"{field}: {invalid_numeric} non-numeric values")
-            
-            # Validate date field
-            if 'order_date' in orders_df.columns:
-                invalid_dates = pd.to_datetime(orders_df['order_date'], errors='coerce').isnull().sum()
-                if invalid_dates > 0:
-                    warnings += invalid_dates
-                    logger.warning(f"Found {invalid_dates} invalid order_date values")
-                    validation_issues.append(f"order_date: {invalid_dates} invalid dates")
-            
-            # Validate business rules
-            # Check for reasonable quantity values
-            if 'quantity' in orders_df.columns:
-                extreme_quantities = ((orders_df['quantity'] > 1000) | (orders_df['quantity'] == 0)).sum()
-                if extreme_quantities > 0:
-                    warnings += extreme_quantities
-                    logger.warning(f"Found {extreme_quantities} extreme quantity values (0 or >1000)")
-                    validation_issues.append(f"quantity: {extreme_quantities} extreme values")
-            
-            # Check for reasonable amounts
-            if 'subtotal_amount' in orders_df.columns:
-                extreme_amounts = (orders_df['subtotal_amount'] > 100000).sum()
-                if extreme_amounts > 0:
-                    warnings += extreme_amounts
-                    logger.warning(f"Found {extreme_amounts} extreme subtotal_amount values (>100,000)")
-                    validation_issues.append(f"subtotal_amount: {extreme_amounts} extreme values")
-            
-            # Check for reasonable shipping costs
-            if 'shipping_cost' in orders_df.columns:
-                extreme_shipping = (orders_df['shipping_cost'] > 1000).sum()
-                if extreme_shipping > 0:
-                    warnings += extreme_shipping
-                    logger.warning(f"Found {extreme_shipping} extreme shipping_cost values (>1000)")
-                    validation_issues.append(f"shipping_cost: {extreme_shipping} extreme values")
-            
-            # Validate status values
-            if 'status' in orders_df.columns:
-                valid_statuses = ['pending', 'processing', 'shipped', 'delivered', 'cancelled', 'returned']
-                invalid_statuses = (~orders_df['status'].str.lower().isin(valid_statuses)).sum()
-                if invalid_statuses > 0:
-                    warnings += invalid_statuses
-                    logger.warning(f"Found {invalid_statuses} invalid status values")
-                    validation_issues.append(f"status: {invalid_statuses} invalid values")
+            sample_order_ids = {}
+            
+            # (check, issue label, log message) in reporting order
+            checks = [
+                ('quantity_non_numeric', 'quantity: {} non-numeric values', 'Found {} invalid quantity values (non-numeric)'),
+                ('subtotal_amount_non_numeric', 'subtotal_amount: {} non-numeric values', 'Found {} invalid subtotal_amount values (non-numeric)'),
+                ('tax_rate_non_numeric', 'tax_rate: {} non-numeric values', 'Found {} invalid tax_rate values (non-numeric)'),
+                ('shipping_cost_non_numeric', 'shipping_cost: {} non-numeric values', 'Found {} invalid shipping_cost values (non-numeric)'),
+                ('order_date_invalid', 'order_date: {} invalid dates', 'Found {} invalid order_date values'),
+                ('quantity_extreme', 'quantity: {} extreme values', 'Found {} extreme quantity values (0 or >1000)'),
+                ('subtotal_amount_extreme', 'subtotal_amount: {} extreme values', 'Found {} extreme subtotal_amount values (>100,000)'),
+                ('shipping_cost_extreme', 'shipping_cost: {} extreme values', 'Found {} extreme shipping_cost values (>1000)'),
+                ('status_invalid', 'status: {} invalid values', 'Found {} invalid status values'),
+                ('subtotal_amount_outlier', 'subtotal_amount: {} outliers within their category', 'Found {} subtotal_amount outliers (IQR per category)'),
+                ('shipping_cost_outlier', 'shipping_cost: {} outliers within their category', 'Found {} shipping_cost outliers (IQR per category)'),
+                ('unit_price_outlier', 'unit price: {} outliers within their subcategory', 'Found {} unit price outliers (robust z per subcategory)'),
+                ('shipping_ratio_anomaly', 'shipping/subtotal: {} anomalous ratios', 'Found {} anomalous shipping-to-subtotal ratios (robust z per category)'),
+            ]
+            for check, issue, message in checks:
+                count = counts[check]
+                if count > 0:
+                    warnings += count
+                    logger.warning(message.format(count))
+                    validation_issues.append(issue.format(count))
+                    sample_order_ids[check] = partial['sample_order_ids'][check]
             
             return OrderCleaningResult(
-                total_records=total_records,
+                total_records=partial['total_records'],
                 cleaned_records=0,
                 errors=errors,
                 warnings=warnings,
                 cleaning_summary={
                     "validation_issues": validation_issues,
                     "data_type_errors": errors,
-                    "data_type_warnings": warnings
+                    "data_type_warnings": warnings,
+                    "sample_order_ids": sample_order_ids
                 }
             )
             
@@ -285,51 +302,103 @@ class OrderService:
         else:
             return str(pandas_obj)
 
-    def get_data_quality_report(self) -> Dict[str, Any]:
-        """Generate a comprehensive data quality report."""
+    def get_basic_statistics(self, frame: Optional["pd.DataFrame"] = None,
+                             batches: Optional[Iterable["pd.DataFrame"]] = None) -> Dict[str, Any]:
+        """Per-column statistics from the streaming statistics engine.
+        
+        The engine is reused from disk while the orders data version is
+        unchanged. Otherwise it consumes ``frame`` when the caller already
+        holds the rows, or ``batches`` (e.g. from the embedded analytics
+        snapshot), or streams the table (in parallel on large tables).
+        """
+        from src.services.statistics_engine import STATS_COLUMNS, StatisticsEngine, compute_statistics, statistics_store
+        
         try:
-            orders_df = self.get_orders_dataframe()
-            
-            # Calculate basic metrics
-            total_records = len(orders_df)
-            total_columns = len(orders_df.columns)
-            duplicate_records = int(orders_df.duplicated().sum())
-            
-            # Calculate null values for each column
-            null_values = {}
-            for column in orders_df.columns:
-                null_count = int(orders_df[column].isnull().sum())
-                null_values[column] = null_count
+            version, _ = get_version_store().get('orders')
+            engine = statistics_store.load(version)
+            if engine is None:
+                if frame is not None:
+                    engine = StatisticsEngine()
+                    engine.consume(frame[STATS_COLUMNS])
+                elif batches is not None:
+                    engine = StatisticsEngine()
+                    for batch in batches:
+                        engine.consume(batch[STATS_COLUMNS])
+                else:
+                    engine = compute_statistics(self.db, self.rule_executor, self._count_orders())
+                statistics_store.save(engine, version)
+            else:
+                logger.info(f"Reusing column statistics for data version {version}")
+            return engine.summary()
+        except Exception as e:
+            logger.error(f"Failed to compute column statistics: {e}")
+            raise
+    
+    def get_data_quality_report(self, approximate: bool = False, backend: Optional[str] = None) -> Dict[str, Any]:
+        """Generate a comprehensive data quality report.
+        
+        With ``approximate`` the report is estimated from a table sample (see
+        ``src.services.quality_report``); small tables still get the exact one.
+        The exact report runs on ``backend`` (``ANALYTICS_BACKEND`` by default):
+        pandas over the fetched table, or DuckDB over the orders snapshot.
+        """
+        try:
+            backend = self.analytics_backend(backend)
+            if approximate:
+                from src.services.quality_report import approximate_quality_report
+                report = approximate_quality_report(self.db)
+                if report is not None:
+                    return report
+                logger.info("Table too small to sample, generating the exact quality report")
+            
+            if backend == 'duckdb':
+                from src.services.statistics_engine import STATS_COLUMNS
+                
+                counts = self.embedded_analytics.quality_counts()
+                total_records = counts['total_records']
+                total_columns = len(counts['null_values'])
+                null_values = counts['null_values']
+                duplicate_records = counts['duplicate_records']
+                distributions = counts['value_distributions']
+                # Batches are only read if the stored statistics are stale
+                basic_stats = self.get_basic_statistics(
+                    batches=self.embedded_analytics.column_batches(STATS_COLUMNS)
+                )
+            else:
+                orders_df = self.get_orders_dataframe()
+                
+                # Calculate basic metrics
+                total_records = len(orders_df)
+                total_columns = len(orders_df.columns)
+                duplicate_records = int(orders_df.duplicated().sum())
+                
+                # Calculate null values for each column
+                null_values = {}
+                for column in orders_df.columns:
+                    null_count = int(orders_df[column].isnull().sum())
+                    null_values[column] = null_count
+                
+                # Calculate value distributions for key fields (simplified)
+                distributions = {}
+                if 'status' in orders_df.columns:
+                    status_counts = orders_df['status'].value_counts()
+                    distributions['status'] = {str(k): int(v) for k, v in status_counts.items()}
+                
+                if 'category' in orders_df.columns:
+                    category_counts = orders_df['category'].value_counts().head(10)
+                    distributions['category'] = {str(k): int(v) for k, v in category_counts.items()}
+                
+                # Column statistics from the streaming engine (the frame is already loaded)
+                basic_stats = self.get_basic_statistics(orders_df)
             
             # Calculate data completeness percentage
             completeness = {}
-            for column in orders_df.columns:
-                non_null_count = orders_df[column].notna().sum()
-                completeness[column] = round((non_null_count / total_records) * 100, 2)
-            
-            # Calculate value distributions for key fields (simplified)
-            distributions = {}
-            if 'status' in orders_df.columns:
-                status_counts = orders_df['status'].value_counts()
-                distributions['status'] = {str(k): int(v) for k, v in status_counts.items()}
-            
-            if 'category' in orders_df.columns:
-                category_counts = orders_df['category'].value_counts().head(10)
-                distributions['category'] = {str(k): int(v) for k, v in category_counts.items()}
-            
-            # Basic statistics (simplified)
-            basic_stats = {}
-            numeric_columns = orders_df.select_dtypes(include=['number']).columns
-            if len(numeric_columns) > 0:
-                for col in numeric_columns:
-                    basic_stats[col] = {
-                        'count': int(orders_df[col].count()),
-                        'mean': float(orders_df[col].mean()) if not orders_df[col].isna().all() else 0.0,
-                        'min': float(orders_df[col].min()) if not orders_df[col].isna().all() else 0.0,
-                        'max': float(orders_df[col].max()) if not orders_df[col].isna().all() else 0.0
-                    }
+            for column, null_count in null_values.items():
+                non_null_count = total_records - null_count
+                completeness[column] = round(non_null_count / total_records * 100, 2) if total_records else 0.0
             
             report = {
+                "approximate": False,
                 "total_records": total_records,
                 "total_columns": total_columns,
                 "null_values": null_values,
@@ -339,29 +408,120 @@ class OrderService:
                 "basic_statistics": basic_stats
             }
             
-            logger.info("Data quality report generated successfully")
+            logger.info(f"Data quality report generated successfully ({backend})")
             return report
             
         except Exception as e:
             logger.error(f"Failed to generate data quality report: {e}")
             raise
     
+    def get_dashboard_rollups(self, backend: Optional[str] = None) -> Tuple[int, List[Dict[str, Any]], List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Total orders and the status, category and year rollups of the dashboard.
+        
+        With the ``pandas`` backend they come from PostgreSQL (prepared
+        statements); with ``duckdb`` from the orders snapshot.
+        """
+        try:
+            if self.analytics_backend(backend) == 'duckdb':
+                return self.embedded_analytics.dashboard_rollups()
+            total_orders = self._count_orders()
+            status_stats = self.db.execute_prepared('status_counts')
+            category_stats = self.db.execute_prepared('category_stats')
+            year_stats = self.db.execute_prepared('year_stats')
+            return total_orders, status_stats, category_stats, year_stats
+        except Exception as e:
+            logger.error(f"Failed to compute dashboard rollups: {e}")
+            raise
+    
+    def insert_orders(self, orders: List[OrderCreate]) -> List[int]:
+        """Insert validated orders in one transaction and return their new IDs.
+        
+        IDs continue from the current maximum. Inserters serialize on an
+        advisory lock (``ORDER_INSERT_LOCK_SQL``) so concurrent inserts never
+        pick the same IDs, without blocking updates or deletes of orders.
+        """
+        if not orders:
+            return []
+        try:
+            with self.db.get_connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(ORDER_INSERT_LOCK_SQL)
+                    cursor.execute("SELECT COALESCE(MAX(order_id), 0) AS max_id FROM orders")
+                    next_id = cursor.fetchone()['max_id'] + 1
+                    order_ids = list(range(next_id, next_id + len(orders)))
+                    rows = [
+                        (order_id, *(getattr(order, field) for field in ORDER_WRITE_FIELDS))
+                        for order_id, order in zip(order_ids, orders)
+                    ]
+                    execute_values(
+                        cursor, f"INSERT INTO orders ({', '.join(ORDER_FIELDS)}) VALUES %s", rows, page_size=1000
+                    )
+                conn.commit()
+            bump_data_version("orders")
+            logger.info(f"Inserted {len(order_ids)} orders")
+            return order_ids
+        except Exception as e:
+            logger.error(f"Failed to insert orders: {e}")
+            raise
+    
+    def create_order(self, order_data: Dict[str, Any]) -> int:
+        """Validate and insert one order, returning its ID.
+        
+        Raises:
+            OrderValidationError: If the order does not satisfy the schema.
+        """
+        valid, errors = validate_orders([order_data])
+        if errors:
+            raise OrderValidationError(errors)
+        return self.insert_orders([valid[0][1]])[0]
+    
+    def create_orders(self, rows: List[Dict[str, Any]], row_offset: int = 0) -> Dict[str, Any]:
+        """Validate a batch of raw orders and insert the valid ones.
+        
+        Invalid rows are reported, not raised: ``errors`` lists them by
+        position (plus ``row_offset``) with their field errors.
+        """
+        valid, errors = validate_orders(rows)
+        order_ids = self.insert_orders([order for _, order in valid])
+        for error in errors:
+            error['row'] += row_offset
+        if errors:
+            logger.warning(f"Rejected {len(errors)} of {len(rows)} orders in batch")
+        return {
+            'received': len(rows),
+            'inserted': len(order_ids),
+            'order_ids': order_ids,
+            'errors': errors
+        }
+    
+    def import_orders_stream(self, stream: BinaryIO, import_id: Optional[str] = None,
+                             source: Optional[str] = None, dedupe: bool = True,
+                             progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """Import a CSV (optionally gzip) binary stream of any size.
+        
+        Chunks are validated, staged with ``COPY`` and merged set-wise, skipping
+        orders that already exist; a known ``import_id`` resumes after its last
+        committed chunk. See ``src.services.order_import``.
+        """
+        from src.services.order_import import OrderImport, open_csv_stream
+        
+        importer = OrderImport(self.db, import_id=import_id, source=source, dedupe=dedupe)
+        return importer.run(open_csv_stream(stream), progress)
+    
     def update_order(self, order_id: int, update_data: Dict[str, Any]) -> bool:
-        """Update a specific order."""
+        """Update a specific order.
+        
+        Raises:
+            OrderValidationError: If a field is unknown or a value is invalid.
+        """
+        values = validate_order_update(update_data)
         try:
-            # Build dynamic update query
-            set_clauses = []
-            params = {"order_id": order_id}
-            
-            for key, value in update_data.items():
-                set_clauses.append(f"{key} = %({key})s")
-                params[key] = value
-            
-            query = f"UPDATE orders SET {', '.join(set_clauses)} WHERE order_id = %(order_id)s"
-            
-            affected_rows = self.db.execute_update(query, params)
+            # Prepared UPDATE for this (whitelisted) column set
+            statement = update_order_statement(list(values))
+            affected_rows = self.db.execute_prepared_update(statement, {**values, "order_id": order_id})
             
             if affected_rows > 0:
+                bump_data_version("orders")
                 logger.info(f"Successfully updated order {order_id}")
                 return True
             else:
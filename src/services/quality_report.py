@@ -0,0 +1,340 @@
+"""
+Approximate data quality report for large tables.
+
+Rows come from ``TABLESAMPLE`` and are consumed batch by batch from a
+server-side cursor, so memory stays bounded whatever the table size. Counts
+and proportions are scaled by the sampling fraction and reported with
+confidence intervals; money columns get KLL quantile sketches and the
+distinct count of ``customer_name`` comes from the last full-table
+HyperLogLog sketch, rebuilt in the background after data changes (see
+``distinct_customers``), or from the sample until a first sketch exists.
+"""
+import math
+import os
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from statistics import NormalDist
+from typing import Any, Dict, Iterator, Optional, Tuple
+import pandas as pd
+from loguru import logger
+
+from src.config.settings import quality_settings
+from src.models.order import ORDER_FIELDS
+from src.services.data_version import get_version_store
+from src.services.statistics_engine import StatisticsStore, statistics_store
+from src.utils.sketches import HyperLogLog, KLLSketch, RunningMoments
+
+try:
+    import fcntl
+except ImportError:  # Windows: refreshes are only serialized within the process
+    fcntl = None
+
+
+SAMPLING_METHODS = ('SYSTEM', 'BERNOULLI')
+NUMERIC_COLUMNS = ['quantity', 'subtotal_amount', 'tax_rate', 'shipping_cost']
+MONEY_COLUMNS = ['subtotal_amount', 'shipping_cost']
+QUANTILES = {'p50': 0.5, 'p95': 0.95, 'p99': 0.99}
+DISTRIBUTION_COLUMNS = {'status': None, 'category': 10}  # column -> top N (None = all)
+BATCH_SIZE = 10000
+
+# HyperLogLog registers from PostgreSQL's 32-bit hashtext(): register index
+# from the low bits, rank = position of the first 1 bit in the remaining ones
+HLL_REGISTERS_SQL = """
+    SELECT h & %(mask)s AS register,
+           max(%(width)s - length(ltrim((h >> %(precision)s)::bit(32)::text, '0')) + 1) AS rank
+    FROM (
+        SELECT hashtext(customer_name)::bigint & 4294967295 AS h
+        FROM orders WHERE customer_name IS NOT NULL
+    ) hashed
+    GROUP BY 1
+"""
+
+
+def _wilson_interval(successes: int, n: int, z: float) -> Tuple[float, float]:
+    """Wilson score interval of a proportion."""
+    if n == 0:
+        return 0.0, 1.0
+    p = successes / n
+    denominator = 1 + z * z / n
+    center = (p + z * z / (2 * n)) / denominator
+    margin = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denominator
+    return max(0.0, center - margin), min(1.0, center + margin)
+
+
+def estimate_table_rows(db) -> int:
+    """Planner estimate of the number of rows in ``orders`` (no table scan)."""
+    rows = db.execute_query("SELECT reltuples::bigint AS estimate FROM pg_class WHERE oid = 'orders'::regclass")
+    return max(int(rows[0]['estimate']), 0) if rows else 0
+
+
+def distinct_customers_sketch(db, precision: int) -> HyperLogLog:
+    """HyperLogLog of ``customer_name`` over the whole table.
+
+    Hashing and register aggregation run in PostgreSQL; only ``2 ** precision``
+    small rows are transferred.
+    """
+    sketch = HyperLogLog(precision, hash_bits=32)
+    rows = db.execute_query(HLL_REGISTERS_SQL, {
+        'mask': (1 << precision) - 1,
+        'width': 32 - precision,
+        'precision': precision,
+    })
+    sketch.update_registers((int(row['register']), int(row['rank'])) for row in rows)
+    return sketch
+
+
+# Last full-table sketch built by distinct_customers_sketch, with its data version
+distinct_store = StatisticsStore(quality_settings.distinct_store_path, HyperLogLog.from_dict)
+_refreshing = threading.Lock()
+
+
+@contextmanager
+def _refresh_claim() -> Iterator[bool]:
+    """Whether this process may rebuild the stored sketch (no other one is doing it)."""
+    if not _refreshing.acquire(blocking=False):
+        yield False
+        return
+    try:
+        if fcntl is None:
+            yield True
+            return
+        store_dir = os.path.dirname(distinct_store.path)
+        if store_dir:
+            os.makedirs(store_dir, exist_ok=True)
+        with open(f"{distinct_store.path}.lock", 'a') as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                # Another worker is rebuilding it
+                locked = False
+            else:
+                locked = True
+            try:
+                yield locked
+            finally:
+                if locked:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+    finally:
+        _refreshing.release()
+
+
+def _refresh_distinct_customers(db, precision: int):
+    """Scan the table into ``distinct_store`` in a background thread, once per host at a time."""
+    def refresh():
+        started = time.perf_counter()
+        with _refresh_claim() as claimed:
+            if not claimed:
+                return
+            try:
+                version, _ = get_version_store().get('orders')
+                stored = distinct_store.latest()
+                if stored is not None and stored[1] == version and stored[0].precision == precision:
+                    return
+                with db.prefer_replica():
+                    sketch = distinct_customers_sketch(db, precision)
+                distinct_store.save(sketch, version)
+                logger.info(f"Customer distinct sketch rebuilt for orders v{version} "
+                            f"in {time.perf_counter() - started:.1f} s")
+            except Exception as e:
+                logger.error(f"Failed to rebuild the customer distinct sketch: {e}")
+
+    threading.Thread(target=refresh, name="distinct-customers", daemon=True).start()
+
+
+def distinct_customers(db, precision: int) -> Tuple[Optional[HyperLogLog], bool]:
+    """Last full-table HyperLogLog of ``customer_name`` and whether it describes the current data.
+
+    Taken from the stored column statistics when they describe the current
+    version, else from ``distinct_store`` whatever its version. The table is
+    never scanned on the caller's thread: when the stored sketch is missing,
+    or older than the data and stored more than ``QUALITY_DISTINCT_REFRESH``
+    seconds ago, it is rebuilt in the background and the caller gets the
+    previous one (None if there is none yet).
+    """
+    version, _ = get_version_store().get('orders')
+    engine = statistics_store.load(version)
+    if engine is not None and engine.distinct['customer_name'].precision == precision:
+        return engine.distinct['customer_name'], True
+    stored = distinct_store.latest()
+    if stored is None or stored[0].precision != precision:
+        _refresh_distinct_customers(db, precision)
+        return None, False
+    sketch, sketch_version, computed_at = stored
+    current = sketch_version == version
+    age = (datetime.now(timezone.utc) - computed_at).total_seconds()
+    if not current and age >= quality_settings.distinct_refresh:
+        _refresh_distinct_customers(db, precision)
+    return sketch, current
+
+
+def sample_distinct_estimate(counts: Counter, total_rows: float) -> Dict[str, Any]:
+    """Distinct values of the table estimated from the value counts of a uniform sample.
+
+    Guaranteed-error estimator (GEE, Charikar et al.): values seen once in
+    the sample stand for ``sqrt(N/n)`` table values each, the others for
+    one. The bounds are the values seen in the sample and the estimate with
+    each singleton standing for ``N/n`` values.
+    """
+    n = sum(counts.values())
+    singletons = sum(1 for count in counts.values() if count == 1)
+    repeated = len(counts) - singletons
+    scale = total_rows / n if n else 1.0
+    estimate = math.sqrt(scale) * singletons + repeated
+    return {
+        "estimate": int(round(estimate)),
+        "low": len(counts),
+        "high": int(round(min(scale * singletons + repeated, total_rows))),
+        "method": "gee (sample)",
+    }
+
+
+class _SampleAccumulator:
+    """Running totals over sampled batches."""
+
+    def __init__(self, kll_k: int):
+        self.rows = 0
+        self.nulls = Counter()
+        self.values = {column: Counter() for column in DISTRIBUTION_COLUMNS}
+        self.customers = Counter()
+        self.moments = {column: RunningMoments() for column in NUMERIC_COLUMNS}
+        self.sketches = {column: KLLSketch(kll_k) for column in MONEY_COLUMNS}
+
+    def add(self, df: pd.DataFrame):
+        self.rows += len(df)
+        self.nulls.update({column: int(count) for column, count in df.isnull().sum().items()})
+        for column in DISTRIBUTION_COLUMNS:
+            self.values[column].update(df[column].dropna().astype(str).value_counts().to_dict())
+        self.customers.update(df['customer_name'].dropna().value_counts().to_dict())
+        for column in NUMERIC_COLUMNS:
+            self.moments[column].update(df[column])
+            if column in self.sketches:
+                self.sketches[column].update(df[column])
+
+
+def approximate_quality_report(db, sample_rows: Optional[int] = None,
+                               method: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """Quality report estimated from a table sample.
+
+    Returns None when the table is small enough (or not yet analyzed) that a
+    sample would not be cheaper than the exact report.
+
+    ``SYSTEM`` sampling reads whole pages and is the fastest; the intervals
+    assume independent rows, which ``BERNOULLI`` (row-level, but visiting
+    every page) satisfies exactly. With ``SYSTEM`` they are a lower bound on
+    the uncertainty when similar rows are stored together.
+    """
+    sample_rows = sample_rows or quality_settings.approx_sample_rows
+    method = (method or quality_settings.approx_sampling).upper()
+    if method not in SAMPLING_METHODS:
+        raise ValueError(f"Unknown sampling method '{method}'. Allowed: {', '.join(SAMPLING_METHODS)}")
+
+    estimated_rows = estimate_table_rows(db)
+    if estimated_rows <= sample_rows:
+        return None
+    percent = 100.0 * sample_rows / estimated_rows
+    fraction = percent / 100.0
+    z = NormalDist().inv_cdf((1 + quality_settings.approx_confidence) / 2)
+
+    accumulator = _SampleAccumulator(quality_settings.kll_k)
+    query = f"SELECT {', '.join(ORDER_FIELDS)} FROM orders TABLESAMPLE {method} (%(percent)s)"
+    for batch in db.stream_query(query, {'percent': percent}, batch_size=BATCH_SIZE):
+        accumulator.add(pd.DataFrame(batch, columns=ORDER_FIELDS))
+    n = accumulator.rows
+    if n == 0:
+        return None
+
+    # n ~ Binomial(N, fraction)
+    total_records = n / fraction
+    total_margin = z * math.sqrt(total_records * (1 - fraction) / fraction)
+
+    def scaled(successes: int) -> Dict[str, Any]:
+        low, high = _wilson_interval(successes, n, z)
+        return {'estimate': int(round(successes / n * total_records)),
+                'low': int(round(low * total_records)), 'high': int(round(high * total_records))}
+
+    null_values, completeness, completeness_ci = {}, {}, {}
+    for column in ORDER_FIELDS:
+        nulls = accumulator.nulls[column]
+        null_values[column] = scaled(nulls)['estimate']
+        completeness[column] = round((n - nulls) / n * 100, 2)
+        low, high = _wilson_interval(n - nulls, n, z)
+        completeness_ci[column] = [round(low * 100, 2), round(high * 100, 2)]
+
+    distributions, distributions_ci = {}, {}
+    for column, top in DISTRIBUTION_COLUMNS.items():
+        counts = accumulator.values[column].most_common(top)
+        distributions[column] = {value: scaled(count)['estimate'] for value, count in counts}
+        distributions_ci[column] = {value: [scaled(count)['low'], scaled(count)['high']] for value, count in counts}
+
+    basic_stats = {}
+    for column in NUMERIC_COLUMNS:
+        moments = accumulator.moments[column]
+        if moments.count == 0:
+            continue
+        margin = z * math.sqrt(moments.variance / moments.count) if moments.count > 1 else 0.0
+        basic_stats[column] = {
+            'count': int(round(moments.count / fraction)),
+            'mean': moments.mean,
+            'mean_ci': [moments.mean - margin, moments.mean + margin],
+            # Extremes of the sample: the table may contain more extreme values
+            'min': moments.min,
+            'max': moments.max,
+        }
+
+    quantiles = {}
+    for column, sketch in accumulator.sketches.items():
+        if sketch.count == 0:
+            continue
+        quantiles[column] = {}
+        for name, q in QUANTILES.items():
+            # Sampling rank uncertainty plus the sketch's own rank error
+            spread = z * math.sqrt(q * (1 - q) / sketch.count) + sketch.rank_error
+            quantiles[column][name] = {
+                'value': sketch.quantile(q),
+                'low': sketch.quantile(max(0.0, q - spread)),
+                'high': sketch.quantile(min(1.0, q + spread)),
+            }
+
+    hll, current = distinct_customers(db, quality_settings.hll_precision)
+    if hll is None:
+        customers = sample_distinct_estimate(accumulator.customers, total_records)
+    else:
+        distinct = hll.estimate()
+        distinct_margin = z * hll.relative_error * distinct
+        customers = {
+            "estimate": int(round(distinct)),
+            "low": int(round(max(distinct - distinct_margin, 0))),
+            "high": int(round(distinct + distinct_margin)),
+            "method": f"hyperloglog (p={hll.precision})",
+            # False: sketch of an earlier data version, being rebuilt in the background
+            "current": current,
+        }
+
+    logger.info(f"Approximate quality report from {n} sampled rows ({method} {percent:.4f}%)")
+    return {
+        "approximate": True,
+        "sample": {
+            "method": method,
+            "percent": percent,
+            "rows": n,
+            "confidence": quality_settings.approx_confidence,
+        },
+        "total_records": int(round(total_records)),
+        "total_columns": len(ORDER_FIELDS),
+        "null_values": null_values,
+        # Duplicates cannot be estimated reliably from a sample
+        "duplicate_records": None,
+        "data_completeness": completeness,
+        "value_distributions": distributions,
+        "basic_statistics": basic_stats,
+        "quantiles": quantiles,
+        "distinct_counts": {"customer_name": customers},
+        "confidence_intervals": {
+            "total_records": [int(round(total_records - total_margin)), int(round(total_records + total_margin))],
+            "data_completeness": completeness_ci,
+            "value_distributions": distributions_ci,
+        },
+    }
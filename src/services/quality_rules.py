@@ -0,0 +1,337 @@
+"""
+Data quality rules evaluated over partitions of the orders table.
+
+Each rule maps a DataFrame partition to a partial result made only of counts
+and sorted sample order IDs, so partials computed in any order (or in other
+processes) merge into the same final result.
+"""
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import pandas as pd
+from loguru import logger
+
+from src.config.settings import quality_settings
+
+
+SAMPLE_SIZE = 20
+
+REQUIRED_FIELDS = ['status', 'customer_name', 'order_date', 'quantity',
+                   'subtotal_amount', 'tax_rate', 'shipping_cost', 'category', 'subcategory']
+TEXT_FIELDS = ['status', 'customer_name', 'category', 'subcategory']
+NUMERIC_FIELDS = ['quantity', 'subtotal_amount', 'tax_rate', 'shipping_cost']
+VALID_STATUSES = ['pending', 'processing', 'shipped', 'delivered', 'cancelled', 'returned']
+
+
+def _sample_ids(df: pd.DataFrame, mask: pd.Series) -> List[int]:
+    """Smallest ``SAMPLE_SIZE`` order IDs matching ``mask``."""
+    return sorted(int(order_id) for order_id in df.loc[mask, 'order_id'].nsmallest(SAMPLE_SIZE))
+
+
+def incomplete_rule(df: pd.DataFrame) -> Dict[str, Any]:
+    """Nulls, empty strings, negative amounts and invalid tax rates."""
+    problematic = pd.Series(False, index=df.index)
+
+    null_mask = df[REQUIRED_FIELDS].isnull()
+    null_counts = {field: int(count) for field, count in null_mask.sum().items()}
+    problematic |= null_mask.any(axis=1)
+
+    empty_strings = {}
+    for field in TEXT_FIELDS:
+        mask = df[field] == ''
+        empty_strings[field] = int(mask.sum())
+        problematic |= mask
+
+    negative_values = {}
+    for field in NUMERIC_FIELDS:
+        mask = df[field] < 0
+        negative_values[field] = int(mask.sum())
+        problematic |= mask
+
+    invalid_tax = df['tax_rate'] > 1.0
+    problematic |= invalid_tax
+
+    return {
+        'total_records': len(df),
+        'null_counts': null_counts,
+        'empty_strings': empty_strings,
+        'negative_values': negative_values,
+        'invalid_tax_rates': int(invalid_tax.sum()),
+        # order_id is unique, so per-partition counts add up exactly
+        'problematic_records': int(problematic.sum()),
+        'problematic_order_ids': _sample_ids(df, problematic)
+    }
+
+
+# Tukey fence multiplier ("far out" values) and robust z-score limit (Iglewicz-Hoaglin)
+ANOMALY_IQR_K = 3.0
+ANOMALY_Z_LIMIT = 3.5
+
+# (check, metric, group column, method): "iqr" flags values outside the group's
+# Tukey fences; "mad" flags |robust z| above the limit, using median and MAD
+ANOMALY_CHECKS = [
+    ('subtotal_amount_outlier', 'subtotal_amount', 'category', 'iqr'),
+    ('shipping_cost_outlier', 'shipping_cost', 'category', 'iqr'),
+    ('unit_price_outlier', 'unit_price', 'subcategory', 'mad'),
+    ('shipping_ratio_anomaly', 'shipping_ratio', 'category', 'mad'),
+]
+
+
+def _anomaly_metrics(df: pd.DataFrame) -> Dict[str, pd.Series]:
+    """Float columns the anomaly checks look at, including derived ratios."""
+    subtotal = pd.to_numeric(df['subtotal_amount'], errors='coerce').astype('float64')
+    shipping = pd.to_numeric(df['shipping_cost'], errors='coerce').astype('float64')
+    quantity = pd.to_numeric(df['quantity'], errors='coerce').astype('float64')
+    return {
+        'subtotal_amount': subtotal,
+        'shipping_cost': shipping,
+        'unit_price': subtotal / quantity.where(quantity > 0),
+        'shipping_ratio': shipping / subtotal.where(subtotal > 0),
+    }
+
+
+def anomaly_thresholds(df: pd.DataFrame) -> Dict[str, Dict[str, List[float]]]:
+    """Per-group statistics of every anomaly check, computed from ``df``.
+
+    Returns ``{check: {group: [q1, q3]}}`` for IQR checks and
+    ``{check: {group: [median, mad]}}`` for robust z-score checks; each is a
+    single vectorized groupby over the frame.
+    """
+    metrics = _anomaly_metrics(df)
+    thresholds = {}
+    for check, metric, group, method in ANOMALY_CHECKS:
+        values = metrics[metric]
+        grouped = values.groupby(df[group])
+        if method == 'iqr':
+            stats = pd.DataFrame({'a': grouped.quantile(0.25), 'b': grouped.quantile(0.75)})
+        else:
+            median = grouped.median()
+            deviation = (values - df[group].map(median)).abs()
+            stats = pd.DataFrame({'a': median, 'b': deviation.groupby(df[group]).median()})
+        thresholds[check] = {str(key): [float(a), float(b)] for key, (a, b) in stats.dropna().iterrows()}
+    return thresholds
+
+
+def anomaly_thresholds_sql(db) -> Dict[str, Dict[str, List[float]]]:
+    """Same statistics as ``anomaly_thresholds`` over the whole table, in SQL.
+
+    Used by the parallel executor so every partition is judged against
+    table-wide group statistics instead of its own.
+    """
+    base = """
+        SELECT category, subcategory,
+               subtotal_amount::float8 AS subtotal_amount,
+               shipping_cost::float8 AS shipping_cost,
+               CASE WHEN quantity > 0 THEN subtotal_amount::float8 / quantity END AS unit_price,
+               CASE WHEN subtotal_amount > 0 THEN shipping_cost::float8 / subtotal_amount::float8 END AS shipping_ratio
+        FROM orders
+    """
+    thresholds = {}
+    for check, metric, group, method in ANOMALY_CHECKS:
+        if method == 'iqr':
+            query = f"""
+                WITH base AS ({base})
+                SELECT {group} AS grp,
+                       percentile_cont(0.25) WITHIN GROUP (ORDER BY {metric}) AS a,
+                       percentile_cont(0.75) WITHIN GROUP (ORDER BY {metric}) AS b
+                FROM base WHERE {group} IS NOT NULL GROUP BY {group}
+            """
+        else:
+            query = f"""
+                WITH base AS ({base}),
+                medians AS (
+                    SELECT {group} AS grp, percentile_cont(0.5) WITHIN GROUP (ORDER BY {metric}) AS a
+                    FROM base WHERE {group} IS NOT NULL GROUP BY {group}
+                )
+                SELECT m.grp, m.a,
+                       percentile_cont(0.5) WITHIN GROUP (ORDER BY abs(base.{metric} - m.a)) AS b
+                FROM base JOIN medians m ON base.{group} = m.grp
+                GROUP BY m.grp, m.a
+            """
+        thresholds[check] = {
+            str(row['grp']): [float(row['a']), float(row['b'])]
+            for row in db.execute_query(query)
+            if row['a'] is not None and row['b'] is not None
+        }
+    return thresholds
+
+
+def anomaly_masks(df: pd.DataFrame, thresholds: Dict[str, Dict[str, List[float]]]) -> Dict[str, pd.Series]:
+    """Boolean mask per anomaly check, judging each row against its group."""
+    metrics = _anomaly_metrics(df)
+    masks = {}
+    for check, metric, group, method in ANOMALY_CHECKS:
+        stats = thresholds.get(check, {})
+        keys = df[group].astype(str)
+        a = keys.map({key: values[0] for key, values in stats.items()})
+        b = keys.map({key: values[1] for key, values in stats.items()})
+        values = metrics[metric]
+        if method == 'iqr':
+            spread = b - a
+            masks[check] = (values < a - ANOMALY_IQR_K * spread) | (values > b + ANOMALY_IQR_K * spread)
+        else:
+            # MAD = 0 (mostly identical values) gives no robust scale: nothing is flagged
+            robust_z = 0.6745 * (values - a) / b.where(b > 0)
+            masks[check] = robust_z.abs() > ANOMALY_Z_LIMIT
+    return masks
+
+
+def validation_rule(df: pd.DataFrame, thresholds: Optional[Dict[str, Dict[str, List[float]]]] = None) -> Dict[str, Any]:
+    """Type coercion checks, fixed business thresholds and per-group anomalies.
+
+    ``thresholds`` are the group statistics for the anomaly checks; when
+    omitted they are computed from ``df`` itself.
+    """
+    masks = {}
+    for field in NUMERIC_FIELDS:
+        masks[f'{field}_non_numeric'] = pd.to_numeric(df[field], errors='coerce').isnull()
+    masks['order_date_invalid'] = pd.to_datetime(df['order_date'], errors='coerce').isnull()
+    masks['quantity_extreme'] = (df['quantity'] > 1000) | (df['quantity'] == 0)
+    masks['subtotal_amount_extreme'] = df['subtotal_amount'] > 100000
+    masks['shipping_cost_extreme'] = df['shipping_cost'] > 1000
+    masks['status_invalid'] = ~df['status'].str.lower().isin(VALID_STATUSES)
+    masks.update(anomaly_masks(df, anomaly_thresholds(df) if thresholds is None else thresholds))
+
+    return {
+        'total_records': len(df),
+        'counts': {name: int(mask.sum()) for name, mask in masks.items()},
+        'sample_order_ids': {name: _sample_ids(df, mask) for name, mask in masks.items()}
+    }
+
+
+RULE_COLUMNS = {
+    'incomplete': ['order_id'] + REQUIRED_FIELDS,
+    'validation': ['order_id'] + NUMERIC_FIELDS + ['order_date', 'status', 'category', 'subcategory'],
+}
+
+# Table-wide context some rules need in parallel mode, computed once in SQL
+RULE_CONTEXT: Dict[str, Callable[[Any], Any]] = {
+    'validation': anomaly_thresholds_sql,
+}
+
+RULES: Dict[str, Callable[..., Dict[str, Any]]] = {
+    'incomplete': incomplete_rule,
+    'validation': validation_rule,
+}
+
+
+def merge_partials(partials: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Merge partial results: sum counts and keep the smallest sample IDs."""
+    merged: Dict[str, Any] = {}
+    for partial in partials:
+        for key, value in partial.items():
+            merged[key] = _merge_value(merged[key], value) if key in merged else value
+    return merged
+
+
+def _merge_value(current, value):
+    """Combine two partial values of the same shape."""
+    if isinstance(value, dict):
+        return {
+            k: _merge_value(current[k], value[k]) if k in current and k in value else current.get(k, value.get(k))
+            for k in {**current, **value}
+        }
+    if isinstance(value, list):
+        return sorted(set(current) | set(value))[:SAMPLE_SIZE]
+    return current + value
+
+
+def _evaluate_range(rule_name: str, lower: int, upper: Optional[int], context: Any = None) -> Dict[str, Any]:
+    """Load one order_id range in a worker process and evaluate a rule on it."""
+    from src.database.connection import db_connection
+
+    columns = ', '.join(RULE_COLUMNS[rule_name])
+    query = f"SELECT {columns} FROM orders WHERE order_id >= %(lower)s"
+    params = {'lower': lower}
+    if upper is not None:
+        query += " AND order_id < %(upper)s"
+        params['upper'] = upper
+    with db_connection.prefer_replica():
+        rows = db_connection.execute_query(query, params)
+    df = pd.DataFrame(rows, columns=RULE_COLUMNS[rule_name])
+    if rule_name in RULE_CONTEXT:
+        return RULES[rule_name](df, context)
+    return RULES[rule_name](df)
+
+
+def _with_statement_timeout(timeout_ms: Optional[int], func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Run ``func`` in a worker process under the caller's statement timeout."""
+    from src.database.connection import db_connection
+
+    with db_connection.statement_timeout(timeout_ms):
+        return func(*args, **kwargs)
+
+
+class ParallelRuleExecutor:
+    """Evaluate quality rules over order_id ranges in a process pool.
+
+    Small tables are evaluated in-process on a single frame; above
+    ``min_rows`` each worker process loads and checks its own range, so the
+    full table is never materialized or pickled in the web process.
+    """
+
+    def __init__(self, db, max_workers: Optional[int] = None, min_rows: Optional[int] = None):
+        self.db = db
+        self.max_workers = max_workers or quality_settings.workers or os.cpu_count() or 1
+        self.min_rows = quality_settings.parallel_min_rows if min_rows is None else min_rows
+        self._executor = None
+        self._executor_pid = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Return a process pool owned by this process, creating it on first use."""
+        with self._lock:
+            if self._executor is None or self._executor_pid != os.getpid():
+                # spawn: forking a multi-threaded web worker can copy held locks
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+                self._executor_pid = os.getpid()
+            return self._executor
+
+    def _partition_bounds(self, partitions: int) -> List[Tuple[int, Optional[int]]]:
+        """Split order_id into ranges holding roughly the same number of rows."""
+        fractions = [i / partitions for i in range(1, partitions)]
+        row = self.db.execute_query(
+            "SELECT MIN(order_id) AS min_id, "
+            "percentile_disc(%(fractions)s::float8[]) WITHIN GROUP (ORDER BY order_id) AS cuts "
+            "FROM orders",
+            {'fractions': fractions}
+        )[0]
+        cuts = sorted(set(row['cuts'] or []))
+        lowers = [row['min_id']] + cuts
+        uppers = cuts + [None]
+        return list(zip(lowers, uppers))
+
+    def run(self, rule_name: str, total_rows: int,
+            load_frame: Callable[[List[str]], pd.DataFrame]) -> Dict[str, Any]:
+        """Evaluate ``rule_name`` over the orders table and merge the partials."""
+        if self.max_workers <= 1 or total_rows < self.min_rows:
+            return RULES[rule_name](load_frame(RULE_COLUMNS[rule_name]))
+
+        logger.info(f"Evaluating '{rule_name}' with {self.max_workers} processes")
+        context = RULE_CONTEXT[rule_name](self.db) if rule_name in RULE_CONTEXT else None
+        return merge_partials(self.map_ranges(_evaluate_range, rule_name, context=context))
+
+    def map_ranges(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> List[Any]:
+        """Run ``func(*args, lower, upper, **kwargs)`` for every order_id range.
+
+        ``func`` must be a picklable module-level function. Results come back
+        in partition order so merging them never depends on completion order.
+        The caller's statement timeout (see ``statement_timeout``) applies to
+        the queries each worker runs.
+        """
+        partitions = self.max_workers * quality_settings.partitions_per_worker
+        bounds = self._partition_bounds(partitions)
+        logger.info(f"Processing {len(bounds)} order_id ranges with {self.max_workers} processes")
+
+        executor = self._get_executor()
+        timeout_ms = self.db.current_statement_timeout
+        futures = [
+            executor.submit(_with_statement_timeout, timeout_ms, func, *args, lower, upper, **kwargs)
+            for lower, upper in bounds
+        ]
+        return [future.result() for future in futures]
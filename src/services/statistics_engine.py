@@ -0,0 +1,199 @@
+"""
+Streaming, mergeable column statistics for the orders table.
+
+``StatisticsEngine`` consumes row batches (e.g. from a server-side cursor)
+and keeps per-column summaries in constant memory: exact moments, KLL
+quantiles and histograms for numeric columns, heavy hitters and HyperLogLog
+distinct counts for text columns. Engines built over different order_id
+ranges merge into the engine of the whole table, and the result is persisted
+per data version so unchanged data is never rescanned.
+"""
+import json
+import os
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+import pandas as pd
+from loguru import logger
+
+from src.config.settings import quality_settings
+from src.utils.sketches import FrequentItems, HyperLogLog, KLLSketch, RunningMoments
+
+
+NUMERIC_COLUMNS = ['quantity', 'subtotal_amount', 'tax_rate', 'shipping_cost']
+CATEGORICAL_COLUMNS = ['status', 'customer_name', 'category', 'subcategory']
+STATS_COLUMNS = NUMERIC_COLUMNS + CATEGORICAL_COLUMNS
+QUANTILES = {'p01': 0.01, 'p05': 0.05, 'p25': 0.25, 'p50': 0.5, 'p75': 0.75, 'p95': 0.95, 'p99': 0.99}
+
+# Heavy-hitter counters kept per reported top value, to keep the error small
+FREQUENT_ITEMS_FACTOR = 20
+
+
+class StatisticsEngine:
+    """Per-column summaries updated batch by batch."""
+
+    def __init__(self, kll_k: Optional[int] = None, hll_precision: Optional[int] = None,
+                 top_k: Optional[int] = None):
+        kll_k = kll_k or quality_settings.kll_k
+        hll_precision = hll_precision or quality_settings.hll_precision
+        top_k = top_k or quality_settings.stats_top_k
+        self.rows = 0
+        self.nulls = {column: 0 for column in STATS_COLUMNS}
+        self.moments = {column: RunningMoments() for column in NUMERIC_COLUMNS}
+        self.quantiles = {column: KLLSketch(kll_k) for column in NUMERIC_COLUMNS}
+        self.frequent = {column: FrequentItems(top_k * FREQUENT_ITEMS_FACTOR) for column in CATEGORICAL_COLUMNS}
+        self.distinct = {column: HyperLogLog(hll_precision) for column in CATEGORICAL_COLUMNS}
+
+    def consume(self, df: pd.DataFrame):
+        """Add one batch of rows holding (at least) ``STATS_COLUMNS``."""
+        self.rows += len(df)
+        for column in STATS_COLUMNS:
+            self.nulls[column] += int(df[column].isnull().sum())
+        for column in NUMERIC_COLUMNS:
+            self.moments[column].update(df[column])
+            self.quantiles[column].update(df[column])
+        for column in CATEGORICAL_COLUMNS:
+            self.frequent[column].update(df[column])
+            self.distinct[column].update(df[column])
+
+    def consume_batches(self, batches: Iterable[List[Dict[str, Any]]]) -> "StatisticsEngine":
+        """Consume row batches such as the ones yielded by ``stream_query``."""
+        for rows in batches:
+            self.consume(pd.DataFrame(rows, columns=STATS_COLUMNS))
+        return self
+
+    def merge(self, other: "StatisticsEngine") -> "StatisticsEngine":
+        self.rows += other.rows
+        for column in STATS_COLUMNS:
+            self.nulls[column] += other.nulls[column]
+        for column in NUMERIC_COLUMNS:
+            self.moments[column].merge(other.moments[column])
+            self.quantiles[column].merge(other.quantiles[column])
+        for column in CATEGORICAL_COLUMNS:
+            self.frequent[column].merge(other.frequent[column])
+            self.distinct[column].merge(other.distinct[column])
+        return self
+
+    def summary(self, bins: Optional[int] = None, top_k: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+        """Statistics per column, in the shape of ``basic_statistics``."""
+        bins = bins or quality_settings.stats_histogram_bins
+        top_k = top_k or quality_settings.stats_top_k
+        stats = {}
+        for column in NUMERIC_COLUMNS:
+            moments, sketch = self.moments[column], self.quantiles[column]
+            stats[column] = {
+                'count': moments.count,
+                'nulls': self.nulls[column],
+                'mean': moments.mean if moments.count else 0.0,
+                'std': moments.std,
+                'min': moments.min if moments.count else 0.0,
+                'max': moments.max if moments.count else 0.0,
+                'quantiles': {name: sketch.quantile(q) for name, q in QUANTILES.items()},
+                'histogram': sketch.histogram(bins),
+            }
+        for column in CATEGORICAL_COLUMNS:
+            stats[column] = {
+                'count': self.rows - self.nulls[column],
+                'nulls': self.nulls[column],
+                'distinct_estimate': int(round(self.distinct[column].estimate())),
+                'top_values': self.frequent[column].top(top_k),
+            }
+        return stats
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'rows': self.rows,
+            'nulls': self.nulls,
+            'moments': {column: summary.to_dict() for column, summary in self.moments.items()},
+            'quantiles': {column: summary.to_dict() for column, summary in self.quantiles.items()},
+            'frequent': {column: summary.to_dict() for column, summary in self.frequent.items()},
+            'distinct': {column: summary.to_dict() for column, summary in self.distinct.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "StatisticsEngine":
+        engine = cls()
+        engine.rows = data['rows']
+        engine.nulls = dict(data['nulls'])
+        engine.moments = {column: RunningMoments.from_dict(value) for column, value in data['moments'].items()}
+        engine.quantiles = {column: KLLSketch.from_dict(value) for column, value in data['quantiles'].items()}
+        engine.frequent = {column: FrequentItems.from_dict(value) for column, value in data['frequent'].items()}
+        engine.distinct = {column: HyperLogLog.from_dict(value) for column, value in data['distinct'].items()}
+        return engine
+
+
+def _statistics_range(lower: int, upper: Optional[int]) -> Dict[str, Any]:
+    """Stream one order_id range in a worker process into a serialized engine."""
+    from src.database.connection import db_connection
+
+    query = f"SELECT {', '.join(STATS_COLUMNS)} FROM orders WHERE order_id >= %(lower)s"
+    params = {'lower': lower}
+    if upper is not None:
+        query += " AND order_id < %(upper)s"
+        params['upper'] = upper
+    with db_connection.prefer_replica():
+        return StatisticsEngine().consume_batches(db_connection.stream_query(query, params)).to_dict()
+
+
+def compute_statistics(db, executor=None, total_rows: int = 0) -> StatisticsEngine:
+    """Build the engine for the whole table.
+
+    Large tables are split over the quality executor's process pool (see
+    ``ParallelRuleExecutor.map_ranges``) and the partial engines merged;
+    otherwise rows are streamed through a single server-side cursor.
+    """
+    engine = StatisticsEngine()
+    if executor is not None and executor.max_workers > 1 and total_rows >= executor.min_rows:
+        for partial in executor.map_ranges(_statistics_range):
+            engine.merge(StatisticsEngine.from_dict(partial))
+    else:
+        engine.consume_batches(db.stream_query(f"SELECT {', '.join(STATS_COLUMNS)} FROM orders"))
+    logger.info(f"Computed streaming statistics over {engine.rows} rows")
+    return engine
+
+
+class StatisticsStore:
+    """JSON file holding the last engine (or sketch) and the data version it describes.
+
+    ``decode`` rebuilds the stored object from its ``to_dict()`` form.
+    """
+
+    def __init__(self, path: str, decode: Optional[Callable[[Dict[str, Any]], Any]] = None):
+        self.path = path
+        self.decode = decode or StatisticsEngine.from_dict
+
+    def latest(self) -> Optional[Tuple[Any, int, datetime]]:
+        """Stored object with the data version and time it was computed at, whatever the version."""
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not read statistics store {self.path}: {e}")
+            return None
+        return self.decode(data['engine']), data.get('version'), datetime.fromisoformat(data['computed_at'])
+
+    def load(self, version: int) -> Optional[Any]:
+        """Stored object if it was computed at ``version``, else None."""
+        stored = self.latest()
+        if stored is None or stored[1] != version:
+            return None
+        return stored[0]
+
+    def save(self, engine: Any, version: int):
+        """Write atomically so concurrent readers never see a partial file."""
+        store_dir = os.path.dirname(self.path)
+        if store_dir and not os.path.exists(store_dir):
+            os.makedirs(store_dir)
+        temporary = f"{self.path}.{os.getpid()}.tmp"
+        with open(temporary, 'w') as f:
+            json.dump({
+                'version': version,
+                'computed_at': datetime.now(timezone.utc).isoformat(),
+                'engine': engine.to_dict(),
+            }, f)
+        os.replace(temporary, self.path)
+
+
+# Global store instance
+statistics_store = StatisticsStore(quality_settings.stats_store_path)
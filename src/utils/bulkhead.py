@@ -0,0 +1,142 @@
+"""
+Admission control: bound how much expensive work a process runs at once.
+"""
+import asyncio
+import threading
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Dict
+from loguru import logger
+
+
+class BulkheadFull(Exception):
+    """Raised when a bulkhead has no free slot within its waiting limits."""
+
+    def __init__(self, name: str, reason: str):
+        super().__init__(f"Bulkhead '{name}' saturated: {reason}")
+        self.name = name
+        self.reason = reason
+
+
+class Bulkhead:
+    """Limit concurrent executions of one class of work within a process.
+
+    Up to ``max_concurrent`` callers run at once and up to ``max_queue`` more
+    wait at most ``max_wait`` seconds for a slot; anything beyond that is
+    rejected immediately, so overload is shed instead of piling up threads
+    (and database connections) that cheaper requests need.
+    """
+
+    def __init__(self, name: str, max_concurrent: int, max_queue: int, max_wait: float):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self._lock = threading.Lock()
+        self.active = 0
+        self.waiting = 0
+        self.rejected = 0
+
+    def _reject(self, reason: str):
+        with self._lock:
+            self.rejected += 1
+        logger.warning(f"Bulkhead {self.name} rejected a call ({reason})")
+        raise BulkheadFull(self.name, reason)
+
+    @contextmanager
+    def acquire(self):
+        """Hold a slot for the duration of the block.
+
+        Raises:
+            BulkheadFull: If the queue is full or no slot frees up in time.
+        """
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                queue_full = self.waiting >= self.max_queue
+                if not queue_full:
+                    self.waiting += 1
+            if queue_full:
+                self._reject("queue full")
+            try:
+                acquired = self._slots.acquire(timeout=self.max_wait)
+            finally:
+                with self._lock:
+                    self.waiting -= 1
+            if not acquired:
+                self._reject(f"no slot after {self.max_wait}s")
+        with self._lock:
+            self.active += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.active -= 1
+            self._slots.release()
+
+    def status(self) -> Dict[str, Any]:
+        """Current occupancy and the number of rejected calls so far."""
+        with self._lock:
+            return {
+                'name': self.name,
+                'max_concurrent': self.max_concurrent,
+                'active': self.active,
+                'waiting': self.waiting,
+                'max_queue': self.max_queue,
+                'rejected': self.rejected,
+            }
+
+
+class AsyncBulkhead:
+    """``Bulkhead`` for coroutines sharing one event loop."""
+
+    def __init__(self, name: str, max_concurrent: int, max_queue: int, max_wait: float):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self._slots = asyncio.Semaphore(max_concurrent)
+        self.active = 0
+        self.waiting = 0
+        self.rejected = 0
+
+    def _reject(self, reason: str):
+        self.rejected += 1
+        logger.warning(f"Bulkhead {self.name} rejected a call ({reason})")
+        raise BulkheadFull(self.name, reason)
+
+    @asynccontextmanager
+    async def acquire(self):
+        """Hold a slot for the duration of the block.
+
+        Raises:
+            BulkheadFull: If the queue is full or no slot frees up in time.
+        """
+        if self._slots.locked():
+            if self.waiting >= self.max_queue:
+                self._reject("queue full")
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(self._slots.acquire(), self.max_wait)
+            except asyncio.TimeoutError:
+                self._reject(f"no slot after {self.max_wait}s")
+            finally:
+                self.waiting -= 1
+        else:
+            await self._slots.acquire()
+        self.active += 1
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self._slots.release()
+
+    def status(self) -> Dict[str, Any]:
+        """Current occupancy and the number of rejected calls so far."""
+        return {
+            'name': self.name,
+            'max_concurrent': self.max_concurrent,
+            'active': self.active,
+            'waiting': self.waiting,
+            'max_queue': self.max_queue,
+            'rejected': self.rejected,
+        }
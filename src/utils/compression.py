@@ -0,0 +1,116 @@
+"""
+HTTP response compression with gzip/brotli content negotiation.
+
+Brotli is used when the optional ``brotli`` package is installed and the
+client accepts it; otherwise gzip from the standard library.
+"""
+import zlib
+from typing import Iterable, Iterator, Optional, Sequence
+from loguru import logger
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+
+COMPRESSIBLE_MIMETYPES = {
+    "application/json",
+    "application/javascript",
+    "text/javascript",
+    "text/css",
+    "text/csv",
+    "text/html",
+    "text/plain",
+    "image/svg+xml",
+}
+
+
+def supported_encodings() -> Sequence[str]:
+    """Encodings this process can produce, in order of preference."""
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def negotiate_encoding(accept_encoding: Optional[str],
+                       available: Optional[Sequence[str]] = None) -> Optional[str]:
+    """Pick the best encoding from an ``Accept-Encoding`` header.
+
+    Honors q-values (``q=0`` refuses an encoding) and ``*``; among equally
+    weighted encodings the server preference order of ``available`` wins.
+    """
+    if not accept_encoding:
+        return None
+    available = available or supported_encodings()
+
+    weights = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            weights[name] = quality
+
+    best, best_quality = None, 0.0
+    for encoding in available:
+        quality = weights.get(encoding, weights.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def _compressor(encoding: str, gzip_level: int, brotli_quality: int):
+    """Incremental compressor exposing ``compress(chunk)`` and ``flush()``."""
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=brotli_quality)
+        # brotli uses process()/finish(); adapt to the zlib interface
+        return _BrotliAdapter(compressor)
+    # wbits=31: zlib stream with gzip header and trailer
+    return zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+
+
+class _BrotliAdapter:
+    def __init__(self, compressor):
+        self._compressor = compressor
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.finish()
+
+
+def compress_bytes(data: bytes, encoding: str, gzip_level: int = 6, brotli_quality: int = 4) -> bytes:
+    """Compress a whole body in one call."""
+    compressor = _compressor(encoding, gzip_level, brotli_quality)
+    return compressor.compress(data) + compressor.flush()
+
+
+def compress_stream(chunks: Iterable[bytes], encoding: str, gzip_level: int = 6,
+                    brotli_quality: int = 4) -> Iterator[bytes]:
+    """Compress a streamed body chunk by chunk with constant memory.
+
+    Empty intermediate outputs are skipped so the server does not emit
+    zero-length chunks while the compressor is still buffering.
+    """
+    compressor = _compressor(encoding, gzip_level, brotli_quality)
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode("utf-8")
+            output = compressor.compress(chunk)
+            if output:
+                yield output
+        yield compressor.flush()
+    finally:
+        close = getattr(chunks, "close", None)
+        if close is not None:
+            try:
+                close()
+            except Exception as e:
+                logger.warning(f"Error closing streamed response: {e}")
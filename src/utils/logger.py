@@ -3,41 +3,157 @@ Logging configuration and utilities.
 """
 import os
 import sys
+import threading
+import time
+import zipfile
 from loguru import logger
 from src.config.settings import logging_settings
 
 
-def setup_logging():
-    """Configure logging for the application."""
-    
+class RateLimitFilter:
+    """Drop repetitive records coming from the same logger and call site.
+
+    Each (logger name, line, level) key may emit at most ``limit`` records per
+    ``window`` seconds; the rest are counted and reported once in the first
+    record let through after the window resets. ERROR and above always pass.
+    """
+
+    def __init__(self, limit: int, window: float):
+        self.limit = limit
+        self.window = window
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self._last = threading.local()
+        self._error_no = logger.level("ERROR").no
+
+    def __call__(self, record) -> bool:
+        # The same record is offered to every sink; decide only once per record
+        if getattr(self._last, "record", None) is record:
+            return self._last.allowed
+        allowed = self._allow(record)
+        self._last.record, self._last.allowed = record, allowed
+        return allowed
+
+    def _allow(self, record) -> bool:
+        if self.limit <= 0 or record["level"].no >= self._error_no:
+            return True
+
+        key = (record["name"], record["line"], record["level"].no)
+        now = time.monotonic()
+        with self._lock:
+            started, emitted, suppressed = self._buckets.get(key, (now, 0, 0))
+            if now - started >= self.window:
+                started, emitted = now, 0
+                if suppressed:
+                    record["extra"]["suppressed"] = suppressed
+                suppressed = 0
+            if emitted < self.limit:
+                self._buckets[key] = (started, emitted + 1, suppressed)
+                return True
+            self._buckets[key] = (started, emitted, suppressed + 1)
+            return False
+
+
+def _compress_in_background(path: str):
+    """Zip a rotated log file on a daemon thread so the sink never waits on it."""
+
+    def compress():
+        try:
+            with zipfile.ZipFile(f"{path}.zip", "w", zipfile.ZIP_DEFLATED) as archive:
+                archive.write(path, os.path.basename(path))
+            os.remove(path)
+        except OSError as e:
+            sys.stderr.write(f"Failed to compress rotated log {path}: {e}\n")
+
+    threading.Thread(target=compress, name="log-compression", daemon=True).start()
+
+
+def _suppressed_suffix(record) -> str:
+    """Append the number of dropped repetitions to the formatted message, if any."""
+    suppressed = record["extra"].get("suppressed")
+    return f" (+{suppressed} similar suppressed)" if suppressed else ""
+
+
+def _console_format(record) -> str:
+    return (
+        "<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | "
+        "<cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>"
+        + _suppressed_suffix(record)
+        + "\n{exception}"
+    )
+
+
+def _file_format(record) -> str:
+    return (
+        "{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} - {message}"
+        + _suppressed_suffix(record)
+        + "\n{exception}"
+    )
+
+
+_configured = False
+
+
+def setup_logging(force: bool = False):
+    """Configure logging for the application.
+
+    Entry points call this explicitly; later calls are no-ops unless ``force``.
+    """
+    global _configured
+    if _configured and not force:
+        return
+    _configured = True
+
     # Remove default logger
     logger.remove()
-    
+
     # Create logs directory if it doesn't exist
-    log_dir = os.path.dirname(logging_settings.file_path)
-    if log_dir and not os.path.exists(log_dir):
-        os.makedirs(log_dir)
-    
+    for path in (logging_settings.file_path, logging_settings.json_file_path):
+        log_dir = os.path.dirname(path) if path else ""
+        if log_dir and not os.path.exists(log_dir):
+            os.makedirs(log_dir)
+
+    # Shared across sinks so a suppressed record is suppressed everywhere
+    rate_limit = RateLimitFilter(
+        limit=logging_settings.rate_limit,
+        window=logging_settings.rate_limit_window
+    )
+
     # Add console logging
     logger.add(
         sys.stdout,
         level=logging_settings.level,
-        format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>",
-        colorize=True
+        format=_console_format,
+        colorize=logging_settings.colorize,
+        filter=rate_limit,
+        enqueue=logging_settings.enqueue
     )
-    
-    # Add file logging
+
+    # Add file logging; with enqueue the writes and rotation happen on loguru's
+    # worker thread and compression is handed off to its own thread
     logger.add(
         logging_settings.file_path,
         level=logging_settings.level,
-        format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} - {message}",
+        format=_file_format,
         rotation="10 MB",
         retention="30 days",
-        compression="zip"
+        compression=_compress_in_background,
+        filter=rate_limit,
+        enqueue=logging_settings.enqueue
     )
-    
-    logger.info("Logging configured successfully")
 
+    # Add structured JSON logging (one serialized record per line)
+    if logging_settings.json_file_path:
+        logger.add(
+            logging_settings.json_file_path,
+            level=logging_settings.level,
+            serialize=True,
+            rotation="10 MB",
+            retention="30 days",
+            compression=_compress_in_background,
+            filter=rate_limit,
+            enqueue=logging_settings.enqueue
+        )
+
+    logger.info("Logging configured successfully")
 
-# Initialize logging when module is imported
-setup_logging()
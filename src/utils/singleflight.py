@@ -0,0 +1,82 @@
+"""
+Request coalescing: concurrent calls with the same key share one execution.
+"""
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable
+from loguru import logger
+
+
+class _Call:
+    """An in-flight computation that followers wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Deduplicate concurrent executions of identical work within a process.
+
+    The first caller for a key runs ``fn``; callers arriving while it is still
+    running block until it finishes and receive the same result (or exception).
+    Nothing is cached once the call completes.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Run ``fn`` for ``key`` or join the execution already in flight."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                call.waiters += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+            if call.waiters:
+                logger.debug(f"Coalesced {call.waiters} concurrent calls for {key}")
+        return call.result
+
+
+class AsyncSingleFlight:
+    """``SingleFlight`` for coroutines sharing one event loop.
+
+    The first caller for a key awaits ``fn()``; callers arriving while it is
+    pending await the same task. A follower being cancelled does not cancel
+    the shared execution.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, "asyncio.Task"] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Await ``fn()`` for ``key`` or join the execution already in flight."""
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda _: self._calls.pop(key, None))
+        else:
+            logger.debug(f"Coalesced concurrent call for {key}")
+        return await asyncio.shield(task)
@@ -3,26 +3,31 @@ Script de inicio para la aplicación web con verificación de dependencias.
 """
 import sys
 import os
+import argparse
+import importlib.util
 import subprocess
 import time
 
-def check_dependencies():
+def check_dependencies(production=False, asgi=False):
     """Verificar que todas las dependencias estén instaladas."""
     required_packages = [
         'flask',
         'flask_cors',
-        'plotly',
         'pandas',
         'psycopg2'
     ]
+    if production:
+        required_packages.append('gunicorn')
+    if asgi:
+        required_packages += ['quart', 'asyncpg', 'hypercorn']
     
     missing_packages = []
     
     for package in required_packages:
-        try:
-            __import__(package)
+        # find_spec localiza el paquete sin importarlo (pandas tarda en cargar)
+        if importlib.util.find_spec(package) is not None:
             print(f"✅ {package} - OK")
-        except ImportError:
+        else:
             missing_packages.append(package)
             print(f"❌ {package} - FALTANTE")
     
@@ -56,14 +61,95 @@ def check_database_connection():
         print(f"❌ Error verificando base de datos: {e}")
         return False
 
-def start_web_app():
+def install_triggers():
+    """Instalar el trigger que publica los cambios de orders (LISTEN/NOTIFY)."""
+    try:
+        from src.database.notifications import install_change_trigger
+        
+        install_change_trigger()
+        print("✅ Trigger de notificaciones instalado")
+        return True
+    except Exception as e:
+        print(f"❌ Error instalando el trigger de notificaciones: {e}")
+        return False
+
+def install_indexes():
+    """Crear los índices de filtros y búsqueda de clientes (pg_trgm)."""
+    try:
+        from src.database.indexes import install_indexes as create_indexes
+        
+        for name in create_indexes():
+            print(f"✅ Índice {name}")
+        return True
+    except Exception as e:
+        print(f"❌ Error creando índices: {e}")
+        return False
+
+def start_job_runner():
+    """Con JOB_RUNNER=process, lanzar run_jobs.py junto al servidor (Gunicorn lo hace en gunicorn.conf.py)."""
+    from src.config.settings import job_settings
+    
+    if job_settings.runner != 'process':
+        return None
+    project_dir = os.path.dirname(os.path.abspath(__file__))
+    runner = subprocess.Popen([sys.executable, os.path.join(project_dir, 'run_jobs.py')], cwd=project_dir)
+    print(f"⚙️  Proceso de tareas en segundo plano: {runner.pid}")
+    return runner
+
+def stop_job_runner(runner, timeout=30):
+    """Detener run_jobs.py dejando terminar las tareas en curso."""
+    if runner is None or runner.poll() is not None:
+        return
+    runner.terminate()
+    try:
+        runner.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        runner.kill()
+
+def run_production_server(workers=None, threads=None):
+    """Reemplazar este proceso por el master de Gunicorn (pre-fork, multi-worker)."""
+    if os.name == 'nt':
+        print("❌ Gunicorn no está disponible en Windows; usa el modo desarrollo")
+        return False
+    
+    config_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'gunicorn.conf.py')
+    command = [sys.executable, '-m', 'gunicorn', '-c', config_path]
+    if workers:
+        command += ['--workers', str(workers)]
+    if threads:
+        command += ['--threads', str(threads)]
+    command.append('web_app:app')
+    
+    # exec: las señales (HUP para recarga elegante, TERM) llegan directo al master
+    os.execv(sys.executable, command)
+
+def run_asgi_server(workers=None):
+    """Reemplazar este proceso por Hypercorn sirviendo la variante asyncio (asgi_app.py)."""
+    from src.config.settings import server_settings
+    
+    bind = f"{server_settings.bind_host}:{server_settings.bind_port}"
+    # Un proceso asyncio atiende muchas conexiones: basta un worker por CPU
+    workers = workers or server_settings.workers or os.cpu_count() or 1
+    command = [sys.executable, '-m', 'hypercorn', '--bind', bind, '--workers', str(workers), 'asgi_app:app']
+    runner = start_job_runner()
+    if runner is None:
+        os.execv(sys.executable, command)
+    # Con el proceso de tareas, Hypercorn corre como hijo para poder detener ambos
+    try:
+        return subprocess.call(command) == 0
+    except KeyboardInterrupt:
+        return True
+    finally:
+        stop_job_runner(runner)
+
+def start_web_app(production=False, workers=None, threads=None, triggers=False, indexes=False, asgi=False):
     """Iniciar la aplicación web."""
     print("🚀 Iniciando aplicación web...")
     print("=" * 50)
     
     # Verificar dependencias
     print("1. Verificando dependencias...")
-    if not check_dependencies():
+    if not check_dependencies(production, asgi):
         print("❌ Error: Dependencias faltantes")
         return False
     
@@ -73,6 +159,16 @@ def start_web_app():
         print("❌ Error: No se puede conectar a la base de datos")
         return False
     
+    if triggers:
+        print("\n   Instalando trigger de actualizaciones en vivo...")
+        if not install_triggers():
+            return False
+    
+    if indexes:
+        print("\n   Creando índices de búsqueda...")
+        if not install_indexes():
+            return False
+    
     # Crear directorios necesarios
     print("\n3. Creando directorios necesarios...")
     os.makedirs('exports', exist_ok=True)
@@ -87,6 +183,17 @@ def start_web_app():
     print("\n💡 Presiona Ctrl+C para detener la aplicación")
     print("=" * 50)
     
+    if asgi:
+        print("⚡ Modo ASGI: API asyncio (Quart + asyncpg) con Hypercorn")
+        return run_asgi_server(workers)
+    
+    if production:
+        print("🏭 Modo producción: Gunicorn multi-worker")
+        return run_production_server(workers, threads)
+    
+    # El recargador de Flask vuelve a ejecutar este script en un proceso hijo:
+    # el proceso de tareas se lanza una sola vez, desde el proceso original
+    runner = None if os.environ.get('WERKZEUG_RUN_MAIN') else start_job_runner()
     try:
         # Importar y ejecutar la aplicación web
         from web_app import app
@@ -96,8 +203,23 @@ def start_web_app():
     except Exception as e:
         print(f"\n❌ Error iniciando aplicación: {e}")
         return False
+    finally:
+        stop_job_runner(runner)
     
     return True
 
 if __name__ == "__main__":
-    start_web_app()
+    parser = argparse.ArgumentParser(description="Iniciar la aplicación web")
+    parser.add_argument('--prod', action='store_true',
+                        help="Servir con Gunicorn (pre-fork, multi-worker) en lugar del servidor de desarrollo")
+    parser.add_argument('--asgi', action='store_true',
+                        help="Servir la API asyncio (asgi_app.py) con Hypercorn en lugar de la app Flask")
+    parser.add_argument('--workers', type=int, help="Número de procesos worker (--prod o --asgi)")
+    parser.add_argument('--threads', type=int, help="Hilos por worker (solo --prod)")
+    parser.add_argument('--install-triggers', action='store_true',
+                        help="Instalar el trigger LISTEN/NOTIFY de orders para el dashboard en vivo")
+    parser.add_argument('--install-indexes', action='store_true',
+                        help="Crear los índices de filtros y búsqueda de clientes (pg_trgm)")
+    args = parser.parse_args()
+    start_web_app(production=args.prod, workers=args.workers, threads=args.threads,
+                  triggers=args.install_triggers, indexes=args.install_indexes, asgi=args.asgi)
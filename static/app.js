@@ -2,14 +2,11 @@
  * JavaScript para la aplicación web de gestión de datos
  */
 
-// Variables globales
-let currentPage = 1;
-let currentFilters = {};
-
 // Inicialización
 document.addEventListener('DOMContentLoaded', function() {
     loadDashboardData();
     loadOrders();
+    connectLiveUpdates();
 });
 
 // Variables globales para gestión de órdenes
@@ -50,20 +47,26 @@ function showSection(sectionName) {
         loadDataQualityReport();
     } else if (sectionName === 'order-management') {
         setupOrderManagement();
+    } else if (sectionName === 'orders') {
+        // Oculta, la tabla no tiene altura: renderizar ahora que es visible
+        scheduleOrdersRender();
     }
 }
 
 // Dashboard
+// Últimas estadísticas y gráficos, para aplicar cambios incrementales en vivo
+let dashboardStats = null;
+const dashboardCharts = {};
+
 async function loadDashboardData() {
     try {
         const response = await fetch('/api/dashboard/stats');
         const data = await response.json();
+        dashboardStats = data;
         
         // Actualizar estadísticas
-        document.getElementById('total-orders').textContent = data.total_orders.toLocaleString();
-        document.getElementById('completed-orders').textContent = data.status_distribution['Order Finished'] || 0;
+        updateDashboardCounters(data);
         document.getElementById('duplicates').textContent = '2'; // Se actualizará con la verificación
-        document.getElementById('categories').textContent = Object.keys(data.category_distribution).length;
         
         // Crear gráficos
         createStatusChart(data.status_distribution);
@@ -76,9 +79,18 @@ async function loadDashboardData() {
     }
 }
 
+function updateDashboardCounters(data) {
+    document.getElementById('total-orders').textContent = data.total_orders.toLocaleString();
+    document.getElementById('completed-orders').textContent = data.status_distribution['Order Finished'] || 0;
+    document.getElementById('categories').textContent = Object.keys(data.category_distribution).length;
+}
+
 function createStatusChart(statusData) {
     const ctx = document.getElementById('statusChart').getContext('2d');
-    new Chart(ctx, {
+    if (dashboardCharts.status) {
+        dashboardCharts.status.destroy();
+    }
+    dashboardCharts.status = new Chart(ctx, {
         type: 'doughnut',
         data: {
             labels: Object.keys(statusData),
@@ -105,7 +117,10 @@ function createStatusChart(statusData) {
 
 function createCategoryChart(categoryData) {
     const ctx = document.getElementById('categoryChart').getContext('2d');
-    new Chart(ctx, {
+    if (dashboardCharts.category) {
+        dashboardCharts.category.destroy();
+    }
+    dashboardCharts.category = new Chart(ctx, {
         type: 'bar',
         data: {
             labels: Object.keys(categoryData),
@@ -138,7 +153,10 @@ function createCategoryChart(categoryData) {
 
 function createYearlyChart(yearlyData) {
     const ctx = document.getElementById('yearlyChart').getContext('2d');
-    new Chart(ctx, {
+    if (dashboardCharts.yearly) {
+        dashboardCharts.yearly.destroy();
+    }
+    dashboardCharts.yearly = new Chart(ctx, {
         type: 'line',
         data: {
             labels: yearlyData.map(item => item.year),
@@ -184,6 +202,98 @@ function createYearlyChart(yearlyData) {
     });
 }
 
+// Actualizaciones en vivo (Server-Sent Events)
+const LIVE_RETRY_MS = 30000;
+let liveConnectedBefore = false;
+let liveOrdersRefreshTimer = null;
+
+function connectLiveUpdates() {
+    if (!window.EventSource) {
+        return;
+    }
+    const source = new EventSource('/api/events');
+    
+    source.addEventListener('open', () => {
+        // Los cambios ocurridos durante la reconexión se perdieron: recargar
+        // (con ETag la recarga es un 304 si nada cambió)
+        if (liveConnectedBefore) {
+            loadDashboardData();
+        }
+        liveConnectedBefore = true;
+    });
+    source.addEventListener('orders', event => applyOrdersChange(JSON.parse(event.data)));
+    source.addEventListener('resync', () => {
+        loadDashboardData();
+        invalidateOrdersCache();
+    });
+    source.addEventListener('error', () => {
+        // EventSource reintenta solo salvo que el servidor rechace la conexión (p. ej. 503)
+        if (source.readyState === EventSource.CLOSED) {
+            setTimeout(connectLiveUpdates, LIVE_RETRY_MS);
+        }
+    });
+}
+
+function applyOrdersChange(change) {
+    if (dashboardStats) {
+        const stats = dashboardStats;
+        stats.total_orders += change.total;
+        
+        for (const [status, count] of Object.entries(change.status || {})) {
+            stats.status_distribution[status] = (stats.status_distribution[status] || 0) + count;
+            if (stats.status_distribution[status] <= 0) {
+                delete stats.status_distribution[status];
+            }
+        }
+        
+        for (const [category, delta] of Object.entries(change.category || {})) {
+            stats.category_distribution[category] = (stats.category_distribution[category] || 0) + delta.count;
+            stats.category_revenue[category] = (stats.category_revenue[category] || 0) + delta.amount;
+            if (stats.category_distribution[category] <= 0) {
+                delete stats.category_distribution[category];
+                delete stats.category_revenue[category];
+            }
+        }
+        
+        for (const [year, delta] of Object.entries(change.year || {})) {
+            let item = stats.yearly_stats.find(entry => entry.year === Number(year));
+            if (!item) {
+                item = { year: Number(year), orders: 0, revenue: 0 };
+                stats.yearly_stats.push(item);
+                stats.yearly_stats.sort((a, b) => a.year - b.year);
+            }
+            item.orders += delta.count;
+            item.revenue += delta.amount;
+        }
+        stats.yearly_stats = stats.yearly_stats.filter(item => item.orders > 0);
+        
+        updateDashboardCounters(stats);
+        updateChart(dashboardCharts.status, Object.keys(stats.status_distribution),
+            [Object.values(stats.status_distribution)]);
+        updateChart(dashboardCharts.category, Object.keys(stats.category_revenue),
+            [Object.values(stats.category_revenue)]);
+        updateChart(dashboardCharts.yearly, stats.yearly_stats.map(item => item.year),
+            [stats.yearly_stats.map(item => item.orders), stats.yearly_stats.map(item => item.revenue)]);
+    }
+    
+    // La tabla de órdenes se recarga una sola vez por ráfaga de cambios
+    if (document.getElementById('orders-section').style.display === 'block') {
+        clearTimeout(liveOrdersRefreshTimer);
+        liveOrdersRefreshTimer = setTimeout(invalidateOrdersCache, 1000);
+    }
+}
+
+function updateChart(chart, labels, datasets) {
+    if (!chart) {
+        return;
+    }
+    chart.data.labels = labels;
+    datasets.forEach((data, index) => {
+        chart.data.datasets[index].data = data;
+    });
+    chart.update('none');
+}
+
 // Calidad de Datos
 async function loadDataQualityReport() {
     const loading = document.querySelector('#data-quality-section .loading');
@@ -193,8 +303,10 @@ async function loadDataQualityReport() {
     report.innerHTML = '';
     
     try {
-        const response = await fetch('/api/data-quality/report');
+        // Modo aproximado: muestra de la tabla, responde rápido en tablas grandes
+        const response = await fetch('/api/data-quality/report?mode=approx');
         const data = await response.json();
+        const prefix = data.approximate ? '≈ ' : '';
         
         loading.style.display = 'none';
         
@@ -205,7 +317,7 @@ async function loadDataQualityReport() {
                     <ul class="list-group">
                         <li class="list-group-item d-flex justify-content-between">
                             <span>Total de Registros:</span>
-                            <span class="badge bg-primary">${data.total_records.toLocaleString()}</span>
+                            <span class="badge bg-primary">${prefix}${data.total_records.toLocaleString()}</span>
                         </li>
                         <li class="list-group-item d-flex justify-content-between">
                             <span>Total de Columnas:</span>
@@ -213,8 +325,14 @@ async function loadDataQualityReport() {
                         </li>
                         <li class="list-group-item d-flex justify-content-between">
                             <span>Registros Duplicados:</span>
-                            <span class="badge bg-warning">${data.duplicate_records}</span>
+                            <span class="badge bg-warning">${data.duplicate_records ?? 'n/d'}</span>
                         </li>
+                        ${data.distinct_counts ? `
+                            <li class="list-group-item d-flex justify-content-between">
+                                <span>Clientes Distintos:</span>
+                                <span class="badge bg-info">${prefix}${data.distinct_counts.customer_name.estimate.toLocaleString()}</span>
+                            </li>
+                        ` : ''}
                     </ul>
                 </div>
                 <div class="col-md-6">
@@ -223,7 +341,7 @@ async function loadDataQualityReport() {
                         ${Object.entries(data.data_completeness).map(([column, percentage]) => `
                             <li class="list-group-item d-flex justify-content-between">
                                 <span>${column}:</span>
-                                <span class="badge ${percentage === 100 ? 'bg-success' : 'bg-warning'}">${percentage}%</span>
+                                <span class="badge ${percentage === 100 ? 'bg-success' : 'bg-warning'}">${prefix}${percentage}%</span>
                             </li>
                         `).join('')}
                     </ul>
@@ -240,13 +358,68 @@ async function loadDataQualityReport() {
     }
 }
 
+// Tareas en segundo plano
+const JOB_POLL_INTERVAL_MS = 1000;
+const JOB_QUEUE_TIMEOUT_MS = 2 * 60 * 1000;  // sin empezar: el proceso de tareas no está corriendo
+const JOB_TIMEOUT_MS = 30 * 60 * 1000;
+
+async function runJob(type, progressContainerId = null) {
+    // Encolar la tarea y consultar su estado hasta que termine
+    const response = await fetch('/api/jobs', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json'
+        },
+        body: JSON.stringify({ type })
+    });
+    const submitted = await response.json();
+    if (!response.ok) {
+        throw new Error(submitted.error || 'Error al encolar la tarea');
+    }
+    
+    const startedAt = Date.now();
+    while (Date.now() - startedAt < JOB_TIMEOUT_MS) {
+        await new Promise(resolve => setTimeout(resolve, JOB_POLL_INTERVAL_MS));
+        const statusResponse = await fetch(submitted.status_url);
+        const job = await statusResponse.json();
+        if (!statusResponse.ok) {
+            throw new Error(job.error || 'Error al consultar la tarea');
+        }
+        
+        if (job.status === 'succeeded') {
+            return { ...job.result, job_id: job.job_id };
+        }
+        if (job.status === 'failed') {
+            throw new Error(job.error || 'La tarea falló');
+        }
+        if (job.status === 'queued' && Date.now() - startedAt > JOB_QUEUE_TIMEOUT_MS) {
+            throw new Error('La tarea sigue en cola; revisa que el proceso de tareas (run_jobs.py) esté en ejecución');
+        }
+        if (progressContainerId) {
+            showJobProgress(progressContainerId, job);
+        }
+    }
+    throw new Error('La tarea no terminó a tiempo; consulta su estado más tarde en ' + submitted.status_url);
+}
+
+function showJobProgress(containerId, job) {
+    document.getElementById(containerId).innerHTML = `
+        <div class="text-center">
+            <div class="progress mb-2">
+                <div class="progress-bar progress-bar-striped progress-bar-animated" role="progressbar"
+                     style="width: ${job.progress}%">${job.progress}%</div>
+            </div>
+            <p class="mt-2">${job.message || (job.status === 'queued' ? 'En cola...' : 'Procesando...')}</p>
+        </div>
+    `;
+}
+
 // Limpieza de Datos
 async function checkDuplicates() {
     showLoading('cleaning-results');
     
     try {
-        const response = await fetch('/api/data-cleaning/duplicates');
-        const data = await response.json();
+        const data = await runJob('duplicates', 'cleaning-results');
         
         const html = `
             <div class="card mt-3">
@@ -323,8 +496,7 @@ async function checkIncomplete() {
     showLoading('cleaning-results');
     
     try {
-        const response = await fetch('/api/data-cleaning/incomplete');
-        const data = await response.json();
+        const data = await runJob('incomplete', 'cleaning-results');
         
         const html = `
             <div class="card mt-3">
@@ -383,8 +555,7 @@ async function validateData() {
     showLoading('cleaning-results');
     
     try {
-        const response = await fetch('/api/data-cleaning/validate');
-        const data = await response.json();
+        const data = await runJob('validate', 'cleaning-results');
         
         const html = `
             <div class="card mt-3">
@@ -434,78 +605,300 @@ async function validateData() {
     }
 }
 
-// Gestión de Órdenes
-async function loadOrders(page = 1) {
-    const status = document.getElementById('status-filter').value;
-    const category = document.getElementById('category-filter').value;
+// Gestión de Órdenes: tabla virtualizada
+// Solo se renderizan las filas visibles; las filas se piden al servidor por
+// ventanas, se guardan en caché y se precarga la ventana siguiente.
+const ORDERS_WINDOW_SIZE = 100;        // filas por petición
+const ORDERS_ROW_HEIGHT = 41;          // px, fijado por CSS (.order-row)
+const ORDERS_OVERSCAN = 10;            // filas extra arriba y abajo de la vista
+const ORDERS_CACHE_WINDOWS = 50;       // ventanas en caché (LRU)
+const ORDERS_MAX_SCROLL_PX = 10000000; // los navegadores limitan la altura de un elemento
+const FILTER_DEBOUNCE_MS = 250;
+// Solo las columnas que muestra la tabla
+const ORDERS_GRID_FIELDS = 'order_id,customer_name,order_date,status,category,subtotal_amount,quantity';
+
+const ordersGrid = {
+    filters: {},
+    total: null,
+    cache: new Map(),     // índice de ventana -> filas (el orden de inserción hace de LRU)
+    inFlight: new Map(),  // índice de ventana -> Promise
+    controller: null,     // AbortController de la consulta actual (filtros vigentes)
+    renderScheduled: false,
+    scrollBound: false
+};
+
+let filterDebounceTimer = null;
+
+function readOrderFilters() {
+    const value = id => document.getElementById(id).value.trim();
+    const customer = value('customer-filter');
+    const filters = {
+        status: value('status-filter'),
+        category: value('category-filter'),
+        subcategory: value('subcategory-filter'),
+        date_from: value('date-from-filter'),
+        date_to: value('date-to-filter'),
+        min_amount: value('min-amount-filter'),
+        max_amount: value('max-amount-filter'),
+        // Con menos de 3 caracteres el índice trigram no sirve: buscar por prefijo
+        ...(customer.length >= 3 ? { customer } : { customer_prefix: customer })
+    };
+    return Object.fromEntries(Object.entries(filters).filter(([, v]) => v));
+}
+
+async function loadOrders() {
     
-    currentFilters = { status, category };
-    currentPage = page;
+    // Nuevos filtros: cancelar las peticiones de la consulta anterior y vaciar la caché
+    if (ordersGrid.controller) {
+        ordersGrid.controller.abort();
+    }
+    ordersGrid.controller = new AbortController();
+    ordersGrid.filters = readOrderFilters();
+    ordersGrid.total = null;
+    ordersGrid.cache.clear();
+    ordersGrid.inFlight.clear();
     
-    const params = new URLSearchParams({
-        page: page,
-        per_page: 50,
-        ...(status && { status }),
-        ...(category && { category })
-    });
+    const viewport = document.getElementById('orders-viewport');
+    if (!ordersGrid.scrollBound) {
+        viewport.addEventListener('scroll', scheduleOrdersRender, { passive: true });
+        window.addEventListener('resize', scheduleOrdersRender);
+        ordersGrid.scrollBound = true;
+    }
+    viewport.scrollTop = 0;
     
     try {
-        const response = await fetch(`/api/orders?${params}`);
-        const data = await response.json();
-        
-        // Actualizar tabla
-        const tbody = document.getElementById('orders-table');
-        if (data.orders.length === 0) {
-            tbody.innerHTML = '<tr><td colspan="7" class="text-center">No se encontraron órdenes</td></tr>';
-        } else {
-            tbody.innerHTML = data.orders.map(order => `
-                <tr>
-                    <td>${order.order_id}</td>
-                    <td>${order.customer_name}</td>
-                    <td>${new Date(order.order_date).toLocaleDateString()}</td>
-                    <td><span class="badge bg-${getStatusColor(order.status)}">${order.status}</span></td>
-                    <td>${order.category}</td>
-                    <td>$${parseFloat(order.subtotal_amount).toLocaleString()}</td>
-                    <td>${order.quantity}</td>
-                </tr>
-            `).join('');
-        }
-        
-        // Actualizar paginación
-        updatePagination(data.total_pages, page);
-        
+        await fetchOrdersWindow(0);
+        renderOrders();
     } catch (error) {
+        if (error.name === 'AbortError') {
+            return;
+        }
         console.error('Error loading orders:', error);
         document.getElementById('orders-table').innerHTML = '<tr><td colspan="7" class="text-center text-danger">Error al cargar órdenes</td></tr>';
     }
 }
 
 function filterOrders() {
-    loadOrders(1);
+    clearTimeout(filterDebounceTimer);
+    filterDebounceTimer = setTimeout(loadOrders, FILTER_DEBOUNCE_MS);
+}
+
+const AUTOCOMPLETE_DEBOUNCE_MS = 200;
+let autocompleteTimer = null;
+let autocompleteController = null;
+
+function suggestCustomers() {
+    clearTimeout(autocompleteTimer);
+    autocompleteTimer = setTimeout(async () => {
+        const text = document.getElementById('customer-filter').value.trim();
+        const list = document.getElementById('customer-suggestions');
+        if (autocompleteController) {
+            autocompleteController.abort();
+        }
+        if (text.length < 2) {
+            list.innerHTML = '';
+            return;
+        }
+        autocompleteController = new AbortController();
+        try {
+            const params = new URLSearchParams({ q: text, limit: 10 });
+            const response = await fetch(`/api/customers/autocomplete?${params}`, { signal: autocompleteController.signal });
+            const data = await response.json();
+            list.innerHTML = '';
+            (data.customers || []).forEach(name => {
+                const option = document.createElement('option');
+                option.value = name;
+                list.appendChild(option);
+            });
+        } catch (error) {
+            if (error.name !== 'AbortError') {
+                console.error('Error loading customer suggestions:', error);
+            }
+        }
+    }, AUTOCOMPLETE_DEBOUNCE_MS);
+}
+
+function invalidateOrdersCache() {
+    // Tras una escritura las filas y el total en caché pueden estar desactualizados:
+    // descartar las peticiones en curso y recargar alrededor de la posición actual
+    if (ordersGrid.controller) {
+        ordersGrid.controller.abort();
+    }
+    ordersGrid.controller = new AbortController();
+    ordersGrid.cache.clear();
+    ordersGrid.inFlight.clear();
+    ordersGrid.total = null;
+    
+    const viewport = document.getElementById('orders-viewport');
+    const index = Math.floor(viewport.scrollTop / ORDERS_ROW_HEIGHT / ORDERS_WINDOW_SIZE);
+    fetchOrdersWindow(index)
+        .then(scheduleOrdersRender)
+        .catch(error => {
+            if (error.name !== 'AbortError') {
+                console.error('Error loading orders:', error);
+            }
+        });
+}
+
+function fetchOrdersWindow(index) {
+    if (ordersGrid.cache.has(index)) {
+        const rows = ordersGrid.cache.get(index);
+        ordersGrid.cache.delete(index);
+        ordersGrid.cache.set(index, rows);
+        return Promise.resolve(rows);
+    }
+    if (ordersGrid.inFlight.has(index)) {
+        return ordersGrid.inFlight.get(index);
+    }
+    
+    const controller = ordersGrid.controller;
+    // Al desplazarse la ventana anterior ya está en caché: pedir por clave
+    // (order_id < último de esa ventana) en lugar de por OFFSET, que se vuelve
+    // lento en posiciones profundas; los saltos usan la página
+    const previous = ordersGrid.cache.get(index - 1);
+    const position = previous && previous.length === ORDERS_WINDOW_SIZE
+        ? { before: previous[previous.length - 1].order_id }
+        : { page: index + 1 };
+    const params = new URLSearchParams({
+        ...position,
+        per_page: ORDERS_WINDOW_SIZE,
+        // El total solo hace falta una vez por consulta
+        count: ordersGrid.total === null ? 'true' : 'false',
+        fields: ORDERS_GRID_FIELDS,
+        ...ordersGrid.filters
+    });
+    
+    const request = fetch(`/api/orders?${params}`, { signal: controller.signal })
+        .then(response => {
+            if (!response.ok) {
+                throw new Error(`HTTP ${response.status}`);
+            }
+            return response.json();
+        })
+        .then(data => {
+            if (controller !== ordersGrid.controller) {
+                return data.orders;  // respuesta de una consulta ya reemplazada
+            }
+            if (data.total !== null && data.total !== undefined) {
+                ordersGrid.total = data.total;
+            }
+            ordersGrid.cache.set(index, data.orders);
+            while (ordersGrid.cache.size > ORDERS_CACHE_WINDOWS) {
+                ordersGrid.cache.delete(ordersGrid.cache.keys().next().value);
+            }
+            return data.orders;
+        })
+        .finally(() => {
+            if (ordersGrid.inFlight.get(index) === request) {
+                ordersGrid.inFlight.delete(index);
+            }
+        });
+    
+    ordersGrid.inFlight.set(index, request);
+    return request;
+}
+
+function scheduleOrdersRender() {
+    if (ordersGrid.renderScheduled) {
+        return;
+    }
+    ordersGrid.renderScheduled = true;
+    requestAnimationFrame(() => {
+        ordersGrid.renderScheduled = false;
+        renderOrders();
+    });
 }
 
-function updatePagination(totalPages, currentPage) {
-    const pagination = document.getElementById('pagination');
-    let html = '';
+function renderOrders() {
+    const viewport = document.getElementById('orders-viewport');
+    const tbody = document.getElementById('orders-table');
+    const total = ordersGrid.total;
     
-    // Botón anterior
-    html += `<li class="page-item ${currentPage === 1 ? 'disabled' : ''}">
-        <a class="page-link" href="#" onclick="loadOrders(${currentPage - 1})">Anterior</a>
-    </li>`;
+    if (total === null) {
+        return;  // recargando: mantener lo que se muestra
+    }
+    if (total === 0) {
+        tbody.innerHTML = '<tr><td colspan="7" class="text-center">No se encontraron órdenes</td></tr>';
+        updateOrdersSummary(0, 0, 0);
+        return;
+    }
+    
+    // Con millones de filas la altura real excede el límite del navegador:
+    // se comprime el scroll y se mapea proporcionalmente a filas virtuales
+    const fullHeight = total * ORDERS_ROW_HEIGHT;
+    const height = Math.min(fullHeight, ORDERS_MAX_SCROLL_PX);
+    const maxScroll = Math.max(1, height - viewport.clientHeight);
+    const virtualTop = height === fullHeight
+        ? viewport.scrollTop
+        : viewport.scrollTop / maxScroll * Math.max(0, fullHeight - viewport.clientHeight);
+    
+    const firstVisible = Math.floor(virtualTop / ORDERS_ROW_HEIGHT);
+    const visibleCount = Math.ceil(viewport.clientHeight / ORDERS_ROW_HEIGHT);
+    // Inicio par: la fila espaciadora no altera el rayado de .table-striped al desplazarse
+    let start = Math.max(0, firstVisible - ORDERS_OVERSCAN);
+    start -= start % 2;
+    const end = Math.min(total, firstVisible + visibleCount + ORDERS_OVERSCAN);
+    
+    const firstWindow = Math.floor(start / ORDERS_WINDOW_SIZE);
+    const lastWindow = Math.floor((end - 1) / ORDERS_WINDOW_SIZE);
+    const missing = [];
+    for (let w = firstWindow; w <= lastWindow; w++) {
+        if (!ordersGrid.cache.has(w)) {
+            missing.push(w);
+        }
+    }
+    
+    // Precargar la ventana siguiente a la visible
+    const nextWindow = lastWindow + 1;
+    if (nextWindow * ORDERS_WINDOW_SIZE < total) {
+        fetchOrdersWindow(nextWindow).catch(() => {});
+    }
     
-    // Páginas
-    for (let i = Math.max(1, currentPage - 2); i <= Math.min(totalPages, currentPage + 2); i++) {
-        html += `<li class="page-item ${i === currentPage ? 'active' : ''}">
-            <a class="page-link" href="#" onclick="loadOrders(${i})">${i}</a>
-        </li>`;
+    if (missing.length) {
+        Promise.all(missing.map(fetchOrdersWindow))
+            .then(scheduleOrdersRender)
+            .catch(error => {
+                if (error.name !== 'AbortError') {
+                    console.error('Error loading orders:', error);
+                }
+            });
+    }
+    
+    const rows = [];
+    for (let i = start; i < end; i++) {
+        const windowRows = ordersGrid.cache.get(Math.floor(i / ORDERS_WINDOW_SIZE));
+        const order = windowRows ? windowRows[i % ORDERS_WINDOW_SIZE] : null;
+        rows.push(order ? renderOrderRow(order) : '<tr class="order-row"><td colspan="7" class="text-muted">…</td></tr>');
     }
     
-    // Botón siguiente
-    html += `<li class="page-item ${currentPage === totalPages ? 'disabled' : ''}">
-        <a class="page-link" href="#" onclick="loadOrders(${currentPage + 1})">Siguiente</a>
-    </li>`;
+    const topSpacer = Math.max(0, viewport.scrollTop - (virtualTop - start * ORDERS_ROW_HEIGHT));
+    const bottomSpacer = Math.max(0, height - topSpacer - (end - start) * ORDERS_ROW_HEIGHT);
+    tbody.innerHTML =
+        `<tr style="height: ${topSpacer}px"></tr>` +
+        rows.join('') +
+        `<tr style="height: ${bottomSpacer}px"></tr>`;
     
-    pagination.innerHTML = html;
+    updateOrdersSummary(firstVisible + 1, Math.min(total, firstVisible + visibleCount), total);
+}
+
+function renderOrderRow(order) {
+    return `
+        <tr class="order-row">
+            <td>${order.order_id}</td>
+            <td>${order.customer_name}</td>
+            <td>${new Date(order.order_date).toLocaleDateString()}</td>
+            <td><span class="badge bg-${getStatusColor(order.status)}">${order.status}</span></td>
+            <td>${order.category}</td>
+            <td>$${parseFloat(order.subtotal_amount).toLocaleString()}</td>
+            <td>${order.quantity}</td>
+        </tr>
+    `;
+}
+
+function updateOrdersSummary(from, to, total) {
+    document.getElementById('orders-summary').textContent = total
+        ? `Mostrando ${from.toLocaleString()}–${to.toLocaleString()} de ${total.toLocaleString()} órdenes`
+        : '';
 }
 
 function getStatusColor(status) {
@@ -530,7 +923,9 @@ function copyToClipboard(elementId) {
 // Exportar
 async function exportCSV() {
     try {
-        const response = await fetch('/api/export/csv');
+        showAlert('Exportación en curso...', 'info');
+        const job = await runJob('export_csv');
+        const response = await fetch(`/api/jobs/${job.job_id}/download`);
         if (response.ok) {
             const blob = await response.blob();
             const url = window.URL.createObjectURL(blob);
@@ -562,7 +957,7 @@ function refreshData() {
         } else if (sectionId === 'data-quality-section') {
             loadDataQualityReport();
         } else if (sectionId === 'orders-section') {
-            loadOrders(currentPage);
+            invalidateOrdersCache();
         }
     }
     showAlert('Datos actualizados', 'success');
@@ -641,6 +1036,7 @@ async function createOrder(event) {
         
         if (response.ok) {
             showAlert(`Orden creada exitosamente con ID: ${result.order_id}`, 'success');
+            invalidateOrdersCache();
             document.getElementById('create-order-form').reset();
             // Actualizar dashboard si está visible
             if (document.getElementById('dashboard-section').style.display !== 'none') {
@@ -728,6 +1124,7 @@ async function updateOrder(event) {
         
         if (response.ok) {
             showAlert('Orden actualizada exitosamente', 'success');
+            invalidateOrdersCache();
             // Actualizar dashboard si está visible
             if (document.getElementById('dashboard-section').style.display !== 'none') {
                 loadDashboardData();
@@ -760,6 +1157,7 @@ async function deleteOrder() {
         
         if (response.ok) {
             showAlert('Orden eliminada exitosamente', 'success');
+            invalidateOrdersCache();
             document.getElementById('order-edit-form').style.display = 'none';
             document.getElementById('search-order-id').value = '';
             currentEditingOrderId = null;
@@ -813,6 +1211,7 @@ async function bulkUpdateStatus() {
         
         if (response.ok) {
             showAlert(`${result.updated_count} órdenes actualizadas exitosamente`, 'success');
+            invalidateOrdersCache();
             document.getElementById('bulk-order-ids').value = '';
             // Actualizar dashboard si está visible
             if (document.getElementById('dashboard-section').style.display !== 'none') {
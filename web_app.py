@@ -3,37 +3,59 @@ Aplicación web Flask para gestión de limpieza de datos y visualización.
 """
 import sys
 import os
+import csv
 import json
-from datetime import datetime
-from flask import Flask, render_template, request, jsonify, send_file
+import mimetypes
+import time
+from datetime import datetime, timezone
+from decimal import Decimal, InvalidOperation
+from functools import wraps
+from flask import Flask, g, render_template, request, jsonify, send_file, url_for
 from flask_cors import CORS
-import pandas as pd
-import plotly.graph_objs as go
-import plotly.utils
+from psycopg2.errors import QueryCanceled
+from werkzeug.security import safe_join
 
 # Add src to path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
+from src.config.settings import (
+    admission_settings, cache_settings, compression_settings, notify_settings, server_settings
+)
 from src.database.connection import db_connection
+from src.database.notifications import change_listener
+from src.database.queries import order_by_id_statement
+from src.models.order import ORDER_FIELDS, OrderValidationError, parse_fields, select_list, validate_order_update
 from src.services.order_service import OrderService
-from src.utils.logger import logger
+from src.services.data_version import (
+    bump_data_version, get_version_store, note_served_version, track_served_versions
+)
+from src.services.job_service import JobService, JOB_SUCCEEDED
+from src.utils.assets import AssetManifest, DIST_DIR, PRECOMPRESSED
+from src.utils.bulkhead import Bulkhead, BulkheadFull
+from src.utils.compression import COMPRESSIBLE_MIMETYPES, compress_bytes, compress_stream, negotiate_encoding
+from src.utils.logger import logger, setup_logging
+from src.utils.singleflight import SingleFlight
+
+setup_logging()
 
 def convert_pandas_types(obj):
     """Convierte tipos de pandas/numpy a tipos nativos de Python para serialización JSON."""
-    import numpy as np
-    import pandas as pd
+    # Si numpy/pandas aún no se importaron, obj no puede ser de sus tipos:
+    # no forzar su carga (pesada) solo para serializar respuestas de la base
+    np = sys.modules.get('numpy')
+    pd = sys.modules.get('pandas')
     
-    if isinstance(obj, (np.integer, np.int64, np.int32, np.int16, np.int8)):
+    if np is not None and isinstance(obj, (np.integer, np.int64, np.int32, np.int16, np.int8)):
         return int(obj)
-    elif isinstance(obj, (np.floating, np.float64, np.float32, np.float16)):
+    elif np is not None and isinstance(obj, (np.floating, np.float64, np.float32, np.float16)):
         return float(obj)
-    elif isinstance(obj, np.bool_):
+    elif np is not None and isinstance(obj, np.bool_):
         return bool(obj)
-    elif isinstance(obj, np.ndarray):
+    elif np is not None and isinstance(obj, np.ndarray):
         return obj.tolist()
-    elif isinstance(obj, pd.Series):
+    elif pd is not None and isinstance(obj, pd.Series):
         return obj.tolist()
-    elif isinstance(obj, pd.DataFrame):
+    elif pd is not None and isinstance(obj, pd.DataFrame):
         return obj.to_dict('records')
     elif hasattr(obj, 'dtype') and hasattr(obj, 'item'):
         # Para tipos de pandas específicos
@@ -55,284 +77,662 @@ def convert_pandas_types(obj):
 app = Flask(__name__)
 CORS(app)
 
+request_flight = SingleFlight()
+
+def coalesce_requests(view):
+    """Compartir una sola ejecución entre peticiones idénticas simultáneas.
+    
+    La clave es la ruta más los parámetros normalizados (ordenados) y la
+    versión de datos que leyó ``conditional_get``: una petición que llega
+    tras una escritura no se une a un líder que empezó antes de ella. Cada
+    petición recibe su propia copia de la respuesta del líder, junto con las
+    versiones de datos con las que se construyó (ver ``conditional_get``).
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        key = (request.path, tuple(sorted(request.args.items(multi=True))), g.get('data_version'))
+        
+        def render():
+            with track_served_versions() as served:
+                response = app.make_response(view(*args, **kwargs))
+            return response.get_data(), response.status_code, list(response.headers.items()), served
+        
+        body, status, headers, served = request_flight.do(key, render)
+        for table, version in served.items():
+            note_served_version(table, version)
+        return app.response_class(body, status=status, headers=headers)
+    return wrapper
+
+def analytics_read(func):
+    """Enviar las lecturas de ``func`` a una réplica de lectura si hay una apta.
+    
+    Las escrituras siguen yendo al primario; sin réplicas configuradas, o si
+    ninguna está al día, todo se lee del primario.
+    """
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        with db_connection.prefer_replica():
+            return func(*args, **kwargs)
+    return wrapper
+
+# Consultas pesadas (agregados, reportes, exportaciones) que se admiten a la vez
+# por proceso; el resto de los hilos queda libre para las rutas baratas
+analytics_bulkhead = Bulkhead(
+    'analytics',
+    max_concurrent=admission_settings.max_concurrent or max(1, server_settings.threads // 4),
+    max_queue=admission_settings.max_queue,
+    max_wait=admission_settings.max_wait
+)
+
+QUERY_TIMEOUTS = {
+    'analytics': admission_settings.analytics_timeout_ms,
+    'export': admission_settings.export_timeout_ms,
+}
+
+def overloaded_response(message):
+    """Respuesta 503 con Retry-After para que el cliente reintente más tarde."""
+    response = jsonify({'error': message})
+    response.status_code = 503
+    response.headers['Retry-After'] = str(admission_settings.retry_after)
+    return response
+
+def query_timeout_response():
+    """Respuesta para una consulta cancelada por statement_timeout."""
+    return overloaded_response('La consulta superó el tiempo máximo permitido, intenta más tarde')
+
+def admission(kind='analytics'):
+    """Limitar las rutas pesadas con el bulkhead y un tope de tiempo por consulta.
+    
+    Si no hay lugar dentro de ADMISSION_MAX_WAIT segundos (o ya hay
+    ADMISSION_MAX_QUEUE peticiones esperando) se responde 503 de inmediato.
+    Va debajo de ``coalesce_requests`` para que las peticiones que esperan el
+    resultado de otra no ocupen lugar.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            with db_connection.statement_timeout(QUERY_TIMEOUTS[kind]):
+                if not admission_settings.enabled:
+                    return view(*args, **kwargs)
+                try:
+                    with analytics_bulkhead.acquire():
+                        return view(*args, **kwargs)
+                except BulkheadFull:
+                    return overloaded_response('Servidor ocupado con consultas pesadas, intenta más tarde')
+        return wrapper
+    return decorator
+
+# Las conexiones del pool se abren con el tope por defecto de las rutas, así
+# que solo las rutas con un tope propio (``admission``) pagan un SET LOCAL
+db_connection.set_default_statement_timeout(admission_settings.default_timeout_ms)
+
+@app.before_request
+def apply_default_query_timeout():
+    """Tope de tiempo por consulta para las rutas sin uno propio (ver ``admission``)."""
+    g.query_timeout_token = db_connection.set_statement_timeout(admission_settings.default_timeout_ms)
+
+@app.teardown_request
+def release_default_query_timeout(exc=None):
+    token = g.pop('query_timeout_token', None)
+    if token is not None:
+        db_connection.reset_statement_timeout(token)
+
+def conditional_get(table='orders'):
+    """Responder 304 si el cliente ya tiene la versión actual de los datos.
+    
+    El ETag y el Last-Modified salen del contador de cambios de la tabla (ver
+    ``src.services.data_version``), así que la validación ocurre antes de
+    consultar PostgreSQL. Las respuestas llevan ``Cache-Control: no-cache``:
+    el cliente puede guardarlas pero debe revalidarlas en cada uso.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if not cache_settings.enabled:
+                return view(*args, **kwargs)
+            
+            try:
+                version, modified_at = get_version_store().get(table)
+            except Exception as e:
+                logger.error(f"Error reading data version of {table}: {e}")
+                return view(*args, **kwargs)
+            
+            g.data_version = (table, version)
+            etag = f"{table}-v{version}"
+            # HTTP-date tiene resolución de segundos: un cambio en el mismo
+            # segundo no movería la fecha, así que solo se anuncia cuando el
+            # último cambio tiene al menos un segundo de antigüedad
+            last_modified = modified_at.replace(microsecond=0)
+            stable = (datetime.now(timezone.utc) - modified_at).total_seconds() >= 1
+            
+            if request.if_none_match:
+                not_modified = request.if_none_match.contains_weak(etag)
+            else:
+                not_modified = request.if_modified_since is not None and last_modified <= request.if_modified_since
+            
+            if not_modified:
+                response = app.response_class(status=304)
+            else:
+                with track_served_versions() as served:
+                    response = app.make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                if served.get(table, version) < version:
+                    # Respuesta construida con datos anteriores (snapshot
+                    # reciente de DuckDB): etiquetarla con esa versión para que
+                    # la próxima validación no la dé por vigente
+                    etag, stable = f"{table}-v{served[table]}", False
+            
+            response.set_etag(etag, weak=True)
+            if stable:
+                response.last_modified = last_modified
+            response.headers['Cache-Control'] = 'no-cache'
+            return response
+        return wrapper
+    return decorator
+
+@app.after_request
+def compress_response(response):
+    """Comprimir con brotli/gzip según Accept-Encoding las respuestas de texto grandes.
+    
+    Las respuestas en streaming se comprimen por fragmentos sin acumular el
+    cuerpo; las servidas con send_file (rangos, archivos precomprimidos) se
+    dejan intactas.
+    """
+    if (not compression_settings.enabled
+            or response.status_code != 200
+            or response.direct_passthrough
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+    
+    response.vary.add('Accept-Encoding')
+    encoding = negotiate_encoding(request.headers.get('Accept-Encoding'))
+    if encoding is None:
+        return response
+    
+    if response.is_streamed:
+        response.response = compress_stream(response.response, encoding,
+                                            compression_settings.gzip_level,
+                                            compression_settings.brotli_quality)
+        response.headers.pop('Content-Length', None)
+    else:
+        body = response.get_data()
+        if len(body) < compression_settings.min_size:
+            return response
+        response.set_data(compress_bytes(body, encoding,
+                                         compression_settings.gzip_level,
+                                         compression_settings.brotli_quality))
+    
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+asset_manifest = AssetManifest()
+
+@app.context_processor
+def inject_asset_url():
+    """``asset_url('app.js')`` en las plantillas: versión con huella si existe el build."""
+    def asset_url(name):
+        built = asset_manifest.lookup(name)
+        if built:
+            return url_for('serve_asset', filename=built)
+        return url_for('static', filename=name)
+    return {'asset_url': asset_url}
+
+@app.route('/assets/<path:filename>')
+def serve_asset(filename):
+    """Servir un asset con huella, en su variante precomprimida si el cliente la acepta.
+    
+    El nombre cambia con el contenido, así que se puede cachear indefinidamente.
+    """
+    path = safe_join(DIST_DIR, filename)
+    if path is None or not os.path.isfile(path):
+        return jsonify({'error': 'Asset no encontrado'}), 404
+    
+    available = [ext for ext in PRECOMPRESSED if os.path.isfile(path + ext)]
+    encoding = negotiate_encoding(request.headers.get('Accept-Encoding'),
+                                  [PRECOMPRESSED[ext] for ext in available])
+    mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    
+    if encoding:
+        ext = next(ext for ext in available if PRECOMPRESSED[ext] == encoding)
+        response = send_file(path + ext, mimetype=mimetype, max_age=compression_settings.asset_max_age)
+        response.headers['Content-Encoding'] = encoding
+    else:
+        response = send_file(path, mimetype=mimetype, max_age=compression_settings.asset_max_age)
+    
+    response.vary.add('Accept-Encoding')
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
 # Inicializar servicios
 order_service = OrderService()
+job_service = JobService()
 
 @app.route('/')
 def index():
     """Página principal del dashboard."""
     return render_template('index.html')
 
+def dashboard_payload(total_orders, status_stats, category_stats, year_stats):
+    """Armar la respuesta del dashboard a partir de sus cuatro consultas."""
+    response_data = {
+        'total_orders': int(total_orders),
+        'status_distribution': {item['status']: int(item['count']) for item in status_stats},
+        'category_distribution': {item['category']: int(item['count']) for item in category_stats},
+        'category_revenue': {item['category']: float(item['total_amount']) for item in category_stats},
+        'yearly_stats': [
+            {
+                'year': int(item['year']),
+                'orders': int(item['count']),
+                'revenue': float(item['total_amount'])
+            } for item in year_stats
+        ]
+    }
+    
+    # Convertir tipos de pandas/numpy
+    return convert_pandas_types(response_data)
+
 @app.route('/api/dashboard/stats')
+@conditional_get('orders')
+@coalesce_requests
+@admission('analytics')
+@analytics_read
 def dashboard_stats():
     """API endpoint para estadísticas del dashboard."""
     try:
-        # Obtener estadísticas básicas
-        total_query = "SELECT COUNT(*) as total FROM orders"
-        total_orders = db_connection.execute_query(total_query)[0]['total']
-        
-        # Estadísticas por estado
-        status_query = """
-        SELECT status, COUNT(*) as count 
-        FROM orders 
-        GROUP BY status
-        """
-        status_stats = db_connection.execute_query(status_query)
-        
-        # Estadísticas por categoría
-        category_query = """
-        SELECT category, COUNT(*) as count, SUM(subtotal_amount) as total_amount
-        FROM orders 
-        GROUP BY category
-        ORDER BY total_amount DESC
-        """
-        category_stats = db_connection.execute_query(category_query)
-        
-        # Estadísticas por año
-        year_query = """
-        SELECT EXTRACT(YEAR FROM order_date) as year, COUNT(*) as count, SUM(subtotal_amount) as total_amount
-        FROM orders 
-        GROUP BY EXTRACT(YEAR FROM order_date)
-        ORDER BY year
-        """
-        year_stats = db_connection.execute_query(year_query)
-        
-        # Preparar datos para respuesta
-        response_data = {
-            'total_orders': int(total_orders),
-            'status_distribution': {item['status']: int(item['count']) for item in status_stats},
-            'category_distribution': {item['category']: int(item['count']) for item in category_stats},
-            'category_revenue': {item['category']: float(item['total_amount']) for item in category_stats},
-            'yearly_stats': [
-                {
-                    'year': int(item['year']),
-                    'orders': int(item['count']),
-                    'revenue': float(item['total_amount'])
-                } for item in year_stats
-            ]
-        }
-        
-        # Convertir tipos de pandas/numpy
-        response_data = convert_pandas_types(response_data)
-        
-        return jsonify(response_data)
+        # Consultas preparadas del registro (src/database/queries.py) o, con
+        # ANALYTICS_BACKEND=duckdb, el snapshot Parquet de orders
+        total_orders, status_stats, category_stats, year_stats = order_service.get_dashboard_rollups()
+        
+        return jsonify(dashboard_payload(total_orders, status_stats, category_stats, year_stats))
+    except QueryCanceled:
+        return query_timeout_response()
     except Exception as e:
         logger.error(f"Error getting dashboard stats: {e}")
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/data-quality/report')
+@conditional_get('orders')
+@coalesce_requests
+@admission('analytics')
+@analytics_read
 def data_quality_report():
-    """API endpoint para reporte de calidad de datos."""
+    """API endpoint para reporte de calidad de datos.
+    
+    ``mode=approx`` estima el reporte a partir de una muestra de la tabla
+    (con intervalos de confianza, cuantiles y clientes distintos); por
+    defecto (``mode=exact``) se calcula sobre todas las filas.
+    """
+    mode = request.args.get('mode', 'exact')
+    if mode not in ('exact', 'approx'):
+        return jsonify({'error': "mode debe ser 'exact' o 'approx'"}), 400
     try:
-        report = order_service.get_data_quality_report()
+        report = order_service.get_data_quality_report(approximate=(mode == 'approx'))
         
         # Convertir tipos de datos no serializables
         report = convert_pandas_types(report)
         return jsonify(report)
+    except QueryCanceled:
+        return query_timeout_response()
     except Exception as e:
         logger.error(f"Error getting data quality report: {e}")
         return jsonify({'error': str(e)}), 500
 
+@analytics_read
+def duplicates_payload():
+    """Construir la respuesta de verificación de duplicados."""
+    result = order_service.clean_duplicate_orders()
+    response_data = {
+        'total_records': int(result.total_records),
+        'duplicates_found': int(result.cleaned_records),
+        'warnings': int(result.warnings),
+        'summary': result.cleaning_summary
+    }
+    # Convertir tipos de pandas/numpy
+    return convert_pandas_types(response_data)
+
+@analytics_read
+def incomplete_payload():
+    """Construir la respuesta de verificación de registros incompletos."""
+    result = order_service.clean_incomplete_records()
+    response_data = {
+        'total_records': int(result.total_records),
+        'incomplete_records': int(result.cleaned_records),
+        'errors': int(result.errors),
+        'warnings': int(result.warnings),
+        'summary': result.cleaning_summary
+    }
+    # Convertir tipos de pandas/numpy
+    return convert_pandas_types(response_data)
+
+@analytics_read
+def validation_payload():
+    """Construir la respuesta de validación de tipos de datos."""
+    result = order_service.validate_data_types()
+    response_data = {
+        'total_records': int(result.total_records),
+        'errors': int(result.errors),
+        'warnings': int(result.warnings),
+        'summary': result.cleaning_summary
+    }
+    # Convertir tipos de pandas/numpy
+    return convert_pandas_types(response_data)
+
 @app.route('/api/data-cleaning/duplicates')
 def check_duplicates():
-    """API endpoint para verificar duplicados."""
+    """API endpoint para verificar duplicados; encola la tarea y responde 202 con su id."""
     try:
-        result = order_service.clean_duplicate_orders()
-        response_data = {
-            'total_records': int(result.total_records),
-            'duplicates_found': int(result.cleaned_records),
-            'warnings': int(result.warnings),
-            'summary': result.cleaning_summary
-        }
-        # Convertir tipos de pandas/numpy
-        response_data = convert_pandas_types(response_data)
-        return jsonify(response_data)
+        return job_accepted('duplicates')
     except Exception as e:
         logger.error(f"Error checking duplicates: {e}")
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/data-cleaning/incomplete')
 def check_incomplete():
-    """API endpoint para verificar registros incompletos."""
+    """API endpoint para verificar registros incompletos; encola la tarea y responde 202 con su id."""
     try:
-        result = order_service.clean_incomplete_records()
-        response_data = {
-            'total_records': int(result.total_records),
-            'incomplete_records': int(result.cleaned_records),
-            'errors': int(result.errors),
-            'warnings': int(result.warnings),
-            'summary': result.cleaning_summary
-        }
-        # Convertir tipos de pandas/numpy
-        response_data = convert_pandas_types(response_data)
-        return jsonify(response_data)
+        return job_accepted('incomplete')
     except Exception as e:
         logger.error(f"Error checking incomplete records: {e}")
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/data-cleaning/validate')
 def validate_data():
-    """API endpoint para validar tipos de datos."""
+    """API endpoint para validar tipos de datos; encola la tarea y responde 202 con su id."""
     try:
-        result = order_service.validate_data_types()
-        response_data = {
-            'total_records': int(result.total_records),
-            'errors': int(result.errors),
-            'warnings': int(result.warnings),
-            'summary': result.cleaning_summary
-        }
-        # Convertir tipos de pandas/numpy
-        response_data = convert_pandas_types(response_data)
-        return jsonify(response_data)
+        return job_accepted('validate')
     except Exception as e:
         logger.error(f"Error validating data: {e}")
         return jsonify({'error': str(e)}), 500
 
+def _like_escape(value):
+    """Escapar los comodines de LIKE para buscar el texto literal."""
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+def _parse_date(name, value):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise ValueError(f"{name} debe tener formato YYYY-MM-DD")
+
+def _parse_amount(name, value):
+    try:
+        return Decimal(value)
+    except InvalidOperation:
+        raise ValueError(f"{name} debe ser numérico")
+
+def build_order_filters(args):
+    """Construir el WHERE parametrizado de /api/orders a partir de los filtros.
+    
+    Filtros: status, category, subcategory (igualdad); date_from/date_to
+    (rango inclusivo de order_date); min_amount/max_amount (subtotal_amount);
+    customer_prefix (prefijo, índice btree sobre lower(customer_name)) y
+    customer (subcadena, índice trigram). Ver ``src.database.indexes``.
+    
+    Raises:
+        ValueError: Si algún filtro tiene un valor inválido.
+    """
+    conditions = []
+    params = {}
+    
+    for field in ('status', 'category', 'subcategory'):
+        value = args.get(field, '')
+        if value:
+            conditions.append(f"{field} = %({field})s")
+            params[field] = value
+    
+    if args.get('date_from'):
+        conditions.append("order_date >= %(date_from)s")
+        params['date_from'] = _parse_date('date_from', args['date_from'])
+    if args.get('date_to'):
+        conditions.append("order_date <= %(date_to)s")
+        params['date_to'] = _parse_date('date_to', args['date_to'])
+    
+    if args.get('min_amount'):
+        conditions.append("subtotal_amount >= %(min_amount)s")
+        params['min_amount'] = _parse_amount('min_amount', args['min_amount'])
+    if args.get('max_amount'):
+        conditions.append("subtotal_amount <= %(max_amount)s")
+        params['max_amount'] = _parse_amount('max_amount', args['max_amount'])
+    
+    customer_prefix = args.get('customer_prefix', '').strip()
+    if customer_prefix:
+        conditions.append("lower(customer_name) LIKE %(customer_prefix)s")
+        params['customer_prefix'] = _like_escape(customer_prefix.lower()) + '%'
+    
+    customer = args.get('customer', '').strip()
+    if customer:
+        conditions.append("customer_name ILIKE %(customer)s")
+        params['customer'] = '%' + _like_escape(customer) + '%'
+    
+    where_clause = "WHERE " + " AND ".join(conditions) if conditions else ""
+    return where_clause, params
+
+# Tope de filas por petición de /api/orders
+ORDERS_MAX_PER_PAGE = 1000
+
+def parse_orders_page(args):
+    """``page`` (desde 1), ``per_page`` (acotado a ORDERS_MAX_PER_PAGE) y ``before`` de /api/orders.
+    
+    Raises:
+        ValueError: Si alguno no es un entero.
+    """
+    page = max(1, int(args.get('page', 1)))
+    per_page = max(1, min(int(args.get('per_page', 50)), ORDERS_MAX_PER_PAGE))
+    before = int(args['before']) if args.get('before') else None
+    return page, per_page, before
+
+def orders_page_query(columns, where_clause, params, page, per_page, before=None):
+    """SELECT de una página de /api/orders y sus parámetros.
+    
+    Con ``before`` (un order_id) la página son las órdenes siguientes a esa en
+    orden descendente: paginación por clave sobre la clave primaria, igual de
+    rápida en cualquier posición, en lugar de un OFFSET que recorre y descarta
+    todas las filas anteriores.
+    """
+    params = dict(params, limit=per_page, offset=(page - 1) * per_page)
+    if before is not None:
+        where_clause = f"{where_clause} AND order_id < %(before)s" if where_clause else "WHERE order_id < %(before)s"
+        params.update(before=before, offset=0)
+    query = f"""
+    SELECT {columns} FROM orders
+    {where_clause}
+    ORDER BY order_id DESC
+    LIMIT %(limit)s OFFSET %(offset)s
+    """
+    return query, params
+
 @app.route('/api/orders')
 def get_orders():
-    """API endpoint para obtener órdenes con paginación."""
+    """API endpoint para obtener órdenes con paginación (``page`` o ``before``)."""
     try:
-        page = int(request.args.get('page', 1))
-        per_page = int(request.args.get('per_page', 50))
-        status = request.args.get('status', '')
-        category = request.args.get('category', '')
-        
-        # Construir query con filtros
-        where_conditions = []
-        params = {}
-        
-        if status:
-            where_conditions.append("status = %(status)s")
-            params['status'] = status
-        
-        if category:
-            where_conditions.append("category = %(category)s")
-            params['category'] = category
-        
-        where_clause = "WHERE " + " AND ".join(where_conditions) if where_conditions else ""
+        try:
+            page, per_page, before = parse_orders_page(request.args)
+            columns = select_list(parse_fields(request.args.get('fields')))
+            # Construir query con filtros
+            where_clause, params = build_order_filters(request.args)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
-        # Query para obtener total
-        count_query = f"SELECT COUNT(*) as total FROM orders {where_clause}"
-        total = db_connection.execute_query(count_query, params)[0]['total']
+        # Query para obtener total; count=false la omite cuando el cliente ya
+        # conoce el total (la tabla virtualizada pide muchas ventanas seguidas)
+        total = None
+        if request.args.get('count', 'true').lower() != 'false':
+            count_query = f"SELECT COUNT(*) as total FROM orders {where_clause}"
+            total = db_connection.execute_query(count_query, params)[0]['total']
         
         # Query para obtener datos paginados
-        offset = (page - 1) * per_page
-        data_query = f"""
-        SELECT * FROM orders 
-        {where_clause}
-        ORDER BY order_id DESC 
-        LIMIT %(limit)s OFFSET %(offset)s
-        """
-        params.update({'limit': per_page, 'offset': offset})
-        orders = db_connection.execute_query(data_query, params)
+        data_query, data_params = orders_page_query(columns, where_clause, params, page, per_page, before)
+        orders = db_connection.execute_query(data_query, data_params)
         
         return jsonify({
             'orders': orders,
             'total': total,
             'page': page,
             'per_page': per_page,
-            'total_pages': (total + per_page - 1) // per_page
+            'total_pages': (total + per_page - 1) // per_page if total is not None else None
         })
     except Exception as e:
         logger.error(f"Error getting orders: {e}")
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/export/csv')
-def export_csv():
-    """API endpoint para exportar datos a CSV."""
+AUTOCOMPLETE_MIN_CHARS = 2
+
+CUSTOMER_PREFIX_QUERY = """
+SELECT customer_name FROM orders
+WHERE lower(customer_name) LIKE %(prefix)s
+GROUP BY customer_name
+ORDER BY customer_name
+LIMIT %(limit)s
+"""
+
+CUSTOMER_SUBSTRING_QUERY = """
+SELECT customer_name FROM orders
+WHERE customer_name ILIKE %(pattern)s
+GROUP BY customer_name
+ORDER BY customer_name
+LIMIT %(limit)s
+"""
+
+@app.route('/api/customers/autocomplete')
+@conditional_get('orders')
+@coalesce_requests
+def autocomplete_customers():
+    """Sugerencias de nombres de cliente: primero por prefijo, luego por subcadena."""
     try:
-        # Obtener todos los datos
-        orders = order_service.get_all_orders()
-        df = pd.DataFrame(orders)
-        
-        # Crear archivo CSV temporal
-        filename = f"orders_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-        filepath = os.path.join('exports', filename)
+        query_text = request.args.get('q', '').strip()
+        limit = min(int(request.args.get('limit', 10)), 50)
+        if len(query_text) < AUTOCOMPLETE_MIN_CHARS:
+            return jsonify({'customers': []})
         
-        # Crear directorio si no existe
-        os.makedirs('exports', exist_ok=True)
+        customers = [row['customer_name'] for row in db_connection.execute_query(CUSTOMER_PREFIX_QUERY, {
+            'prefix': _like_escape(query_text.lower()) + '%',
+            'limit': limit
+        })]
         
-        # Guardar CSV
-        df.to_csv(filepath, index=False)
+        # Completar con coincidencias en medio del nombre (índice trigram: 3+ caracteres)
+        if len(customers) < limit and len(query_text) >= 3:
+            for row in db_connection.execute_query(CUSTOMER_SUBSTRING_QUERY, {
+                'pattern': '%' + _like_escape(query_text) + '%',
+                'limit': limit
+            }):
+                if row['customer_name'] not in customers and len(customers) < limit:
+                    customers.append(row['customer_name'])
         
-        return send_file(filepath, as_attachment=True, download_name=filename)
+        return jsonify({'customers': customers})
+    except Exception as e:
+        logger.error(f"Error autocompleting customers: {e}")
+        return jsonify({'error': str(e)}), 500
+
+EXPORT_DIR = 'exports'
+
+@analytics_read
+def export_orders_csv(progress=None):
+    """Escribir todas las órdenes a un CSV en exports/ por lotes y devolver su nombre."""
+    filename = f"orders_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+    filepath = os.path.join(EXPORT_DIR, filename)
+    
+    # Crear directorio si no existe
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+    
+    total = db_connection.execute_prepared('count_orders')[0]['total']
+    written = 0
+    with open(filepath, 'w', newline='', encoding='utf-8') as f:
+        writer = None
+        for batch in db_connection.stream_query("SELECT * FROM orders ORDER BY order_id"):
+            if writer is None:
+                writer = csv.DictWriter(f, fieldnames=list(batch[0].keys()))
+                writer.writeheader()
+            writer.writerows(batch)
+            written += len(batch)
+            if progress:
+                progress(written / total if total else 1.0, f"{written:,} de {total:,} órdenes exportadas")
+    
+    return {'filename': filename, 'rows': written}
+
+@app.route('/api/export/csv')
+def export_csv():
+    """API endpoint para exportar datos a CSV; el archivo se descarga de /api/jobs/<id>/download."""
+    try:
+        return job_accepted('export_csv')
     except Exception as e:
         logger.error(f"Error exporting CSV: {e}")
         return jsonify({'error': str(e)}), 500
 
+# Columnas derivadas disponibles en /api/powerbi/orders
+POWERBI_DERIVED_FIELDS = {
+    'year': 'EXTRACT(YEAR FROM order_date)',
+    'month': 'EXTRACT(MONTH FROM order_date)',
+    'quarter': 'EXTRACT(QUARTER FROM order_date)',
+}
+
+def powerbi_orders_query(fields, where_clause=''):
+    """SELECT de /api/powerbi/orders con las columnas pedidas (todas si no hay ``fields``).
+    
+    ``where_clause`` viene de ``build_order_filters``: filtra por rangos de
+    order_date (nunca por EXTRACT), así con la tabla particionada solo se
+    leen las particiones de los años pedidos.
+    """
+    fields = fields or ORDER_FIELDS + list(POWERBI_DERIVED_FIELDS)
+    select_items = [
+        f"{POWERBI_DERIVED_FIELDS[field]} as {field}" if field in POWERBI_DERIVED_FIELDS else field
+        for field in fields
+    ]
+    return f"""
+    SELECT {', '.join(select_items)}
+    FROM orders 
+    {where_clause}
+    ORDER BY order_id DESC
+    """
+
 @app.route('/api/powerbi/orders')
+@conditional_get('orders')
+@coalesce_requests
+@admission('analytics')
+@analytics_read
 def powerbi_orders():
-    """API endpoint específico para Power BI."""
+    """API endpoint específico para Power BI.
+    
+    ``fields=`` limita las columnas (campos de OrderBase más year, month y
+    quarter) para modelos que solo usan algunas. Acepta los filtros de
+    /api/orders; ``date_from``/``date_to`` sirven para la actualización
+    incremental de Power BI (RangeStart/RangeEnd).
+    """
     try:
+        try:
+            fields = parse_fields(request.args.get('fields'), extra=list(POWERBI_DERIVED_FIELDS))
+            where_clause, params = build_order_filters(request.args)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
         # Obtener datos optimizados para Power BI
-        query = """
-        SELECT 
-            order_id,
-            status,
-            customer_name,
-            order_date,
-            quantity,
-            subtotal_amount,
-            tax_rate,
-            shipping_cost,
-            category,
-            subcategory,
-            EXTRACT(YEAR FROM order_date) as year,
-            EXTRACT(MONTH FROM order_date) as month,
-            EXTRACT(QUARTER FROM order_date) as quarter
-        FROM orders 
-        ORDER BY order_id DESC
-        """
-        orders = db_connection.execute_query(query)
+        orders = db_connection.execute_query(powerbi_orders_query(fields, where_clause), params)
         
         return jsonify({
             'data': orders,
             'last_updated': datetime.now().isoformat(),
             'total_records': len(orders)
         })
+    except QueryCanceled:
+        return query_timeout_response()
     except Exception as e:
         logger.error(f"Error getting Power BI data: {e}")
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/powerbi/summary')
+@conditional_get('orders')
+@coalesce_requests
+@admission('analytics')
+@analytics_read
 def powerbi_summary():
     """API endpoint para resumen de datos para Power BI."""
     try:
-        # Resumen por categoría
-        category_summary = db_connection.execute_query("""
-            SELECT 
-                category,
-                COUNT(*) as order_count,
-                SUM(subtotal_amount) as total_revenue,
-                AVG(subtotal_amount) as avg_order_value,
-                SUM(quantity) as total_quantity
-            FROM orders 
-            GROUP BY category
-            ORDER BY total_revenue DESC
-        """)
-        
-        # Resumen por año
-        yearly_summary = db_connection.execute_query("""
-            SELECT 
-                EXTRACT(YEAR FROM order_date) as year,
-                COUNT(*) as order_count,
-                SUM(subtotal_amount) as total_revenue,
-                AVG(subtotal_amount) as avg_order_value
-            FROM orders 
-            GROUP BY EXTRACT(YEAR FROM order_date)
-            ORDER BY year
-        """)
-        
-        # Resumen por estado
-        status_summary = db_connection.execute_query("""
-            SELECT 
-                status,
-                COUNT(*) as order_count,
-                SUM(subtotal_amount) as total_revenue
-            FROM orders 
-            GROUP BY status
-            ORDER BY order_count DESC
-        """)
+        # Resúmenes por categoría, año y estado (consultas preparadas)
+        category_summary = db_connection.execute_prepared('powerbi_category_summary')
+        yearly_summary = db_connection.execute_prepared('powerbi_yearly_summary')
+        status_summary = db_connection.execute_prepared('powerbi_status_summary')
         
         return jsonify({
             'category_summary': category_summary,
@@ -340,18 +740,153 @@ def powerbi_summary():
             'status_summary': status_summary,
             'last_updated': datetime.now().isoformat()
         })
+    except QueryCanceled:
+        return query_timeout_response()
     except Exception as e:
         logger.error(f"Error getting Power BI summary: {e}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/replicas/status')
+def replicas_status():
+    """API endpoint con el último estado observado de cada réplica de lectura."""
+    return jsonify({'replicas': db_connection.router.status()})
+
+@app.route('/api/admission/status')
+def admission_status():
+    """API endpoint con la ocupación del bulkhead de consultas pesadas de este proceso."""
+    return jsonify(analytics_bulkhead.status())
+
+# ===== ACTUALIZACIONES EN VIVO =====
+
+def _max_event_streams():
+    return notify_settings.max_streams or max(1, server_settings.threads // 2)
+
+@app.route('/api/events')
+def event_stream():
+    """Server-Sent Events con los cambios de la tabla orders (LISTEN/NOTIFY).
+    
+    Cada conexión ocupa un hilo del servidor, por eso hay un tope por proceso
+    y cada stream se cierra tras NOTIFY_STREAM_MAX_SECONDS; EventSource se
+    reconecta solo.
+    """
+    if not notify_settings.enabled:
+        return jsonify({'error': 'Actualizaciones en vivo deshabilitadas'}), 404
+    if change_listener.subscriber_count >= _max_event_streams():
+        response = jsonify({'error': 'Demasiadas conexiones en vivo, intenta más tarde'})
+        response.status_code = 503
+        response.headers['Retry-After'] = str(notify_settings.stream_max_seconds // 10 or 1)
+        return response
+    
+    def generate():
+        subscription = change_listener.subscribe()
+        deadline = time.monotonic() + notify_settings.stream_max_seconds
+        try:
+            yield "retry: 5000\n\n"
+            while time.monotonic() < deadline:
+                event = subscription.get(timeout=notify_settings.keepalive_seconds)
+                if subscription.lagged:
+                    # Se perdieron eventos: el cliente debe recargar todo
+                    subscription.lagged = False
+                    event = {'type': 'resync'}
+                if event is None:
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"event: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+        finally:
+            change_listener.unsubscribe(subscription)
+    
+    response = app.response_class(generate(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+# ===== TAREAS EN SEGUNDO PLANO =====
+
+def _staged(payload_builder, message):
+    """Adaptar un constructor de respuesta a una tarea con progreso por etapas."""
+    def task(progress):
+        progress(0.05, message)
+        return payload_builder()
+    return task
+
+job_service.register('duplicates', _staged(duplicates_payload, 'Buscando duplicados'))
+job_service.register('incomplete', _staged(incomplete_payload, 'Buscando registros incompletos'))
+job_service.register('validate', _staged(validation_payload, 'Validando tipos de datos'))
+job_service.register('export_csv', export_orders_csv)
+
+def job_accepted(kind):
+    """Encolar una tarea y responder 202 de inmediato con su id y la URL para consultarla."""
+    job_id = job_service.submit(kind)
+    return jsonify({
+        'job_id': job_id,
+        'status_url': f'/api/jobs/{job_id}'
+    }), 202
+
+@app.route('/api/jobs', methods=['POST'])
+def submit_job():
+    """API endpoint para encolar una tarea pesada; responde de inmediato con su id."""
+    try:
+        data = request.get_json(silent=True) or {}
+        kind = data.get('type')
+        if kind not in job_service.kinds:
+            return jsonify({'error': f"type debe ser uno de: {', '.join(job_service.kinds)}"}), 400
+        
+        return job_accepted(kind)
+    except Exception as e:
+        logger.error(f"Error submitting job: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/jobs')
+def list_jobs():
+    """API endpoint para listar las tareas recientes."""
+    try:
+        limit = int(request.args.get('limit', 20))
+        return jsonify({'jobs': job_service.list_recent(limit)})
+    except Exception as e:
+        logger.error(f"Error listing jobs: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/jobs/<job_id>')
+def get_job(job_id):
+    """API endpoint para consultar estado, progreso y resultado de una tarea."""
+    try:
+        job = job_service.get(job_id)
+        if not job:
+            return jsonify({'error': 'Tarea no encontrada'}), 404
+        return jsonify(job)
+    except Exception as e:
+        logger.error(f"Error getting job {job_id}: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/jobs/<job_id>/download')
+def download_job_result(job_id):
+    """API endpoint para descargar el archivo generado por una tarea de exportación."""
+    try:
+        job = job_service.get(job_id)
+        if not job:
+            return jsonify({'error': 'Tarea no encontrada'}), 404
+        if job['status'] != JOB_SUCCEEDED or not job['result'] or 'filename' not in job['result']:
+            return jsonify({'error': 'La tarea no tiene un archivo disponible'}), 409
+        
+        filename = job['result']['filename']
+        return send_file(os.path.join(EXPORT_DIR, filename), as_attachment=True, download_name=filename)
+    except Exception as e:
+        logger.error(f"Error downloading job {job_id} result: {e}")
+        return jsonify({'error': str(e)}), 500
+
 # ===== GESTIÓN DE ÓRDENES =====
 
 @app.route('/api/orders/<int:order_id>')
+@conditional_get('orders')
 def get_order(order_id):
     """API endpoint para obtener una orden específica."""
     try:
-        query = "SELECT * FROM orders WHERE order_id = %(order_id)s"
-        orders = db_connection.execute_query(query, {"order_id": order_id})
+        try:
+            statement = order_by_id_statement(parse_fields(request.args.get('fields')) or ())
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        orders = db_connection.execute_prepared(statement, {"order_id": order_id})
         
         if not orders:
             return jsonify({'error': 'Orden no encontrada'}), 404
@@ -375,24 +910,14 @@ def update_order(order_id):
             if field not in data:
                 return jsonify({'error': f'Campo requerido: {field}'}), 400
         
-        # Construir query de actualización
-        set_clauses = []
-        params = {"order_id": order_id}
-        
-        for field in required_fields:
-            set_clauses.append(f"{field} = %({field})s")
-            params[field] = data[field]
-        
-        query = f"UPDATE orders SET {', '.join(set_clauses)} WHERE order_id = %(order_id)s"
-        
-        affected_rows = db_connection.execute_update(query, params)
-        
-        if affected_rows > 0:
-            logger.info(f"Order {order_id} updated successfully")
+        # Validar con el esquema de OrderBase y actualizar
+        if order_service.update_order(order_id, {field: data[field] for field in required_fields}):
             return jsonify({'message': 'Orden actualizada exitosamente', 'order_id': order_id})
         else:
             return jsonify({'error': 'Orden no encontrada'}), 404
             
+    except OrderValidationError as e:
+        return jsonify({'error': 'Datos inválidos', 'details': e.errors}), 400
     except Exception as e:
         logger.error(f"Error updating order {order_id}: {e}")
         return jsonify({'error': str(e)}), 500
@@ -411,60 +936,96 @@ def create_order():
             if field not in data:
                 return jsonify({'error': f'Campo requerido: {field}'}), 400
         
-        # Obtener el siguiente order_id
-        max_id_query = "SELECT MAX(order_id) as max_id FROM orders"
-        max_id_result = db_connection.execute_query(max_id_query)
-        next_id = (max_id_result[0]['max_id'] or 0) + 1
-        
-        # Insertar nueva orden
-        insert_query = """
-        INSERT INTO orders (order_id, status, customer_name, order_date, quantity, 
-                           subtotal_amount, tax_rate, shipping_cost, category, subcategory)
-        VALUES (%(order_id)s, %(status)s, %(customer_name)s, %(order_date)s, %(quantity)s,
-                %(subtotal_amount)s, %(tax_rate)s, %(shipping_cost)s, %(category)s, %(subcategory)s)
-        """
-        
-        params = {
-            'order_id': next_id,
-            'status': data['status'],
-            'customer_name': data['customer_name'],
-            'order_date': data['order_date'],
-            'quantity': data['quantity'],
-            'subtotal_amount': data['subtotal_amount'],
-            'tax_rate': data['tax_rate'],
-            'shipping_cost': data['shipping_cost'],
-            'category': data['category'],
-            'subcategory': data['subcategory']
-        }
-        
-        affected_rows = db_connection.execute_update(insert_query, params)
-        
-        if affected_rows > 0:
-            logger.info(f"New order {next_id} created successfully")
-            return jsonify({'message': 'Orden creada exitosamente', 'order_id': next_id}), 201
-        else:
-            return jsonify({'error': 'Error al crear la orden'}), 500
+        # Validar con el esquema de OrderBase e insertar
+        next_id = order_service.create_order({field: data[field] for field in required_fields})
+        logger.info(f"New order {next_id} created successfully")
+        return jsonify({'message': 'Orden creada exitosamente', 'order_id': next_id}), 201
             
+    except OrderValidationError as e:
+        return jsonify({'error': 'Datos inválidos', 'details': e.errors}), 400
     except Exception as e:
         logger.error(f"Error creating order: {e}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/orders/bulk', methods=['POST'])
+def create_orders_bulk():
+    """API endpoint para crear varias órdenes en lote.
+    
+    Recibe una lista JSON de órdenes; las válidas se insertan y las
+    inválidas se devuelven en ``errors`` con su posición y los campos con
+    error, sin abortar el lote.
+    """
+    try:
+        data = request.get_json()
+        if not isinstance(data, list) or len(data) == 0:
+            return jsonify({'error': 'Se esperaba una lista no vacía de órdenes'}), 400
+        if not all(isinstance(row, dict) for row in data):
+            return jsonify({'error': 'Cada orden debe ser un objeto JSON'}), 400
+        
+        result = order_service.create_orders(data)
+        status = 201 if result['inserted'] > 0 else 400
+        return jsonify(result), status
+    except Exception as e:
+        logger.error(f"Error in bulk order creation: {e}")
+        return jsonify({'error': str(e)}), 500
+
+def import_status(result):
+    """Código HTTP de una importación: 201 si insertó, 400 si rechazó todas las filas."""
+    if result['inserted'] > 0:
+        return 201
+    if result['received'] > 0 and result['rejected'] == result['received']:
+        return 400
+    return 200
+
+@app.route('/api/orders/import', methods=['POST'])
+@admission('export')
+def import_orders():
+    """API endpoint para importar órdenes desde un CSV con encabezado.
+    
+    Acepta el archivo (``.csv`` o ``.csv.gz``, con el formato de
+    /api/export/csv) como ``file`` en un formulario multipart o directamente
+    en el cuerpo. Se procesa en streaming por lotes: validación, ``COPY`` a una
+    tabla de staging y merge que omite las órdenes ya existentes. Con el mismo
+    ``import_id`` un reintento continúa tras el último lote confirmado;
+    ``dedupe=false`` solo descarta order_id repetidos. Las filas inválidas van
+    al archivo de rechazos y las primeras se reportan en ``errors`` con su
+    número de fila (0 = primera fila de datos).
+    """
+    try:
+        if 'file' in request.files:
+            upload = request.files['file']
+            stream, source = upload.stream, upload.filename
+        else:
+            stream, source = request.stream, None
+        
+        result = order_service.import_orders_stream(
+            stream,
+            import_id=request.args.get('import_id') or None,
+            source=source,
+            dedupe=request.args.get('dedupe', 'true').lower() != 'false'
+        )
+        return jsonify(result), import_status(result)
+    except QueryCanceled:
+        return query_timeout_response()
+    except Exception as e:
+        logger.error(f"Error importing orders: {e}")
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/orders/<int:order_id>', methods=['DELETE'])
 def delete_order(order_id):
     """API endpoint para eliminar una orden."""
     try:
         # Verificar que la orden existe
-        check_query = "SELECT order_id FROM orders WHERE order_id = %(order_id)s"
-        existing = db_connection.execute_query(check_query, {"order_id": order_id})
+        existing = db_connection.execute_prepared('order_exists', {"order_id": order_id})
         
         if not existing:
             return jsonify({'error': 'Orden no encontrada'}), 404
         
         # Eliminar la orden
-        delete_query = "DELETE FROM orders WHERE order_id = %(order_id)s"
-        affected_rows = db_connection.execute_update(delete_query, {"order_id": order_id})
+        affected_rows = db_connection.execute_prepared_update('delete_order', {"order_id": order_id})
         
         if affected_rows > 0:
+            bump_data_version('orders')
             logger.info(f"Order {order_id} deleted successfully")
             return jsonify({'message': 'Orden eliminada exitosamente', 'order_id': order_id})
         else:
@@ -482,27 +1043,29 @@ def update_order_status(order_id):
         
         if 'status' not in data:
             return jsonify({'error': 'Campo status es requerido'}), 400
+        validate_order_update({'status': data['status']})
         
         # Verificar que la orden existe
-        check_query = "SELECT order_id FROM orders WHERE order_id = %(order_id)s"
-        existing = db_connection.execute_query(check_query, {"order_id": order_id})
+        existing = db_connection.execute_prepared('order_exists', {"order_id": order_id})
         
         if not existing:
             return jsonify({'error': 'Orden no encontrada'}), 404
         
         # Actualizar solo el estado
-        update_query = "UPDATE orders SET status = %(status)s WHERE order_id = %(order_id)s"
-        affected_rows = db_connection.execute_update(update_query, {
+        affected_rows = db_connection.execute_prepared_update('update_order_status', {
             "order_id": order_id,
             "status": data['status']
         })
         
         if affected_rows > 0:
+            bump_data_version('orders')
             logger.info(f"Order {order_id} status updated to {data['status']}")
             return jsonify({'message': 'Estado actualizado exitosamente', 'order_id': order_id, 'new_status': data['status']})
         else:
             return jsonify({'error': 'Error al actualizar el estado'}), 500
             
+    except OrderValidationError as e:
+        return jsonify({'error': 'Datos inválidos', 'details': e.errors}), 400
     except Exception as e:
         logger.error(f"Error updating order {order_id} status: {e}")
         return jsonify({'error': str(e)}), 500
@@ -521,13 +1084,15 @@ def bulk_update_status():
         
         if not isinstance(order_ids, list) or len(order_ids) == 0:
             return jsonify({'error': 'order_ids debe ser una lista no vacía'}), 400
+        validate_order_update({'status': new_status})
         
-        # Construir query para múltiples IDs
-        placeholders = ','.join(['%s'] * len(order_ids))
-        update_query = f"UPDATE orders SET status = %s WHERE order_id IN ({placeholders})"
-        
-        params = [new_status] + order_ids
-        affected_rows = db_connection.execute_update(update_query, params)
+        # Una sola sentencia preparada para cualquier cantidad de IDs
+        affected_rows = db_connection.execute_prepared_update('bulk_update_status', {
+            'status': new_status,
+            'order_ids': order_ids
+        })
+        if affected_rows > 0:
+            bump_data_version('orders')
         
         logger.info(f"Bulk status update: {affected_rows} orders updated to {new_status}")
         return jsonify({
@@ -536,6 +1101,8 @@ def bulk_update_status():
             'new_status': new_status
         })
         
+    except OrderValidationError as e:
+        return jsonify({'error': 'Datos inválidos', 'details': e.errors}), 400
     except Exception as e:
         logger.error(f"Error in bulk status update: {e}")
         return jsonify({'error': str(e)}), 500